@@ -0,0 +1,38 @@
+"""agregar prioridad y organización a jobs y peso de jobs a organizaciones
+
+Revision ID: 2e7b4c9d1a63
+Revises: 9c1e7a3f5b20
+Create Date: 2026-10-17 23:18:40.127694
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e7b4c9d1a63'
+down_revision: Union[str, Sequence[str], None] = '9c1e7a3f5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job', sa.Column('priority', sa.Integer(), server_default='50', nullable=False))
+    op.add_column('job', sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key('job_organization_id_fkey', 'job', 'organization', ['organization_id'], ['id'],
+                          ondelete='SET NULL')
+    op.create_index('ix_job_status_priority_created_at', 'job', ['status', 'priority', 'created_at'], unique=False)
+    op.add_column('organization', sa.Column('job_weight', sa.Float(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('organization', 'job_weight')
+    op.drop_index('ix_job_status_priority_created_at', table_name='job')
+    op.drop_constraint('job_organization_id_fkey', 'job', type_='foreignkey')
+    op.drop_column('job', 'organization_id')
+    op.drop_column('job', 'priority')
@@ -0,0 +1,37 @@
+"""agregar timeouts a llm y estado timed_out a ejecuciones
+
+Revision ID: 4a9d2c6e8b17
+Revises: c5e82a7d1f34
+Create Date: 2026-10-17 21:03:54.271930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a9d2c6e8b17'
+down_revision: Union[str, Sequence[str], None] = 'c5e82a7d1f34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('llm', sa.Column('connect_timeout_seconds', sa.Float(), nullable=True))
+    op.add_column('llm', sa.Column('read_timeout_seconds', sa.Float(), nullable=True))
+    op.add_column('llm', sa.Column('total_timeout_seconds', sa.Float(), nullable=True))
+    # ADD VALUE no puede correr dentro de la transacción de la migración
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE status_enum ADD VALUE IF NOT EXISTS 'TIMED_OUT'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Postgres no permite quitar valores de un enum, las ejecuciones vencidas quedan como fallidas
+    op.execute("UPDATE execution SET status = 'FAILED' WHERE status = 'TIMED_OUT'")
+    op.drop_column('llm', 'total_timeout_seconds')
+    op.drop_column('llm', 'read_timeout_seconds')
+    op.drop_column('llm', 'connect_timeout_seconds')
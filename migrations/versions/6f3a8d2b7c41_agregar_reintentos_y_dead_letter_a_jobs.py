@@ -0,0 +1,32 @@
+"""agregar reintentos con backoff y dead letter a jobs
+
+Revision ID: 6f3a8d2b7c41
+Revises: 2e7b4c9d1a63
+Create Date: 2026-10-17 23:52:06.839115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f3a8d2b7c41'
+down_revision: Union[str, Sequence[str], None] = '2e7b4c9d1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job', sa.Column('run_after', sa.DateTime(), nullable=True))
+    op.add_column('job', sa.Column('last_error', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # El estado es un string, los jobs en dead letter quedan como fallidos
+    op.execute("UPDATE job SET status = 'failed' WHERE status = 'dead_letter'")
+    op.drop_column('job', 'last_error')
+    op.drop_column('job', 'run_after')
@@ -0,0 +1,38 @@
+"""agregar lease, heartbeat e intentos a jobs
+
+Revision ID: 9c1e7a3f5b20
+Revises: 4a9d2c6e8b17
+Create Date: 2026-10-17 22:41:12.503817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e7a3f5b20'
+down_revision: Union[str, Sequence[str], None] = '4a9d2c6e8b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job', sa.Column('worker_id', sa.String(), nullable=True))
+    op.add_column('job', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('job', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    op.add_column('job', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('job', sa.Column('max_attempts', sa.Integer(), nullable=True))
+    op.create_index('ix_job_status_lease_expires_at', 'job', ['status', 'lease_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_status_lease_expires_at', table_name='job')
+    op.drop_column('job', 'max_attempts')
+    op.drop_column('job', 'attempts')
+    op.drop_column('job', 'heartbeat_at')
+    op.drop_column('job', 'lease_expires_at')
+    op.drop_column('job', 'worker_id')
@@ -0,0 +1,28 @@
+"""indexar event_log por fecha para borrar los eventos vencidos
+
+Revision ID: b7d1e3f5a829
+Revises: 6f3a8d2b7c41
+Create Date: 2026-10-18 10:12:33.418027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d1e3f5a829'
+down_revision: Union[str, Sequence[str], None] = '6f3a8d2b7c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_event_log_created_at', 'event_log', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_event_log_created_at', table_name='event_log')
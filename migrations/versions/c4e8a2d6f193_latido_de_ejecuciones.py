@@ -0,0 +1,28 @@
+"""latido de las ejecuciones para saber si siguen vivas
+
+Revision ID: c4e8a2d6f193
+Revises: b7d1e3f5a829
+Create Date: 2026-10-18 15:40:07.512634
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a2d6f193'
+down_revision: Union[str, Sequence[str], None] = 'b7d1e3f5a829'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('execution', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('execution', 'heartbeat_at')
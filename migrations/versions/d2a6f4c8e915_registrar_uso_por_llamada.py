@@ -0,0 +1,59 @@
+"""registrar el uso de cada llamada al LLM de una ejecución
+
+Revision ID: d2a6f4c8e915
+Revises: c4e8a2d6f193
+Create Date: 2026-10-18 17:05:21.348190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6f4c8e915'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a2d6f193'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'section_execution_usage',
+        sa.Column('execution_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('section_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('operation', sa.String(), nullable=False),
+        sa.Column('model_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('input_tokens', sa.Integer(), nullable=True),
+        sa.Column('output_tokens', sa.Integer(), nullable=True),
+        sa.Column('cached_tokens', sa.Integer(), nullable=True),
+        sa.Column('latency_ms', sa.Integer(), nullable=True),
+        sa.Column('cost', sa.Float(), nullable=True),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['execution_id'], ['execution.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['section_id'], ['section.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['model_id'], ['llm.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('section_execution_usage_execution_id_idx', 'section_execution_usage', ['execution_id'], unique=False)
+    # El uso ya guardado en las secciones pasa a una fila por sección
+    op.execute("""
+        INSERT INTO section_execution_usage
+            (id, execution_id, section_id, operation, model_id, input_tokens, output_tokens,
+             cached_tokens, latency_ms, cost, created_at, updated_at)
+        SELECT id, execution_id, section_id, 'generate_section', model_id, input_tokens, output_tokens,
+               cached_tokens, latency_ms, cost, created_at, updated_at
+        FROM section_execution
+        WHERE input_tokens IS NOT NULL OR output_tokens IS NOT NULL OR cost IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('section_execution_usage_execution_id_idx', table_name='section_execution_usage')
+    op.drop_table('section_execution_usage')
@@ -21,17 +21,53 @@ class Config:
     MODEL_GATEWAY_URL: str = os.getenv("MODEL_GATEWAY_URL")
     MODEL_GATEWAY_APIKEY: str = os.getenv("MODEL_GATEWAY_APIKEY")
     JOB_WORKER_COUNT: int = int(os.getenv("JOB_WORKER_COUNT", "1"))
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "30"))
+    JOB_CLAIM_BATCH_SIZE: int = int(os.getenv("JOB_CLAIM_BATCH_SIZE", "10"))
+    JOB_WORKER_ID: str = os.getenv("JOB_WORKER_ID")
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    JOB_HEARTBEAT_INTERVAL_SECONDS: float = float(os.getenv("JOB_HEARTBEAT_INTERVAL_SECONDS", "20"))
+    JOB_REAPER_INTERVAL_SECONDS: float = float(os.getenv("JOB_REAPER_INTERVAL_SECONDS", "30"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BASE_SECONDS: float = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+    JOB_RETRY_MAX_SECONDS: float = float(os.getenv("JOB_RETRY_MAX_SECONDS", "600"))
+    # Límite de jobs corriendo a la vez en todo el cluster por tipo, "tipo=limite,tipo=limite"
+    JOB_TYPE_CONCURRENCY: str = os.getenv("JOB_TYPE_CONCURRENCY", "")
+    JOB_RESERVED_INTERACTIVE_SLOTS: int = int(os.getenv("JOB_RESERVED_INTERACTIVE_SLOTS", "1"))
     SECRETS_PROVIDER: str = os.getenv("SECRETS_PROVIDER", "local")
     AZURE_KEY_VAULT_URL: str = os.getenv("AZURE_KEY_VAULT_URL")
     HASHICORP_VAULT_ADDR: str = os.getenv("HASHICORP_VAULT_ADDR")
     HASHICORP_VAULT_TOKEN: str = os.getenv("HASHICORP_VAULT_TOKEN")
     LOCAL_SECRETS_FILE: str = os.getenv("LOCAL_SECRETS_FILE", ".local_secrets.json")
+    SECRETS_CACHE_TTL_SECONDS: int = int(os.getenv("SECRETS_CACHE_TTL_SECONDS", "300"))
+    GENERATION_MAX_CONCURRENCY: int = int(os.getenv("GENERATION_MAX_CONCURRENCY", "4"))
+    GENERATION_MAX_INPUT_TOKENS: int = int(os.getenv("GENERATION_MAX_INPUT_TOKENS", "100000"))
+    GENERATION_FLUSH_SIZE: int = int(os.getenv("GENERATION_FLUSH_SIZE", "10"))
+    GENERATION_FLUSH_INTERVAL: float = float(os.getenv("GENERATION_FLUSH_INTERVAL", "2"))
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "604800"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    LLM_CACHE_LRU_SIZE: int = int(os.getenv("LLM_CACHE_LRU_SIZE", "512"))
+    LLM_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "10"))
+    LLM_READ_TIMEOUT_SECONDS: float = float(os.getenv("LLM_READ_TIMEOUT_SECONDS", "120"))
+    LLM_TOTAL_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TOTAL_TIMEOUT_SECONDS", "600"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    GENERATION_DEADLINE_SECONDS: float = float(os.getenv("GENERATION_DEADLINE_SECONDS", "3600"))
+    EXECUTION_HEARTBEAT_INTERVAL_SECONDS: float = float(os.getenv("EXECUTION_HEARTBEAT_INTERVAL_SECONDS", "20"))
+    # Una ejecución en curso sin latidos por este tiempo se considera abandonada
+    EXECUTION_STALE_SECONDS: float = float(os.getenv("EXECUTION_STALE_SECONDS", "90"))
+    LLM_GLOBAL_CONCURRENCY: int = int(os.getenv("LLM_GLOBAL_CONCURRENCY", "8"))
+    LLM_CONCURRENCY_BACKEND: str = os.getenv("LLM_CONCURRENCY_BACKEND", "postgres")
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "postgres")
+    EVENT_BUS: str = os.getenv("EVENT_BUS", "postgres")
+    EVENT_LOG_SIZE: int = int(os.getenv("EVENT_LOG_SIZE", "5000"))
+    # Los eventos se borran del log pasado este tiempo (0 los conserva)
+    EVENT_LOG_TTL_SECONDS: int = int(os.getenv("EVENT_LOG_TTL_SECONDS", "86400"))
 
     def __post_init__(self):
         """Validate that all required environment variables are loaded correctly."""
         optional_vars = {
             "AZURE_KEY_VAULT_URL", "HASHICORP_VAULT_ADDR", "HASHICORP_VAULT_TOKEN",
-            "MODEL_GATEWAY_URL", "MODEL_GATEWAY_APIKEY", "LOCAL_SECRETS_FILE"
+            "MODEL_GATEWAY_URL", "MODEL_GATEWAY_APIKEY", "LOCAL_SECRETS_FILE", "JOB_WORKER_ID"
         }
         
         for field in fields(self):
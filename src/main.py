@@ -21,6 +21,9 @@ from src.modules.generation.routes import router as generation_router
 from src.modules.context.routes import router as context_router
 from src.modules.docx_template.routes import router as docx_template_router
 from src.modules.llm_provider.routes import router as llm_provider_router
+from src.modules.llm_cache.routes import router as llm_cache_router
+from src.modules.batch.routes import router as batch_router
+from src.modules.usage.routes import router as usage_router
 
 from src.database import load_models
 from contextlib import asynccontextmanager
@@ -65,6 +68,9 @@ app.include_router(doc_type_router, prefix="/api/v1", tags=["Document Types"])
 app.include_router(folder_router, prefix="/api/v1", tags=["Folders"])
 app.include_router(section_execution_router, prefix="/api/v1", tags=["Section Executions"])
 app.include_router(llm_provider_router, prefix="/api/v1", tags=["LLM Providers"])
+app.include_router(llm_cache_router, prefix="/api/v1", tags=["LLM Cache"])
+app.include_router(batch_router, prefix="/api/v1", tags=["Batches"])
+app.include_router(usage_router, prefix="/api/v1", tags=["Usage"])
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
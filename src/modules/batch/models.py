@@ -0,0 +1,19 @@
+from src.database.base_model import BaseModel
+from sqlalchemy import Column, String, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+
+class GenerationBatch(BaseModel):
+    __tablename__ = "generation_batch"
+    
+    # Alcance con el que se creó el lote (carpeta, tipo de documento o lista)
+    folder_id = Column(UUID(as_uuid=True), ForeignKey("folder.id", ondelete="SET NULL"), nullable=True)
+    document_type_id = Column(UUID(as_uuid=True), ForeignKey("document_type.id", ondelete="SET NULL"), nullable=True)
+    user_instruction = Column(String, nullable=True)
+    total = Column(Integer, nullable=False)
+    
+    executions = relationship("Execution", back_populates="batch")
+    
+    def __repr__(self):
+        return f"<GenerationBatch(id={self.id}, total={self.total})>"
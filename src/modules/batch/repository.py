@@ -0,0 +1,57 @@
+from typing import Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.base_repo import BaseRepository
+from src.modules.document.models import Document
+from src.modules.execution.models import Execution, Status
+from src.modules.folder.models import Folder
+from .models import GenerationBatch
+
+
+class BatchRepo(BaseRepository[GenerationBatch]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, GenerationBatch)
+    
+    async def get_document_ids(self, folder_id: Optional[str] = None, document_type_id: Optional[str] = None,
+                               document_ids: Optional[list[str]] = None,
+                               include_subfolders: bool = True) -> list:
+        """
+        Retrieve the IDs of the documents matching every given filter, ordered by name.
+        """
+        query = select(Document.id)
+        if folder_id:
+            if include_subfolders:
+                # Carpeta y todas sus subcarpetas
+                folders = select(Folder.id).where(Folder.id == folder_id).cte("folders", recursive=True)
+                folders = folders.union_all(
+                    select(Folder.id).where(Folder.parent_folder_id == folders.c.id)
+                )
+                query = query.where(Document.folder_id.in_(select(folders.c.id)))
+            else:
+                query = query.where(Document.folder_id == folder_id)
+        if document_type_id:
+            query = query.where(Document.document_type_id == document_type_id)
+        if document_ids:
+            query = query.where(Document.id.in_(document_ids))
+        result = await self.session.execute(query.order_by(Document.name))
+        return list(result.scalars().all())
+    
+    async def get_status_counts(self, batch_id: str) -> dict[Status, int]:
+        """
+        Count the executions of a batch by status.
+        """
+        query = (select(Execution.status, func.count())
+                 .where(Execution.batch_id == batch_id)
+                 .group_by(Execution.status))
+        result = await self.session.execute(query)
+        return {status: count for status, count in result.all()}
+    
+    async def get_executions(self, batch_id: str) -> list[Execution]:
+        """
+        Retrieve the executions of a batch.
+        """
+        query = (select(Execution)
+                 .where(Execution.batch_id == batch_id)
+                 .order_by(Execution.created_at.asc()))
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession as Session
+from src.database.core import get_session
+from src.schemas import ResponseSchema
+from src.utils import get_transaction_id
+from .service import BatchService
+from .schemas import CreateBatch
+
+router = APIRouter(prefix="/batch")
+
+
+@router.post("/", response_model=ResponseSchema)
+async def create_batch(request: CreateBatch,
+                       session: Session = Depends(get_session),
+                       transaction_id: str = Depends(get_transaction_id)):
+    """
+    Generate every document of a folder, of a document type or of a list.
+    An execution is created and a generation job is enqueued for each document.
+    """
+    try:
+        service = BatchService(session)
+        batch = await service.create_batch(
+            folder_id=request.folder_id,
+            document_type_id=request.document_type_id,
+            document_ids=request.document_ids,
+            include_subfolders=request.include_subfolders,
+            instructions=request.instructions,
+            max_concurrency=request.max_concurrency,
+            reuse_outputs=request.reuse_outputs,
+            bypass_cache=request.bypass_cache
+        )
+        return ResponseSchema(
+            transaction_id=transaction_id,
+            data=jsonable_encoder(batch)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"transaction_id": transaction_id, "error": str(e)}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"transaction_id": transaction_id,
+                    "error": f"An error occurred while creating the batch: {str(e)}"}
+        )
+
+
+@router.get("/{batch_id}", response_model=ResponseSchema)
+async def get_batch_progress(batch_id: str,
+                             with_executions: bool = False,
+                             session: Session = Depends(get_session),
+                             transaction_id: str = Depends(get_transaction_id)):
+    """
+    Get the progress of a batch, optionally with the status of each execution.
+    """
+    try:
+        service = BatchService(session)
+        progress = await service.get_batch_progress(batch_id, with_executions)
+        return ResponseSchema(
+            transaction_id=transaction_id,
+            data=jsonable_encoder(progress)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail={"transaction_id": transaction_id, "error": str(e)}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"transaction_id": transaction_id,
+                    "error": f"An error occurred while retrieving the batch progress: {str(e)}"}
+        )
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List
+
+
+class CreateBatch(BaseModel):
+    """
+    Schema for generating many documents at once, selected by folder,
+    document type or an explicit list.
+    """
+    folder_id: Optional[str] = None
+    document_type_id: Optional[str] = None
+    document_ids: Optional[List[str]] = None
+    include_subfolders: bool = True  # Incluir los documentos de las subcarpetas
+    instructions: Optional[str] = None
+    max_concurrency: Optional[int] = Field(default=None, ge=1)  # Secciones en paralelo por documento
+    reuse_outputs: bool = False  # Reutilizar secciones sin cambios de ejecuciones previas
+    bypass_cache: bool = False  # No usar el cache de respuestas del LLM
+    
+    @model_validator(mode='after')
+    def validate_scope(self):
+        if not (self.folder_id or self.document_type_id or self.document_ids):
+            raise ValueError('Se debe indicar folder_id, document_type_id o document_ids')
+        return self
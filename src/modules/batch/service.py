@@ -0,0 +1,111 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.modules.execution.models import Execution, Status
+from src.modules.execution.repository import ExecutionRepo
+from src.modules.generation.service import GenerationService
+from src.modules.job.models import JobPriority
+from src.modules.llm.service import LLMService
+from .models import GenerationBatch
+from .repository import BatchRepo
+
+
+class BatchService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.batch_repo = BatchRepo(session)
+        self.execution_repo = ExecutionRepo(session)
+    
+    async def create_batch(self, folder_id: str = None, document_type_id: str = None,
+                           document_ids: list[str] = None, include_subfolders: bool = True,
+                           instructions: str = None, max_concurrency: int = None,
+                           reuse_outputs: bool = False, bypass_cache: bool = False) -> dict:
+        """
+        Create one execution per matching document and enqueue a generation job
+        for each of them. The LLM calls of every run share the global concurrency cap.
+        """
+        ids = await self.batch_repo.get_document_ids(folder_id, document_type_id, document_ids,
+                                                     include_subfolders)
+        if not ids:
+            raise ValueError("No documents found for the batch.")
+        
+        llm = await LLMService(self.session).get_default_llm()
+        batch = await self.batch_repo.add(GenerationBatch(
+            folder_id=folder_id,
+            document_type_id=document_type_id,
+            user_instruction=instructions,
+            total=len(ids)
+        ))
+        executions = await self.execution_repo.add_all([
+            Execution(
+                document_id=document_id,
+                status=Status.PENDING,
+                model_id=llm.id,
+                batch_id=batch.id
+            )
+            for document_id in ids
+        ])
+        generation_service = GenerationService(self.session)
+        for execution in executions:
+            await generation_service.add_execution_graph_job(
+                str(execution.document_id),
+                str(execution.id),
+                instructions,
+                max_concurrency,
+                reuse_outputs,
+                bypass_cache=bypass_cache,
+                priority=JobPriority.BATCH
+            )
+        return {
+            "batch_id": batch.id,
+            "total": batch.total,
+            "executions": [
+                {"execution_id": execution.id, "document_id": execution.document_id}
+                for execution in executions
+            ]
+        }
+    
+    async def get_batch_progress(self, batch_id: str, with_executions: bool = False) -> dict:
+        """
+        Get the progress of a batch from the status of its executions.
+        """
+        batch = await self.batch_repo.get_by_id(batch_id)
+        if not batch:
+            raise ValueError(f"Batch with ID {batch_id} not found.")
+        
+        counts = await self.batch_repo.get_status_counts(batch_id)
+        pending = counts.get(Status.PENDING, 0)
+        running = counts.get(Status.RUNNING, 0)
+        failed = counts.get(Status.FAILED, 0) + counts.get(Status.TIMED_OUT, 0)
+        # Las ejecuciones aprobadas también terminaron bien
+        completed = counts.get(Status.COMPLETED, 0) + counts.get(Status.APPROVED, 0)
+        finished = completed + failed
+        
+        if not pending and not running:
+            status = Status.FAILED if failed else Status.COMPLETED
+        elif running or finished:
+            status = Status.RUNNING
+        else:
+            status = Status.PENDING
+        
+        progress = {
+            "batch_id": batch.id,
+            "status": status.value,
+            "total": batch.total,
+            "pending": pending,
+            "running": running,
+            "completed": completed,
+            "failed": failed,
+            "progress": round(finished / batch.total, 4) if batch.total else 1.0,
+            "created_at": batch.created_at,
+        }
+        if with_executions:
+            executions = await self.batch_repo.get_executions(batch_id)
+            progress["executions"] = [
+                {
+                    "execution_id": execution.id,
+                    "document_id": execution.document_id,
+                    "status": execution.status.value,
+                    "status_message": execution.status_message
+                }
+                for execution in executions
+            ]
+        return progress
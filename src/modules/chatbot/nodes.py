@@ -1,16 +1,18 @@
 from typing_extensions import TypedDict, Optional, Annotated
-from langchain_core.messages import SystemMessage
+from langchain_core.messages import SystemMessage, message_chunk_to_message
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langgraph.graph.message import add_messages
 from src.database.core import get_graph_session
 from .services import ChatbotServices
 from .prompt import chatbot_prompt
+from src.modules.llm.utils import get_total_timeout, stream_with_timeout
 
 class State(TypedDict):
     execution_id: str
     messages: Annotated[list, add_messages]
     content: Optional[str]
-    llm: Optional[object]
+    # Solo el id: el estado se guarda en el checkpoint y el cliente no es serializable
+    llm_id: Optional[str]
     
 async def entrypoint(state: State) -> State:
     print("Entrypoint")
@@ -20,7 +22,7 @@ async def entrypoint(state: State) -> State:
     async with get_graph_session() as session:
         service = ChatbotServices(session)
         state['content'] = await service.get_execution_content(state['execution_id'])
-        state['llm'] = await service.get_llm()
+        state['llm_id'] = await service.get_llm_id()
     return state
 
 
@@ -34,8 +36,13 @@ async def agent(state: State)-> State:
         SystemMessage(content=formated_prompt),
         MessagesPlaceholder(variable_name="history")
     ])
-    llm = state['llm']
-    response = await llm.ainvoke(prompt.format_messages(history=state['messages']))
-    state['messages'] = response
+    async with get_graph_session() as session:
+        llm = await ChatbotServices(session).get_llm(state.get('llm_id'))
+    # Con stream, la cadena de fallback compite solo hasta el primer chunk
+    response = None
+    messages = prompt.format_messages(history=state['messages'])
+    async for chunk in stream_with_timeout(llm.astream(messages), get_total_timeout(llm)):
+        response = chunk if response is None else response + chunk
+    state['messages'] = message_chunk_to_message(response)
     return state
         
\ No newline at end of file
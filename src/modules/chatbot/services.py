@@ -23,11 +23,18 @@ class ChatbotServices():
         content = "\n\n-------\n\n".join([i.custom_output if i.custom_output else i.output for i in sorted_execs])
         return content
         
-    async def get_llm(self):
+    async def get_llm_id(self) -> str:
         """
-        Retrieve the default LLM model.
+        Retrieve the ID of the default LLM.
         """
-        llm = await self.llm_service.get_model()
+        llm = await self.llm_service.get_llm_or_default()
+        return llm.id
+
+    async def get_llm(self, llm_id: str = None):
+        """
+        Retrieve the LLM model (or the default one) with its fallback chain.
+        """
+        llm = await self.llm_service.get_model_chain(llm_id)
         return llm
         
     
\ No newline at end of file
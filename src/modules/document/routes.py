@@ -378,6 +378,7 @@ async def get_executions_by_doc_id(document_id: str,
         
 @router.post("/{document_id}/generate")
 async def generate_document_structure_endpoint(document_id: str,
+                                                  bypass_cache: bool = False,
                                                   session: Session = Depends(get_session),
                                                   transaction_id: str = Depends(get_transaction_id)):
      """
@@ -386,7 +387,7 @@ async def generate_document_structure_endpoint(document_id: str,
      """
      document_service = DocumentService(session)
      try:
-          updated_document = await document_service.generate_document_structure(document_id)
+          updated_document = await document_service.generate_document_structure(document_id, bypass_cache)
           return ResponseSchema(
                 transaction_id=transaction_id,
                 data=jsonable_encoder(updated_document)
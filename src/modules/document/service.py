@@ -269,7 +269,7 @@ class DocumentService:
         
         return document
     
-    async def generate_document_structure(self, document_id: str):
+    async def generate_document_structure(self, document_id: str, bypass_cache: bool = False):
         """
         Generate the structure of a document based on its template.
         """
@@ -278,7 +278,8 @@ class DocumentService:
             raise ValueError(f"Document with ID {document_id} not found.")
         
         generation_service = GenerationService(self.session)
-        structure = await generation_service.generate_document_structure(document.name, document.description)
+        structure = await generation_service.generate_document_structure(document.name, document.description,
+                                                                         bypass_cache)
         
         document = await self.save_generated_structure(document_id, structure)
         return document
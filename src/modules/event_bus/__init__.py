@@ -0,0 +1,16 @@
+from functools import lru_cache
+from .base import EventBus, Subscription
+from .memory import InMemoryEventBus
+from .postgres import PostgresEventBus
+from src.config import system_config
+
+@lru_cache(maxsize=1)
+def get_event_bus() -> EventBus:
+    backend = system_config.EVENT_BUS
+
+    if backend == "postgres":
+        return PostgresEventBus()
+    if backend == "memory":
+        return InMemoryEventBus()
+
+    raise ValueError(f"EVENT_BUS '{backend}' no soportado")
@@ -0,0 +1,131 @@
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.config import system_config
+import asyncio
+
+
+class Subscription:
+    """
+    Events received on a channel by one subscriber, in arrival order.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def put(self, event: dict) -> None:
+        self._queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self._queue.get()
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> dict:
+        return await self.get()
+
+
+class EventBus(ABC):
+    """
+    Publish/subscribe bus for JSON events. Subscribers of a channel in this
+    process share one listener and events are fanned out to each of them.
+
+    Events published with log=True are numbered by the log with the next
+    sequential "seq" numbers of the channel, so publishers in different
+    processes never collide, and kept in a bounded per-channel log (the last
+    log_size events) so clients that reconnect can replay what they missed.
+    """
+
+    def __init__(self, log_size: int = None):
+        self._subscriptions: dict[str, set[Subscription]] = {}
+        self._lock = asyncio.Lock()
+        self.log_size = log_size or system_config.EVENT_LOG_SIZE
+
+    async def publish(self, channel: str, event: dict, log: bool = False) -> dict:
+        """
+        Publish an event. Returns it as published (with its seq when logged).
+        """
+        published = await self.publish_many(channel, [event], log=log)
+        return published[0]
+
+    @abstractmethod
+    async def publish_many(self, channel: str, events: list[dict], log: bool = False) -> list[dict]:
+        """
+        Publish events in order, in one write when logged. Returns them as
+        published (with their seq when logged).
+        """
+        ...
+
+    @abstractmethod
+    async def publish_on_commit(self, session: AsyncSession, channel: str, event: dict) -> None:
+        """
+        Publish an event when the transaction of the session commits, so
+        subscribers never see it before the rows written with it. Nothing is
+        published if the transaction rolls back.
+        """
+        ...
+
+    @abstractmethod
+    async def replay(self, channel: str, after_seq: int) -> list[dict]:
+        """
+        Return the logged events of a channel with seq greater than after_seq, in order.
+        """
+        ...
+
+    @abstractmethod
+    async def last_seq(self, channel: str) -> int:
+        """
+        Return the seq of the last logged event of a channel, 0 if there is none.
+        """
+        ...
+
+    @abstractmethod
+    async def expire_log(self, max_age_seconds: float) -> int:
+        """
+        Delete the logged events older than max_age_seconds, e.g. those of
+        executions that finished long ago. Returns the number of events deleted.
+        """
+        ...
+
+    @abstractmethod
+    async def _listen(self, channel: str) -> None:
+        """
+        Start receiving events of a channel in this process.
+        """
+        ...
+
+    @abstractmethod
+    async def _unlisten(self, channel: str) -> None:
+        """
+        Stop receiving events of a channel in this process.
+        """
+        ...
+
+    def _deliver(self, channel: str, event: dict) -> None:
+        for subscription in self._subscriptions.get(channel, ()):
+            subscription.put(event)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[Subscription]:
+        """
+        Subscribe to a channel. Events published after entering are received.
+        """
+        subscription = Subscription(channel)
+        async with self._lock:
+            if channel not in self._subscriptions:
+                await self._listen(channel)
+                self._subscriptions[channel] = set()
+            self._subscriptions[channel].add(subscription)
+        try:
+            yield subscription
+        finally:
+            async with self._lock:
+                subscriptions = self._subscriptions.get(channel)
+                if subscriptions is not None:
+                    subscriptions.discard(subscription)
+                    if not subscriptions:
+                        del self._subscriptions[channel]
+                        await self._unlisten(channel)
@@ -0,0 +1,55 @@
+from collections import defaultdict, deque
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import AsyncSession
+from .base import EventBus
+import asyncio
+import time
+
+
+class InMemoryEventBus(EventBus):
+    """
+    Event bus for a single process, e.g. when the API and the worker run together.
+    """
+
+    def __init__(self, log_size: int = None):
+        super().__init__(log_size)
+        self._logs: dict[str, deque] = defaultdict(lambda: deque(maxlen=self.log_size))
+        self._logged_at: dict[str, float] = {}
+
+    async def publish_many(self, channel: str, events: list[dict], log: bool = False) -> list[dict]:
+        if log:
+            last_seq = await self.last_seq(channel)
+            events = [{**event, "seq": last_seq + index} for index, event in enumerate(events, 1)]
+            self._logs[channel].extend(events)
+            self._logged_at[channel] = time.monotonic()
+        for event in events:
+            self._deliver(channel, event)
+        return events
+
+    async def publish_on_commit(self, session: AsyncSession, channel: str, event: dict) -> None:
+        loop = asyncio.get_running_loop()
+        sa_event.listen(session.sync_session, "after_commit",
+                        lambda _: loop.call_soon(self._deliver, channel, event), once=True)
+
+    async def replay(self, channel: str, after_seq: int) -> list[dict]:
+        return [event for event in self._logs.get(channel, ()) if event["seq"] > after_seq]
+
+    async def last_seq(self, channel: str) -> int:
+        events = self._logs.get(channel)
+        return events[-1]["seq"] if events else 0
+
+    async def expire_log(self, max_age_seconds: float) -> int:
+        # Los canales se borran enteros cuando su último evento es más viejo que max_age_seconds
+        limit = time.monotonic() - max_age_seconds
+        expired = [channel for channel, logged_at in self._logged_at.items() if logged_at < limit]
+        deleted = 0
+        for channel in expired:
+            deleted += len(self._logs.pop(channel, ()))
+            del self._logged_at[channel]
+        return deleted
+
+    async def _listen(self, channel: str) -> None:
+        return None
+
+    async def _unlisten(self, channel: str) -> None:
+        return None
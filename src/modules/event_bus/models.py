@@ -0,0 +1,20 @@
+from src.database.base_model import Base
+from sqlalchemy import Column, String, Integer, Text, DateTime, Index
+from sqlalchemy.sql import func
+
+
+class EventLog(Base):
+    """
+    Bounded log of the events published on a channel, used to replay the events
+    a client missed. Rows are written by the event bus together with the NOTIFY.
+    """
+    __tablename__ = "event_log"
+
+    channel = Column(String(63), primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_event_log_created_at", "created_at"),
+    )
@@ -0,0 +1,212 @@
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.config import system_config
+from .base import EventBus
+import asyncpg
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Postgres limita el payload de NOTIFY a 8000 bytes
+MAX_PAYLOAD_BYTES = 7999
+# Cada cuántos eventos se recorta el log de un canal
+LOG_TRIM_EVERY = 100
+# Clave del NOTIFY que, en lugar del evento, indica el seq de su fila en el log
+REF_KEY = "_ref"
+
+
+class PostgresEventBus(EventBus):
+    """
+    Event bus over Postgres LISTEN/NOTIFY, so events published by a worker reach
+    subscribers in any API process. Each process keeps one connection for
+    LISTEN and a small pool for NOTIFY.
+
+    Logged events are inserted in the event_log table in the same transaction
+    as their NOTIFY, so every event a subscriber receives is already replayable.
+    Events too large for a NOTIFY payload are always written to the log and
+    only a reference to them is notified; subscribers read them from the log,
+    keeping the order of the channel.
+    """
+
+    def __init__(self, dsn: str = None, log_size: int = None):
+        super().__init__(log_size)
+        self.dsn = dsn or system_config.ALEMBIC_DATABASE_URL
+        self._pool: Optional[asyncpg.Pool] = None
+        self._listener: Optional[asyncpg.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        # Entregas de cada canal que esperan leer un evento del log
+        self._pending_deliveries: dict[str, asyncio.Task] = {}
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        async with self._connect_lock:
+            if self._pool is None:
+                self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=4)
+            return self._pool
+
+    async def _get_listener(self) -> asyncpg.Connection:
+        async with self._connect_lock:
+            if self._listener is None or self._listener.is_closed():
+                self._listener = await asyncpg.connect(self.dsn)
+                self._listener.add_termination_listener(self._on_listener_closed)
+            return self._listener
+
+    def _on_listener_closed(self, connection: asyncpg.Connection) -> None:
+        logger.warning("Event bus listener connection closed, reconnecting")
+        asyncio.get_running_loop().create_task(self._relisten())
+
+    async def _relisten(self) -> None:
+        """
+        Reconnect the listener and listen again on the channels with subscribers.
+        """
+        delay = 1
+        while self._subscriptions:
+            try:
+                listener = await self._get_listener()
+                for channel in list(self._subscriptions):
+                    await listener.add_listener(channel, self._on_notification)
+                return
+            except Exception as e:
+                logger.warning("Event bus reconnection failed: %s", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def _on_notification(self, connection, pid, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Invalid event payload on channel %s", channel)
+            return
+        previous = self._pending_deliveries.get(channel)
+        if REF_KEY not in event and previous is None:
+            self._deliver(channel, event)
+            return
+        # Los eventos que siguen a una referencia esperan a que se lea del log
+        self._pending_deliveries[channel] = asyncio.get_running_loop().create_task(
+            self._deliver_in_order(channel, event, previous)
+        )
+
+    async def _deliver_in_order(self, channel: str, event: dict, previous: Optional[asyncio.Task]) -> None:
+        try:
+            if previous is not None:
+                await asyncio.gather(previous, return_exceptions=True)
+            if REF_KEY in event:
+                event = await self._read_logged(channel, event[REF_KEY])
+            if event is not None:
+                self._deliver(channel, event)
+        finally:
+            if self._pending_deliveries.get(channel) is asyncio.current_task():
+                del self._pending_deliveries[channel]
+
+    async def _read_logged(self, channel: str, seq: int) -> Optional[dict]:
+        try:
+            pool = await self._get_pool()
+            payload = await pool.fetchval(
+                "SELECT payload FROM event_log WHERE channel = $1 AND seq = $2", channel, seq
+            )
+        except Exception as e:
+            logger.warning("Could not read event %s of channel %s from the log: %s", seq, channel, e)
+            return None
+        if payload is None:
+            logger.warning("Event %s of channel %s is no longer in the log", seq, channel)
+            return None
+        return json.loads(payload)
+
+    @staticmethod
+    def _encode(event: dict) -> str:
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+    @staticmethod
+    def _fits(payload: str) -> bool:
+        return len(payload.encode("utf-8")) <= MAX_PAYLOAD_BYTES
+
+    @classmethod
+    def _notification(cls, event: dict, payload: str) -> str:
+        # Si el evento no entra en un NOTIFY se envía una referencia a su fila del log
+        return payload if cls._fits(payload) else cls._encode({REF_KEY: event["seq"]})
+
+    async def publish_many(self, channel: str, events: list[dict], log: bool = False) -> list[dict]:
+        if not events:
+            return []
+        pool = await self._get_pool()
+        if not log:
+            payloads = [self._encode(event) for event in events]
+            if all(self._fits(payload) for payload in payloads):
+                for payload in payloads:
+                    await pool.execute("SELECT pg_notify($1, $2)", channel, payload)
+                return events
+            # Algún evento no entra en un NOTIFY: se escriben en el log para enviar referencias
+        async with pool.acquire() as connection:
+            async with connection.transaction():
+                # Los publicadores del canal se turnan hasta el commit, así la
+                # numeración no choca y los NOTIFY llegan en orden
+                await connection.execute("SELECT pg_advisory_xact_lock(hashtext($1))", channel)
+                last_seq = await connection.fetchval(
+                    "SELECT coalesce(max(seq), 0) FROM event_log WHERE channel = $1", channel
+                )
+                events = [{**event, "seq": last_seq + index} for index, event in enumerate(events, 1)]
+                payloads = [self._encode(event) for event in events]
+                await connection.executemany(
+                    "INSERT INTO event_log (channel, seq, payload) VALUES ($1, $2, $3)",
+                    [(channel, event["seq"], payload) for event, payload in zip(events, payloads)]
+                )
+                # Recortar el log cuando la numeración pasa por un múltiplo de LOG_TRIM_EVERY
+                if last_seq // LOG_TRIM_EVERY != events[-1]["seq"] // LOG_TRIM_EVERY:
+                    await connection.execute(
+                        "DELETE FROM event_log WHERE channel = $1 AND seq <= $2",
+                        channel, events[-1]["seq"] - self.log_size
+                    )
+                for event, payload in zip(events, payloads):
+                    await connection.execute("SELECT pg_notify($1, $2)", channel,
+                                             self._notification(event, payload))
+        return events
+
+    async def publish_on_commit(self, session: AsyncSession, channel: str, event: dict) -> None:
+        payload = self._encode(event)
+        if not self._fits(payload):
+            # Se escribe en el log dentro de la misma transacción y se notifica una referencia
+            await session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:channel))"), {"channel": channel})
+            last_seq = await session.scalar(
+                text("SELECT coalesce(max(seq), 0) FROM event_log WHERE channel = :channel"), {"channel": channel}
+            )
+            event = {**event, "seq": last_seq + 1}
+            payload = self._encode(event)
+            await session.execute(
+                text("INSERT INTO event_log (channel, seq, payload) VALUES (:channel, :seq, :payload)"),
+                {"channel": channel, "seq": event["seq"], "payload": payload}
+            )
+            payload = self._notification(event, payload)
+        # Postgres entrega el NOTIFY recién cuando la transacción hace commit
+        await session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                              {"channel": channel, "payload": payload})
+
+    async def replay(self, channel: str, after_seq: int) -> list[dict]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            "SELECT payload FROM event_log WHERE channel = $1 AND seq > $2 ORDER BY seq",
+            channel, after_seq
+        )
+        return [json.loads(row["payload"]) for row in rows]
+
+    async def last_seq(self, channel: str) -> int:
+        pool = await self._get_pool()
+        seq = await pool.fetchval("SELECT max(seq) FROM event_log WHERE channel = $1", channel)
+        return seq or 0
+
+    async def expire_log(self, max_age_seconds: float) -> int:
+        pool = await self._get_pool()
+        result = await pool.execute(
+            "DELETE FROM event_log WHERE created_at < now() - make_interval(secs => $1)",
+            float(max_age_seconds)
+        )
+        return int(result.split()[-1])
+
+    async def _listen(self, channel: str) -> None:
+        listener = await self._get_listener()
+        await listener.add_listener(channel, self._on_notification)
+
+    async def _unlisten(self, channel: str) -> None:
+        if self._listener is not None and not self._listener.is_closed():
+            await self._listener.remove_listener(channel, self._on_notification)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Enum as SAEnum
+from sqlalchemy import Column, DateTime, String, ForeignKey, Integer, Float, Enum as SAEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from src.database.base_model import BaseModel
@@ -9,6 +9,7 @@ class Status(Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    TIMED_OUT = "timed_out"  # Se agotó el plazo de la ejecución
     APPROVED = "approved"    
 
 
@@ -20,9 +21,19 @@ class Execution(BaseModel):
     status_message = Column(String, nullable=True)
     document_id = Column(UUID(as_uuid=True), ForeignKey("document.id"), nullable=False)
     model_id = Column(UUID(as_uuid=True), ForeignKey("llm.id"), nullable=True)
+    batch_id = Column(UUID(as_uuid=True), ForeignKey("generation_batch.id", ondelete="SET NULL"), nullable=True, index=True)
+    # Suma del uso de las secciones, se recalcula al guardarlas
+    input_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    cached_tokens = Column(Integer, nullable=True)
+    cost = Column(Float, nullable=True)
+    llm_latency_ms = Column(Integer, nullable=True) # Suma de las latencias de las llamadas al LLM
+    # Latido del proceso (API o worker) que corre la ejecución, para saber si sigue vivo
+    heartbeat_at = Column(DateTime, nullable=True)
     
     document = relationship("Document", back_populates="executions")
     model = relationship("LLM", back_populates="executions")
+    batch = relationship("GenerationBatch", back_populates="executions")
     sections_executions = relationship("SectionExecution", back_populates="execution", cascade="all, delete-orphan")
     
     def __repr__(self):
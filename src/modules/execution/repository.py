@@ -1,14 +1,22 @@
 from src.database.base_repo import BaseRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import func, update
 from sqlalchemy.orm import joinedload
+from datetime import timedelta
 from .models import Execution, Status
+from src.modules.section_execution.models import SectionExecutionUsage
 import asyncio
 
 class ExecutionRepo(BaseRepository[Execution]):
     def __init__(self, session: AsyncSession):
         super().__init__(session, Execution)
         
+    async def add_all(self, executions: list[Execution]) -> list[Execution]:
+        self.session.add_all(executions)
+        await self.session.flush()
+        return executions
+    
     async def get_executions_by_doc_id(self, document_id: str)-> list:
         """
         Retrieve all executions for a specific document.
@@ -44,7 +52,14 @@ class ExecutionRepo(BaseRepository[Execution]):
             "updated_at": execution.updated_at,
             "document_name": execution.document.name,
             "instruction": execution.user_instruction,
-            "llm_id": execution.model_id
+            "llm_id": execution.model_id,
+            "usage": {
+                "input_tokens": execution.input_tokens,
+                "output_tokens": execution.output_tokens,
+                "cached_tokens": execution.cached_tokens,
+                "cost": execution.cost,
+                "llm_latency_ms": execution.llm_latency_ms,
+            }
         }
         
         if execution.status == Status.PENDING or execution.status == Status.RUNNING:
@@ -69,7 +84,16 @@ class ExecutionRepo(BaseRepository[Execution]):
                     "section_execution_id": section_exec.id,
                     "name": section_exec.name,
                     "prompt": section_exec.prompt,
-                    "output": output
+                    "output": output,
+                    "usage": {
+                        "model_id": section_exec.model_id,
+                        "input_tokens": section_exec.input_tokens,
+                        "output_tokens": section_exec.output_tokens,
+                        "cached_tokens": section_exec.cached_tokens,
+                        "ttft_ms": section_exec.ttft_ms,
+                        "latency_ms": section_exec.latency_ms,
+                        "cost": section_exec.cost,
+                    }
                 })
             result_dict["sections"] = sections
         return result_dict
@@ -119,6 +143,44 @@ class ExecutionRepo(BaseRepository[Execution]):
         return execution
     
     
+    async def touch_heartbeat(self, execution_id: str) -> None:
+        """
+        Record that the process running the execution is still alive.
+        """
+        await self.session.execute(
+            update(self.model).where(self.model.id == execution_id).values(heartbeat_at=func.now())
+        )
+
+    async def is_heartbeat_stale(self, execution_id: str, stale_seconds: float) -> bool:
+        """
+        Check whether the execution had no heartbeat for stale_seconds. Executions
+        that never had one fall back to their last update.
+        """
+        last_seen = func.coalesce(self.model.heartbeat_at, self.model.updated_at)
+        result = await self.session.execute(
+            select(last_seen < func.now() - timedelta(seconds=stale_seconds)).where(self.model.id == execution_id)
+        )
+        return bool(result.scalar_one_or_none())
+    
+    async def refresh_usage(self, execution_id: str) -> None:
+        """
+        Recompute the usage totals of an execution from the usage of its LLM calls.
+        """
+        totals = (await self.session.execute(
+            select(func.sum(SectionExecutionUsage.input_tokens),
+                   func.sum(SectionExecutionUsage.output_tokens),
+                   func.sum(SectionExecutionUsage.cached_tokens),
+                   func.sum(SectionExecutionUsage.cost),
+                   func.sum(SectionExecutionUsage.latency_ms))
+            .where(SectionExecutionUsage.execution_id == execution_id)
+        )).one()
+        await self.session.execute(
+            update(self.model)
+            .where(self.model.id == execution_id)
+            .values(input_tokens=totals[0], output_tokens=totals[1], cached_tokens=totals[2],
+                    cost=totals[3], llm_latency_ms=totals[4])
+        )
+    
     async def get_execution_to_chunking(self, execution_id: str) -> Execution:
         """
         Retrieve an execution by its ID with the associated section executions
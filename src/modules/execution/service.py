@@ -5,6 +5,7 @@ from src.modules.docx_template.service import DocxTemplateService
 from src.modules.llm.service import LLMService
 from src.modules.search.service import ChunkService
 from .models import Execution, Status
+from src.config import system_config
 from src.modules.section_execution.models import SectionExecution
 from docx import Document
 from docx.enum.text import WD_ALIGN_PARAGRAPH
@@ -68,6 +69,18 @@ class ExecutionService:
             raise ValueError(f"Execution with ID {execution_id} not found.")
         return execution
     
+    async def touch_heartbeat(self, execution_id: str) -> None:
+        """
+        Record that the process running the execution is still alive.
+        """
+        await self.execution_repo.touch_heartbeat(execution_id)
+    
+    async def is_abandoned(self, execution_id: str) -> bool:
+        """
+        Check whether the process running the execution stopped sending heartbeats.
+        """
+        return await self.execution_repo.is_heartbeat_stale(execution_id, system_config.EXECUTION_STALE_SECONDS)
+    
     async def get_execution_object(self, execution_id: str, with_model: bool = False):
         """
         Retrieve an execution object by its ID.
@@ -383,3 +396,9 @@ class ExecutionService:
         
         updated_execution = await self.execution_repo.update(execution)
         return updated_execution
+    
+    async def refresh_usage(self, execution_id: str) -> None:
+        """
+        Recompute the token, cost and latency totals of an execution from its sections.
+        """
+        await self.execution_repo.refresh_usage(execution_id)
@@ -0,0 +1,124 @@
+from typing import Optional
+from src.modules.event_bus import EventBus, get_event_bus
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Los tokens se juntan y se publican cada tanto tiempo o al sumar tantos caracteres
+CONTENT_FLUSH_SECONDS = 0.1
+CONTENT_FLUSH_CHARS = 2000
+
+
+def section_event(event: str, section_id: str = None, **data) -> dict:
+    """
+    Build a generation event. Nodes send it through the graph stream writer and
+    the run publishes it to the execution channel.
+    """
+    return {"event": event, "section_id": section_id, **data}
+
+
+def execution_channel(execution_id: str) -> str:
+    """
+    Name of the event bus channel of an execution.
+    """
+    return f"execution_{str(execution_id).replace('-', '')}"
+
+
+def is_final_event(event: dict) -> bool:
+    """
+    Whether the event marks the end of a run.
+    """
+    return event.get("event") == "end"
+
+
+def format_sse(event: dict) -> str:
+    """
+    Format a published generation event as an SSE message with a JSON envelope
+    that carries the sequence number and the section ID:
+
+        id: 3
+        event: content
+        data: {"seq": 3, "section_id": "...", "content": "..."}
+
+    Events that were not published (streams outside the generation graph) have
+    no sequence number and are sent without the id line.
+    """
+    data = dict(event)
+    name = data.pop("event", "info")
+    message = f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    if data.get("seq") is None:
+        return message
+    return f"id: {data['seq']}\n{message}"
+
+
+class ExecutionEvents:
+    """
+    Publisher of the events of one run of an execution. It sends them, in
+    order, to the execution channel of the event bus, where they are numbered
+    and logged for replay. Numbering continues after the events of earlier runs
+    of the same execution (resume, regeneration), also when two runs publish
+    at the same time.
+
+    Token ("content") events are not published one by one: the tokens of each
+    section are joined and published every CONTENT_FLUSH_SECONDS, or sooner
+    when CONTENT_FLUSH_CHARS are waiting, in one write to the bus. Buffered
+    tokens are always published before any other event, so a section's
+    content never arrives after its later events. Publishing a token does not
+    wait for the bus, so the graph is not slowed down by it.
+    """
+
+    def __init__(self, execution_id: str, bus: EventBus = None):
+        self.channel = execution_channel(execution_id)
+        self.bus = bus or get_event_bus()
+        self._lock = asyncio.Lock()
+        self._content: dict[str, list[str]] = {}
+        self._content_chars = 0
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def publish(self, event: dict) -> Optional[dict]:
+        """
+        Publish an event. Token events are buffered and None is returned for them.
+        """
+        if event.get("event") == "content":
+            self._content.setdefault(event.get("section_id"), []).append(event.get("content") or "")
+            self._content_chars += len(event.get("content") or "")
+            if self._content_chars >= CONTENT_FLUSH_CHARS:
+                await self.flush()
+            elif self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush_later())
+            return None
+        published = await self._publish([event])
+        return published[-1]
+
+    async def flush(self) -> None:
+        """
+        Publish the buffered tokens.
+        """
+        await self._publish([])
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(CONTENT_FLUSH_SECONDS)
+        self._flush_task = None
+        await self.flush()
+
+    def _take_content(self) -> list[dict]:
+        content = [section_event("content", section_id, content="".join(tokens))
+                   for section_id, tokens in self._content.items()]
+        self._content = {}
+        self._content_chars = 0
+        return content
+
+    async def _publish(self, events: list[dict]) -> list[dict]:
+        async with self._lock:
+            # Los tokens pendientes van antes que cualquier otro evento
+            events = self._take_content() + events
+            if not events:
+                return []
+            try:
+                return await self.bus.publish_many(self.channel, events, log=True)
+            except Exception as e:
+                # El progreso es best effort, no debe cortar la ejecución
+                logger.warning("Could not publish event on %s: %s", self.channel, e)
+                return events
@@ -1,10 +1,27 @@
-from .graph import compiled_graph
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from .graph import build_graph
 from .nodes import State
-from src.database.core import get_graph_session
-from .services import GraphServices
+from src.config import system_config
+from .persistence import RunPersistence
+from .events import ExecutionEvents, section_event, execution_channel, format_sse, is_final_event
+from src.modules.event_bus import Subscription, get_event_bus
 from src.modules.execution.models import Status
 import asyncio
 
+# El grafo tiene un número fijo de pasos (entrypoint -> run_sections -> end_execution),
+# independiente de la cantidad de secciones del documento.
+RECURSION_LIMIT = 10
+# Cada cuántos segundos se envía un keepalive a los clientes SSE sin eventos
+KEEPALIVE_SECONDS = 15
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    The run did not finish within its deadline. Retrying the job would not
+    help, the execution is left timed out to be resumed on demand.
+    """
+    retryable = False
+
 
 def get_state(document_id: str) -> State:
     """
@@ -13,67 +30,177 @@ def get_state(document_id: str) -> State:
     state = State(document_id=document_id)
     return state
 
-def format_event(event: tuple) -> dict:
+def get_config(execution_id: str, persistence: RunPersistence, max_concurrency: int = None,
+               resume: bool = False, bypass_cache: bool = False) -> dict:
     """
-    Format the event for streaming.
+    Build the run config. Each execution is checkpointed in its own thread.
     """
-    if not event:
-        return
-    type_, data = event
-    if type_ == "messages":
-        content, _ = data
-        message = content.content.replace("\n", "\\n")
-        return "event: content\ndata: " + message + "\n\n"
-    elif type_ == "custom":
-        return f"event: info\ndata: {data}\n\n"
+    return {
+        "recursion_limit": RECURSION_LIMIT,
+        "configurable": {
+            "thread_id": str(execution_id),
+            "max_concurrency": max_concurrency,
+            "resume": resume,
+            "bypass_cache": bypass_cache,
+            "persistence": persistence,
+        },
+    }
 
-async def stream_graph(document_id: str, execution_id: str, user_instructions: str = None):
+
+async def get_graph_input(compiled_graph, state: State, config: dict, resume: bool = False) -> State | None:
     """
-    Stream the graph execution.
+    Get the input for the run. When resuming a run that stopped midway, the graph
+    continues from its last checkpoint (None input); otherwise it starts over.
+    In both cases sections already saved in the execution are skipped.
     """
-    state = State(
-        document_id=document_id,
-        execution_id=execution_id,
-        execution_instructions=user_instructions
-    )
-    initial_config = {
-            "recursion_limit": 60,
-        }
-    try:
-        async for event in compiled_graph.astream(state, config=initial_config, stream_mode=["messages", "custom"]):
-            yield format_event(event)
-    except asyncio.CancelledError:
-        raise
-    except Exception as e:
-        async with get_graph_session() as session:
-            service = GraphServices(session)
-            await service.update_execution(execution_id, Status.FAILED, str(e))
-        print(f"Error in stream_graph: {e}")
-        yield f"event: error\ndata: {str(e)}\n\n"
-        return
-    
-    
-async def execute_graph_worker(document_id: str, execution_id: str, user_instructions: str = None):
+    if not resume:
+        return state
+    snapshot = await compiled_graph.aget_state(config)
+    if not snapshot.next:
+        return state
+    persistence: RunPersistence = config["configurable"]["persistence"]
+    persistence.set_status(Status.RUNNING, "Resuming execution")
+    await persistence.flush()
+    return None
+
+
+async def fail_execution(persistence: RunPersistence, error: Exception, status: Status = Status.FAILED) -> None:
+    """
+    Mark the execution as failed (or timed out), writing any section still in the buffer.
+    """
+    persistence.set_status(status, str(error))
+    await persistence.flush()
+
+
+def get_deadline_seconds(deadline_seconds: float = None) -> float | None:
+    """
+    Seconds the whole run may take, falling back to the system default (0 means no deadline).
     """
-    Execute the graph without streaming.
+    return deadline_seconds or system_config.GENERATION_DEADLINE_SECONDS or None
+
+
+async def execute_graph_worker(document_id: str, execution_id: str, user_instructions: str = None,
+                               max_concurrency: int = None, reuse_outputs: bool = False,
+                               target_section_id: str = None, resume: bool = False,
+                               bypass_cache: bool = False, deadline_seconds: float = None):
+    """
+    Run the graph once, publishing its events to the execution channel so any
+    number of clients can watch it.
+    When target_section_id is given only that section and its dependents are regenerated.
+    When resume is set, sections already saved in the execution are not generated again.
+    When bypass_cache is set, sections are always generated by the LLM.
+    The run must finish within deadline_seconds, shared by all its sections; when
+    it runs out the LLM calls in flight are cancelled, the sections already
+    written are saved and the execution is marked as timed out (it can be resumed).
     """
     state = State(
         document_id=document_id,
         execution_id=execution_id,
-        execution_instructions=user_instructions
+        execution_instructions=user_instructions,
+        reuse_outputs=reuse_outputs,
+        target_section_id=target_section_id
     )
-    initial_config = {
-            "recursion_limit": 60,
-        }
+    events = ExecutionEvents(execution_id)
+    persistence = RunPersistence(execution_id, events=events)
+    initial_config = get_config(execution_id, persistence, max_concurrency, resume, bypass_cache)
+    deadline_seconds = get_deadline_seconds(deadline_seconds)
+    deadline = asyncio.timeout(deadline_seconds)
     try:
-        await compiled_graph.ainvoke(state, config=initial_config)
+        async with persistence:
+            async with AsyncPostgresSaver.from_conn_string(system_config.ALEMBIC_DATABASE_URL) as checkpointer:
+                compiled_graph = build_graph().compile(checkpointer=checkpointer)
+                graph_input = await get_graph_input(compiled_graph, state, initial_config, resume)
+                async with deadline:
+                    # Los nodos emiten sus eventos (incluidos los tokens) con el stream writer
+                    async for event in compiled_graph.astream(graph_input, config=initial_config,
+                                                              stream_mode="custom"):
+                        await events.publish(event)
     except Exception as e:
-        async with get_graph_session() as session:
-            service = GraphServices(session)
-            await service.update_execution(execution_id, Status.FAILED, str(e))
+        status = Status.FAILED
+        # Un TimeoutError de una llamada al LLM es un error común, solo el del plazo cambia el estado
+        if isinstance(e, TimeoutError) and deadline.expired():
+            status = Status.TIMED_OUT
+            e = DeadlineExceeded(f"Execution did not finish within its deadline of {deadline_seconds}s")
+        await events.publish(section_event("error", message=str(e)))
+        await fail_execution(persistence, e, status)
         print(f"Error in execute_graph_worker: {e}")
         raise e
     return "Execution completed successfully"
+
+
+async def relay_events(subscription: Subscription, run: asyncio.Task = None, after_seq: int = 0):
+    """
+    Relay the events of an execution channel as SSE messages until the run ends,
+    skipping events up to after_seq (already sent from the event log).
+    When the run task is given, the relay also stops if it finished without
+    publishing its final event.
+    """
+    while True:
+        try:
+            event = await asyncio.wait_for(subscription.get(), timeout=KEEPALIVE_SECONDS)
+        except asyncio.TimeoutError:
+            if run is not None and run.done():
+                return
+            yield ": keepalive\n\n"
+            continue
+        if event.get("seq", 0) <= after_seq:
+            continue
+        yield format_sse(event)
+        if is_final_event(event):
+            return
+
+
+async def stream_graph(document_id: str, execution_id: str, user_instructions: str = None,
+                       max_concurrency: int = None, reuse_outputs: bool = False,
+                       target_section_id: str = None, resume: bool = False,
+                       bypass_cache: bool = False, deadline_seconds: float = None):
+    """
+    Run the graph and stream its events. Other clients can watch the same events
+    with watch_execution. If the client disconnects the run is cancelled.
+    """
+    async with get_event_bus().subscribe(execution_channel(execution_id)) as subscription:
+        run = asyncio.create_task(execute_graph_worker(document_id, execution_id, user_instructions,
+                                                       max_concurrency=max_concurrency,
+                                                       reuse_outputs=reuse_outputs,
+                                                       target_section_id=target_section_id,
+                                                       resume=resume,
+                                                       bypass_cache=bypass_cache,
+                                                       deadline_seconds=deadline_seconds))
+        try:
+            async for message in relay_events(subscription, run):
+                yield message
+        finally:
+            if not run.done():
+                run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+
+
+async def watch_execution(execution_id: str, last_event_id: int = None, follow: bool = True):
+    """
+    Stream the events of an execution running anywhere (API or worker) until it ends.
+    When last_event_id is given, the events after it are replayed from the event
+    log first. If some of them were already dropped from the log, a "reset"
+    event tells the client to reload the execution instead.
+    When follow is False (the execution already finished) only the replay is sent.
+    """
+    bus = get_event_bus()
+    channel = execution_channel(execution_id)
+    async with bus.subscribe(channel) as subscription:
+        after_seq = 0
+        if last_event_id is not None:
+            after_seq = last_event_id
+            missed = await bus.replay(channel, last_event_id)
+            if missed and missed[0]["seq"] > last_event_id + 1:
+                yield format_sse(section_event("reset", seq=missed[0]["seq"] - 1))
+            for event in missed:
+                yield format_sse(event)
+                after_seq = event["seq"]
+                if is_final_event(event):
+                    return
+        if not follow:
+            return
+        async for message in relay_events(subscription, after_seq=after_seq):
+            yield message
     
 
         
@@ -1,56 +1,35 @@
 from langgraph.graph import END, START, StateGraph
-from .nodes import (
-    State, Config, entrypoint, sort_sections, get_dependencies,
-    execute_section, save_section_execution, should_continue, end_execution
-)
+from .nodes import State, Config, entrypoint, run_sections, end_execution
 import asyncio
 
 
-def compile_graph():
+def build_graph() -> StateGraph:
     """
-    Compile the state graph for the execution of sections.
+    Build the state graph for the execution of sections.
     """
     # Create a state graph
     graph = StateGraph(State, config_schema=Config)
     
     # Add nodes to the graph
     graph.add_node("entrypoint", entrypoint)
-    graph.add_node("sort_sections", sort_sections)
-    graph.add_node("get_dependencies", get_dependencies)
-    graph.add_node("execute_section", execute_section)
-    # graph.add_node("eval_update_past_sections", eval_update_past_sections)
-    # graph.add_node("update_past_sections", update_past_sections)
+    graph.add_node("run_sections", run_sections)
     graph.add_node("end_execution", end_execution)
-    graph.add_node("save_section_execution", save_section_execution)
     
     # Add edges to the graph
     graph.add_edge(START, "entrypoint")
-    graph.add_edge("entrypoint", "sort_sections")
-    graph.add_edge("sort_sections", "get_dependencies")
-    graph.add_edge("get_dependencies", "execute_section")
-    graph.add_edge("execute_section", "save_section_execution")
-    # graph.add_edge("execute_section", "eval_update_past_sections")
-    # graph.add_conditional_edges(
-    #     "eval_update_past_sections",
-    #     should_update,
-    #     {
-    #         True: "update_past_sections",
-    #         False: "save_section_execution",
-    #     }
-    # )
-    graph.add_conditional_edges(
-        "save_section_execution",
-        should_continue,
-        {
-            True: "sort_sections",
-            False: "end_execution",
-        }
-    )
-    # graph.add_edge("update_past_sections", "save_section_execution")
+    graph.add_edge("entrypoint", "run_sections")
+    graph.add_edge("run_sections", "end_execution")
     graph.add_edge("end_execution", END)
     
+    return graph
+
+
+def compile_graph():
+    """
+    Compile the state graph for the execution of sections.
+    """
     # Compile the graph
-    compiled_graph = graph.compile(
+    compiled_graph = build_graph().compile(
     )
     return compiled_graph
 
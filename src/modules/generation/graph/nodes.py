@@ -1,132 +1,160 @@
-from typing_extensions import TypedDict, List, Optional
 # from .llms import get_llm
 from src.llm.llm import get_llm
 from langchain_core.language_models import BaseChatModel
 from langgraph.types import Command, StreamWriter
 from .services import GraphServices
-from .utils import topological_sort
-from .prompts import (writer_prompt, past_section_prompt, 
+from .utils import SectionDAG, run_dag, hash_text, section_input_hash
+from .prompts import (past_section_prompt,
                       update_past_section_prompt)
 from .schemas import EvaluateUpdateSection
 from src.database.core import get_graph_session
-from src.modules.document.models import Document
-from src.modules.section.models import Section
+from .state import State, Config, BaseConfig, DocumentSpec, SectionSpec
+from .persistence import RunPersistence
+from .events import section_event
+from .prompt_builder import SectionPromptBuilder
 from src.modules.execution.models import Status
+from src.modules.llm.utils import stream_text, build_prefixed_prompt
+from src.modules.llm.usage import LLMUsage
+from src.modules.llm.concurrency import get_llm_limiter
+from src.modules.llm_cache.service import llm_cache, make_cache_key
+from src.config import system_config
 from rich import print
+import asyncio
 
 # llm = get_llm("gpt-4.1")
 
-class State(TypedDict): 
-    document_id: str
-    execution_id: str
-    execution_instructions: Optional[str]
-    document: Document
-    document_context: str
-    current_section: Section
-    sections: List[Section]
-    sorted_sections_ids: List[dict]
-    should_update: List[dict]
-    llm: BaseChatModel
-    section_outputs: dict  # Diccionario para almacenar outputs de secciones
-    
-class Config(TypedDict):
-    recursion_limit: int
-    
-class BaseConfig(TypedDict):
-    configurable: Config
+def get_max_concurrency(config: BaseConfig) -> int:
+    """
+    Read the per-execution concurrency cap, falling back to the system default.
+    """
+    max_concurrency = (config or {}).get("configurable", {}).get("max_concurrency")
+    if not max_concurrency or max_concurrency < 1:
+        return system_config.GENERATION_MAX_CONCURRENCY
+    return max_concurrency
+
+
+def get_persistence(state: State, config: BaseConfig) -> RunPersistence:
+    """
+    Get the run persistence from the config, or a new one if the graph was
+    invoked without it. Callers flush it before the node ends.
+    """
+    persistence = (config or {}).get("configurable", {}).get("persistence")
+    if persistence is None:
+        persistence = RunPersistence(state['execution_id'])
+    return persistence
 
 
 async def entrypoint(state: State) -> State:
     print("Entrypoint")
     """
-    Entry point for the graph. It retrieves the sections and creates an execution.
+    Entry point for the graph. It marks the execution as running and loads the
+    document, its sections and context into the state.
     """
     async with get_graph_session() as session:
         service = GraphServices(session)
-        state['document'], state['sections'] = await (service.init_execution(state['document_id'],
-                                                                      state['execution_id'], 
-                                                                      state.get('execution_instructions')))
-        state["llm"] = await service.get_llm(state['execution_id'])
+        document, sections = await service.init_execution(state['document_id'],
+                                                          state['execution_id'],
+                                                          state.get('execution_instructions'))
+        state['document'] = DocumentSpec.from_document(document)
+        state['sections'] = [SectionSpec.from_section(section) for section in sections]
+        state['model_id'] = await service.get_model_id(state['execution_id'])
+        state['model_name'] = await service.get_model_name(state['model_id'])
+        state['prompt_token_limit'] = await service.get_prompt_token_limit(state['model_id'])
         state['document_context'] = await service.get_document_context(state['document_id'])
         # Inicializar diccionario para outputs de secciones
         state['section_outputs'] = {}
+        state['output_hashes'] = {}
+        state['section_hashes'] = {}
+        state['prompt_tokens'] = {}
+        state['usage'] = {}
+        state['previous_outputs'] = {}
+        if state.get('target_section_id'):
+            # Las secciones que no se regeneran se copian de la ejecución existente
+            state['section_outputs'] = await service.get_regeneration_outputs(
+                state['execution_id'],
+                state['target_section_id']
+            )
+        if state.get('reuse_outputs'):
+            state['previous_outputs'] = await service.get_reusable_outputs(
+                [section.id for section in state['sections']],
+                state['execution_id']
+            )
     return state
 
 
-def sort_sections(state: State, config: BaseConfig) -> State:
-    print("Sorting sections")
-    """
-    Sort sections based on their dependencies.
-    """
-    if not state.get('sorted_sections_ids', False):
-        print("Ordenando secciones")
-        sorted_sections = topological_sort(state['sections'])
-        sorted_sections_list = []
-        for section_id in sorted_sections:
-            sorted_sections_list.append({
-                "id": section_id,
-                "done": False,
-            })
-        state['sorted_sections_ids'] = sorted_sections_list
-    current_section_id = next((section['id'] for section in 
-                                     state['sorted_sections_ids'] if not section['done']), 
-                                    None)
-    state['current_section'] = next((section for section in state['sections'] 
-                                         if section.id == current_section_id), None)
-    print(state)
-    return state
+def set_section_output(state: State, section_id: str, output: str) -> None:
+    """
+    Store the output of a section and its hash.
+    """
+    state['section_outputs'][section_id] = output
+    state['output_hashes'][section_id] = hash_text(output)
 
 
-async def get_dependencies(state: State, config: BaseConfig) -> State:
+def get_dependencies(state: State, dag: SectionDAG, section: SectionSpec) -> list[str]:
     """
-    Get dependencies for a section.
+    Get the content of the dependencies of a section and compute its input hash.
     """
-    print("Getting dependencies for section:", state['current_section'].name)
-    
-    # Inicializar diccionario si no existe
-    if 'section_outputs' not in state:
-        state['section_outputs'] = {}
-    
+    print("Getting dependencies for section:", section.name)
     dependency_content = []
-    for dependency in state['current_section'].dependencies:
-        print("Dependency:", dependency)
-        print(state['sections'])
-        dep_section = next(filter(lambda x: str(x.id) == dependency["id"], state['sections']), None)
-        if dep_section:
-            # Obtener output del diccionario del state
-            section_output = state['section_outputs'].get(str(dep_section.id), "")
-            dependency_content.append(section_output)
-        else:
-            raise ValueError(f"Dependency with ID {dependency['id']} not found in sections.")
-    state['current_section'].dependencies_content = "\n".join(dependency_content)
-    return state
-    
-async def execute_section(state: State, config: BaseConfig, writer: StreamWriter) -> State:
+    dependency_hashes = []
+    for dependency_id in dag.dependencies[section.id]:
+        # Obtener output del diccionario del state
+        dependency_content.append(state['section_outputs'].get(dependency_id, ""))
+        dependency_hashes.append(state['output_hashes'].get(dependency_id, hash_text("")))
+    state['section_hashes'][section.id] = section_input_hash(
+        name=section.name,
+        prompt=section.prompt,
+        dependency_hashes=dependency_hashes,
+        document_context=state['document_context'],
+        model_id=state.get('model_id'),
+        instructions=state.get('execution_instructions')
+    )
+    return dependency_content
+
+
+async def execute_section(state: State, llm: BaseChatModel, prompt_builder: SectionPromptBuilder,
+                          section: SectionSpec, dependencies: list[str], writer: StreamWriter,
+                          bypass_cache: bool = False) -> str:
     """
-    Write the section using the LLM.
+    Write a single section using the LLM, streaming its tokens tagged with the
+    section ID, and return its content. A response already in the LLM cache for
+    the same prompt and model is sent as a single content event.
+    Token usage and latency of the LLM call are recorded in the state.
     """
-    print("Executing section:", state['current_section'].name)
-    writer({"section_id": str(state['current_section'].id)})
-    section = state['current_section']
-    prompt = writer_prompt.format(
-        document_description=f"{state['document'].name}: {state['document'].description}",
-        context=state['document_context'],
-        past_sections=section.dependencies_content,
+    section_id = section.id
+    previous = state.get('previous_outputs', {}).get(section_id)
+    if previous and previous["input_hash"] == state['section_hashes'].get(section_id):
+        print("Reusing output for section:", section.name)
+        writer(section_event("info", section_id, status="reused"))
+        return previous["output"]
+    
+    print("Executing section:", section.name)
+    section_prompt, prompt_tokens = prompt_builder.build(
         section_description=f"Nombre sección: {section.name}\nDescripción: {section.prompt}",
-        additional_instructions=state.get('execution_instructions', '')
+        dependencies=dependencies
     )
+    state['prompt_tokens'][section_id] = prompt_tokens
+    writer(section_event("info", section_id, status="started", prompt_tokens=prompt_tokens))
     
-    llm = state['llm']
-    print("Executing section:", section.name)
-    response = await llm.ainvoke(prompt)
+    content = []
+    # El prefijo común va primero para que el proveedor lo cachee entre secciones
+    prompt = build_prefixed_prompt(llm, prompt_builder.prefix, section_prompt)
+    usage = LLMUsage(llm_id=state.get('model_id'))
     
-    # Inicializar diccionario si no existe
-    if 'section_outputs' not in state:
-        state['section_outputs'] = {}
+    async def generate():
+        # Cupo del límite global de llamadas al LLM, compartido por todas las ejecuciones
+        async with get_llm_limiter().slot():
+            async for token in stream_text(llm, prompt, usage):
+                yield token
     
-    # Guardar output en el diccionario del state
-    state['section_outputs'][str(section.id)] = response.content
-    return state
+    cache_key = make_cache_key(prompt_builder.prefix + section_prompt, state.get('model_name'))
+    async for token in llm_cache.cached_stream(cache_key, state.get('model_name'), generate, bypass_cache):
+        content.append(token)
+        writer(section_event("content", section_id, content=token))
+    if usage.called:
+        state['usage'][section_id] = usage.as_dict()
+        writer(section_event("info", section_id, status="usage", **usage.as_dict()))
+    return "".join(content)
 
 
 # async def should_update_past_section(current_section: str, past_section: str) -> bool:
@@ -192,52 +220,70 @@ async def execute_section(state: State, config: BaseConfig, writer: StreamWriter
 #     return state
 
 
-async def save_section_execution(state: State, config: BaseConfig) -> State:
+async def run_sections(state: State, config: BaseConfig, writer: StreamWriter) -> State:
     """
-    Save the section execution to the database.
+    Scheduler node: run every pending section as soon as its dependencies are done,
+    up to the concurrency cap. Finished sections are buffered in the run persistence
+    and everything is flushed before the node ends.
+    Sections that already have an output (carried over on regeneration, or already
+    saved in the execution when resuming) are skipped.
     """
     async with get_graph_session() as session:
         service = GraphServices(session)
-        section = state['current_section']
-        
-        # Obtener output del diccionario del state
-        section_output = state['section_outputs'].get(str(section.id), "")
-        
-        await service.save_section_execution(
+        llm = await service.get_llm_client(state['model_id'])
+        saved_outputs = {}
+        if (config or {}).get("configurable", {}).get("resume"):
+            saved_outputs = await service.get_saved_outputs(state['execution_id'])
+    dag = SectionDAG(state['sections'])
+    document = state['document']
+    # El prefijo común (documento, instrucciones y contexto) se arma una sola vez por ejecución
+    prompt_builder = await asyncio.to_thread(SectionPromptBuilder,
+                                             f"{document.name}: {document.description}",
+                                             state['document_context'],
+                                             state['prompt_token_limit'],
+                                             state.get('execution_instructions'))
+    
+    # Inicializar diccionarios si no existen
+    state.setdefault('section_outputs', {})
+    state.setdefault('section_hashes', {})
+    state.setdefault('prompt_tokens', {})
+    state.setdefault('usage', {})
+    state['section_outputs'].update(saved_outputs)
+    state['output_hashes'] = {section_id: hash_text(output) for section_id, output in state['section_outputs'].items()}
+    persistence = get_persistence(state, config)
+    bypass_cache = bool((config or {}).get("configurable", {}).get("bypass_cache"))
+    
+    async def run_section(section_id: str) -> None:
+        section = dag.sections[section_id]
+        dependencies = get_dependencies(state, dag, section)
+        # Guardar output en el diccionario del state
+        set_section_output(state, section_id, await execute_section(state, llm, prompt_builder, section,
+                                                                    dependencies, writer, bypass_cache))
+        writer(section_event("info", section_id, status="completed"))
+        await persistence.add_section(
             section_id=section.id,
             name=section.name,
-            execution_id=state['execution_id'],
-            output=section_output,
+            output=state['section_outputs'][section_id],
             prompt=section.prompt,
-            order=section.order
+            order=section.order,
+            input_hash=state['section_hashes'].get(section_id),
+            prompt_tokens=state['prompt_tokens'].get(section_id),
+            usage=state['usage'].get(section_id)
         )
-
-    for section in state['sorted_sections_ids']:
-        if section['id'] == state['current_section'].id:
-            section['done'] = True
-            break
+    
+    await run_dag(dag,
+                  done_ids=list(state['section_outputs'].keys()),
+                  run_section=run_section,
+                  max_concurrency=get_max_concurrency(config))
+    await persistence.flush()
     return state
-
-
-def should_continue(state: State, config: BaseConfig) -> bool:
-    """
-    Check if there are more sections to process.
-    """
-    if any(section['done'] == False for section in state['sorted_sections_ids']):
-        return True
-    else:
-        return False
     
     
 async def end_execution(state: State, config: BaseConfig) -> State:
     """
     End the execution and update the status.
     """
-    async with get_graph_session() as session:
-        graph_services = GraphServices(session)
-        await graph_services.update_execution(
-            state['execution_id'],
-            status=Status.COMPLETED,
-            status_message="Execution completed successfully"
-        )
+    persistence = get_persistence(state, config)
+    persistence.set_status(Status.COMPLETED, "Execution completed successfully")
+    await persistence.flush()
     return state
\ No newline at end of file
@@ -0,0 +1,137 @@
+from typing import Optional
+from src.database.core import get_graph_session
+from src.modules.execution.models import Status
+from src.config import system_config
+from .services import GraphServices
+from .events import ExecutionEvents, section_event
+import asyncio
+import time
+
+
+class RunPersistence:
+    """
+    Run-scoped unit of work for a generation run. Section outputs and status
+    updates are buffered and written in a single transaction per flush.
+
+    A flush happens when the buffer reaches flush_size sections, every
+    flush_interval seconds while the run is open, and when the run closes.
+    While the run is open a heartbeat is written on the execution every
+    EXECUTION_HEARTBEAT_INTERVAL_SECONDS, so a resume can tell a live run
+    (in the API or in a worker) from an abandoned one.
+
+    If a flush fails the batch stays in the buffer and is written again on the
+    next flush; batches replace previous rows of their sections, so writing one
+    twice is safe (at-least-once).
+
+    When events are given, a "saved" event is published for each written section
+    and an "end" event when a final status (completed, failed or timed out) is written.
+    """
+
+    def __init__(self, execution_id: str, flush_size: int = None, flush_interval: float = None,
+                 events: ExecutionEvents = None):
+        self.execution_id = execution_id
+        self.events = events
+        self.flush_size = flush_size or system_config.GENERATION_FLUSH_SIZE
+        self.flush_interval = flush_interval or system_config.GENERATION_FLUSH_INTERVAL
+        self._sections: list[dict] = []
+        self._status: Optional[tuple[Status, str]] = None
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._last_flush = time.monotonic()
+
+    async def __aenter__(self) -> "RunPersistence":
+        self._timer = asyncio.create_task(self._flush_periodically())
+        self._heartbeat = asyncio.create_task(self._beat_periodically())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if time.monotonic() - self._last_flush < self.flush_interval:
+                continue
+            try:
+                await self.flush()
+            except Exception as e:
+                # Se reintenta en el próximo flush
+                print(f"Error flushing execution {self.execution_id}: {e}")
+
+    async def _beat_periodically(self) -> None:
+        while True:
+            try:
+                async with get_graph_session() as session:
+                    await GraphServices(session).touch_execution(self.execution_id)
+            except Exception as e:
+                print(f"Error writing the heartbeat of execution {self.execution_id}: {e}")
+            await asyncio.sleep(system_config.EXECUTION_HEARTBEAT_INTERVAL_SECONDS)
+
+    async def add_section(self, section_id: str, name: str, output: str, prompt: str, order: int,
+                          input_hash: str = None, prompt_tokens: dict = None, usage: dict = None) -> None:
+        """
+        Buffer the output of a section, flushing when the batch is full.
+        """
+        self._sections.append({
+            "section_id": section_id,
+            "name": name,
+            "output": output,
+            "prompt": prompt,
+            "order": order,
+            "input_hash": input_hash,
+            "prompt_tokens": prompt_tokens,
+            "usage": usage,
+        })
+        if len(self._sections) >= self.flush_size:
+            await self.flush()
+
+    def set_status(self, status: Status, status_message: str) -> None:
+        """
+        Buffer a status update of the execution. Only the latest one is written.
+        """
+        self._status = (status, status_message)
+
+    async def flush(self) -> None:
+        """
+        Write the buffered sections and status update in one transaction.
+        """
+        async with self._lock:
+            sections, status = self._sections, self._status
+            if not sections and status is None:
+                return
+            self._sections, self._status = [], None
+            try:
+                async with get_graph_session() as session:
+                    service = GraphServices(session)
+                    if sections:
+                        await service.save_section_executions(self.execution_id, sections)
+                    if status is not None:
+                        await service.update_execution(self.execution_id, *status)
+            except Exception:
+                # Devolver el lote al buffer para no perderlo
+                self._sections = sections + self._sections
+                if self._status is None:
+                    self._status = status
+                raise
+            self._last_flush = time.monotonic()
+            await self._publish_flushed(sections, status)
+
+    async def _publish_flushed(self, sections: list[dict], status: Optional[tuple[Status, str]]) -> None:
+        if self.events is None:
+            return
+        for section in sections:
+            await self.events.publish(section_event("info", str(section["section_id"]), status="saved"))
+        if status is not None and status[0] in (Status.COMPLETED, Status.FAILED, Status.TIMED_OUT):
+            await self.events.publish(section_event("end", status=status[0].value, message=status[1]))
+
+    async def close(self) -> None:
+        """
+        Stop the periodic flush and the heartbeat and write whatever is left in the buffer.
+        """
+        for task in (self._timer, self._heartbeat):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._timer = self._heartbeat = None
+        await self.flush()
@@ -0,0 +1,117 @@
+from src.modules.search.service import count_tokens, encode, decode
+from .prompts import writer_prefix_prompt, writer_section_prompt
+
+TRUNCATION_MARKER = "\n[...]"
+# Parte del presupuesto de tokens reservada para lo propio de cada sección
+SECTION_BUDGET_SHARE = 0.5
+
+
+def truncate_tokens(tokens: list[int], max_tokens: int) -> str:
+    """
+    Keep the first max_tokens tokens of a text, marking that it was cut.
+    """
+    if len(tokens) <= max_tokens:
+        return decode(tokens)
+    if max_tokens <= 0:
+        return ""
+    return decode(tokens[:max_tokens]) + TRUNCATION_MARKER
+
+
+def share_budget(sizes: list[int], budget: int) -> list[int]:
+    """
+    Split a token budget between parts: parts smaller than an equal share keep
+    their size and what they leave is shared among the larger ones.
+    """
+    limits = [0] * len(sizes)
+    pending = sorted(range(len(sizes)), key=lambda idx: sizes[idx])
+    while pending:
+        share = budget // len(pending)
+        idx = pending.pop(0)
+        limits[idx] = min(sizes[idx], share)
+        budget -= limits[idx]
+    return limits
+
+
+class SectionPromptBuilder:
+    """
+    Build the writer prompt of the sections of one run within the token limit
+    of the model.
+
+    The prompt is split in a prefix shared by every section (document
+    description, additional instructions and document context) and the part of
+    each section (dependency sections and section description). The prefix is
+    built once per run and goes first, so it is byte-identical across sections
+    and providers can cache it.
+
+    The prefix may use at most the share of the budget not reserved for the
+    sections (section_share); its components are kept whole in order of priority
+    until that runs out, the first one that does not fit is trimmed and the rest
+    are left empty. Each section then uses what the prefix left: the section
+    description first and the rest shared between the dependency sections, so a
+    long one does not push out the others.
+    """
+
+    def __init__(self, document_description: str, context: str, max_tokens: int,
+                 additional_instructions: str = None, section_share: float = SECTION_BUDGET_SHARE):
+        self.max_tokens = max_tokens
+        self.template_tokens = count_tokens(writer_prefix_prompt.format(
+            document_description="",
+            additional_instructions="",
+            context=""
+        )) + count_tokens(writer_section_prompt.format(
+            past_sections="",
+            section_description=""
+        ))
+        budget = max(max_tokens - self.template_tokens, 0)
+        prefix_budget = budget - int(budget * section_share)
+        self.prefix_usage = {}
+        self.prefix_trimmed = []
+
+        def take(name: str, text: str) -> str:
+            nonlocal prefix_budget
+            tokens = encode(text or "")
+            used = min(len(tokens), prefix_budget)
+            if used < len(tokens):
+                self.prefix_trimmed.append(name)
+            prefix_budget -= used
+            self.prefix_usage[name] = used
+            return truncate_tokens(tokens, used)
+
+        self.prefix = writer_prefix_prompt.format(
+            document_description=take("document_description", document_description),
+            additional_instructions=take("additional_instructions", additional_instructions),
+            context=take("context", context)
+        )
+        self.section_budget = budget - sum(self.prefix_usage.values())
+
+    def build(self, section_description: str, dependencies: list[str]) -> tuple[str, dict]:
+        """
+        Return the part of the prompt of a section (to send after the prefix) and
+        the tokens used by each component of the whole prompt.
+        """
+        budget = self.section_budget
+        usage = {"template": self.template_tokens, **self.prefix_usage}
+        trimmed = list(self.prefix_trimmed)
+
+        section_tokens = encode(section_description)
+        section_text = truncate_tokens(section_tokens, budget)
+        usage["section_description"] = min(len(section_tokens), budget)
+        if usage["section_description"] < len(section_tokens):
+            trimmed.append("section_description")
+        budget -= usage["section_description"]
+
+        dependency_tokens = [encode(dependency) for dependency in dependencies]
+        limits = share_budget([len(tokens) for tokens in dependency_tokens], budget)
+        dependency_texts = [truncate_tokens(tokens, limit) for tokens, limit in zip(dependency_tokens, limits)]
+        if any(limit < len(tokens) for tokens, limit in zip(dependency_tokens, limits)):
+            trimmed.append("past_sections")
+        usage["past_sections"] = sum(limits)
+
+        prompt = writer_section_prompt.format(
+            past_sections="\n".join(dependency_texts),
+            section_description=section_text
+        )
+        usage["total"] = sum(usage.values())
+        if trimmed:
+            usage["trimmed"] = trimmed
+        return prompt, usage
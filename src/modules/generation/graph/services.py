@@ -1,9 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from langchain_core.language_models import BaseChatModel
 from src.modules.document.service import DocumentService
 from src.modules.section.service import SectionService
 from src.modules.execution.service import ExecutionService
 from src.modules.section_execution.service import SectionExecutionService
 from src.modules.llm.service import LLMService
+from src.modules.llm.fallback import FallbackChatModel
+from src.modules.llm.usage import compute_cost
+from src.modules.job.service import JobService
 from src.modules.execution.models import Status, Execution
 from src.modules.section.models import Section
 from src.modules.document.models import Document
@@ -17,6 +21,7 @@ class GraphServices():
         self.execution_service = ExecutionService(session)
         self.llm_service = LLMService(session)
         self.section_exec_service = SectionExecutionService(session)
+        self.job_service = JobService(session)
         
         
     async def init_execution(self, document_id: str, execution_id: str, user_instructions: str = None)-> tuple[Document, list[Section]]:
@@ -30,14 +35,112 @@ class GraphServices():
             raise ValueError(f"No sections found for document with ID {document_id}.")
         return document, sections
     
-    async def get_llm(self, execution_id: str) -> str:
+    async def get_llm_client(self, llm_id: str) -> BaseChatModel | FallbackChatModel:
         """
-        Retrieve the LLM name used in the execution.
+        Retrieve the shared client of an LLM from the registry, with its fallback chain.
         """
-        llm_name = await self.llm_service.get_llm_by_execution_id(execution_id)
-        return llm_name
+        return await self.llm_service.get_model_chain(llm_id)
     
     
+    async def get_model_id(self, execution_id: str) -> str:
+        """
+        Retrieve the ID of the LLM configured for the execution.
+        """
+        execution = await self.execution_service.get_execution_object(execution_id)
+        return str(execution.model_id) if execution.model_id else None
+    
+    async def get_model_name(self, llm_id: str) -> str:
+        """
+        Retrieve the internal name of the LLM used in the execution.
+        """
+        return await self.llm_service.get_model_name(llm_id)
+    
+    async def get_prompt_token_limit(self, llm_id: str) -> int:
+        """
+        Retrieve the prompt token limit of the LLM used in the execution.
+        """
+        return await self.llm_service.get_max_input_tokens(llm_id)
+    
+    async def get_reusable_outputs(self, section_ids: list[str], execution_id: str) -> dict[str, dict]:
+        """
+        Retrieve the latest reusable output of each section from past executions.
+        """
+        return await self.section_exec_service.get_reusable_outputs(section_ids, exclude_execution_id=execution_id)
+    
+    async def get_section_regeneration(self, execution_id: str, section_id: str) -> dict:
+        """
+        Validate that a section of an execution can be regenerated and return the
+        document and instructions to run it with.
+        """
+        execution = await self.execution_service.get_execution_object(execution_id)
+        if execution.status == Status.APPROVED:
+            raise ValueError("Cannot regenerate sections of an approved execution, disapprove it first.")
+        if execution.status in (Status.PENDING, Status.RUNNING):
+            raise ValueError(f"Execution with ID {execution_id} has not finished yet.")
+        
+        section = await self.section_service.get_section_by_id(section_id)
+        if section.document_id != execution.document_id:
+            raise ValueError(f"Section with ID {section_id} does not belong to the execution document.")
+        return {
+            "document_id": str(execution.document_id),
+            "instructions": execution.user_instruction,
+        }
+    
+    async def get_regeneration_outputs(self, execution_id: str, section_id: str) -> dict[str, str]:
+        """
+        Retrieve the outputs to carry over when regenerating a section: every saved
+        section of the execution except the section itself and its transitive dependents.
+        """
+        regenerate_ids = await self.section_service.get_transitive_dependent_ids(section_id)
+        regenerate_ids.add(str(section_id))
+        saved_outputs = await self.get_saved_outputs(execution_id)
+        return {
+            saved_id: output
+            for saved_id, output in saved_outputs.items()
+            if saved_id not in regenerate_ids
+        }
+    
+    async def get_saved_outputs(self, execution_id: str) -> dict[str, str]:
+        """
+        Retrieve the output of every section already saved in the execution.
+        """
+        section_execs = await self.execution_service.get_sections_by_execution_id(execution_id)
+        return {
+            str(section_exec.section_id): section_exec.custom_output or section_exec.output
+            for section_exec in section_execs
+            if section_exec.section_id
+        }
+    
+    async def get_execution_resume(self, execution_id: str) -> dict:
+        """
+        Validate that an execution can be resumed and return the document and
+        instructions to run it with. Failed and timed out executions and executions
+        left running by an interrupted process can be resumed: a running execution
+        is only resumed when its heartbeat is stale and no job holds a live lease
+        on it, whether it runs in a worker or streams from the API.
+        """
+        execution = await self.execution_service.get_execution_object(execution_id)
+        if execution.status not in (Status.FAILED, Status.TIMED_OUT, Status.RUNNING):
+            raise ValueError(f"Execution with ID {execution_id} cannot be resumed from status {execution.status.value}.")
+        if execution.status == Status.RUNNING and (
+            not await self.execution_service.is_abandoned(execution_id)
+            or await self.job_service.has_live_job("run_generation_graph", "execution_id", str(execution_id))
+        ):
+            raise ValueError(f"Execution with ID {execution_id} is still running on a worker.")
+        return {
+            "document_id": str(execution.document_id),
+            "instructions": execution.user_instruction,
+        }
+    
+    async def check_execution_active(self, execution_id: str) -> Execution:
+        """
+        Validate that an execution is pending or running, so its events can be watched.
+        """
+        execution = await self.execution_service.get_execution_object(execution_id)
+        if execution.status not in (Status.PENDING, Status.RUNNING):
+            raise ValueError(f"Execution with ID {execution_id} is not running (status {execution.status.value}).")
+        return execution
+    
     async def get_document_context(self, document_id: str) -> str:
         """
         Retrieve the document context and dependencies.
@@ -45,41 +148,52 @@ class GraphServices():
         context = await self.document_service.get_document_context(document_id)
         return context
         
+    async def touch_execution(self, execution_id: str) -> None:
+        """
+        Record a heartbeat of the process running the execution.
+        """
+        await self.execution_service.touch_heartbeat(execution_id)
+        
     async def update_execution(self, execution_id: str, status: Status, status_message: str) -> Execution:
         """
         Update the execution status.
         """
         return await self.execution_service.update_status(execution_id, status, status_message)
         
-    async def save_section_execution(self, section_id: str, name: str, execution_id: str, output: str, prompt: str, order: int) -> SectionExecution:
-        """
-        Save the section execution to the database.
-        """
-        new_section_execution = SectionExecution(
-            name=name,
-            section_id=section_id,
-            execution_id=execution_id,
-            output=output,
-            custom_output=None,
-            prompt=prompt,
-            order=order
-        )
-        await self.section_exec_service.add_section_execution(new_section_execution)
-        return new_section_execution
-
-if __name__ == "__main__":
-    import asyncio
-    from src.database.core import get_graph_session
-
-    async def main():
-        async with get_graph_session() as session:
-            graph_services = GraphServices(session)
-            # Example usage
-            document_id = "07bf9e5c-62e9-46a2-b5a3-c0f80f346c44"
-            execution_id = "6209ccb1-543f-4d15-adb4-e7cd03ca8e9c"
-            sections = await graph_services.init_execution(document_id, execution_id)
-            for section in sections:
-                print(f"Section ID: {section.id}, Name: {section.name}")
-                print(f"Dependencies: {section.dependencies}")
-
-    asyncio.run(main())
\ No newline at end of file
+    async def save_section_executions(self, execution_id: str, sections: list[dict]) -> list[SectionExecution]:
+        """
+        Save a batch of section outputs of the execution to the database, with
+        the cost of their LLM calls, and refresh the usage totals of the execution.
+        Previous rows of the same sections in the execution are replaced; the
+        usage of each call is recorded once, even if the batch is saved again.
+        """
+        usages = [section.get("usage") or {} for section in sections]
+        prices = await self.llm_service.get_prices(list({usage["model_id"] for usage in usages if usage.get("model_id")}))
+        section_executions = [
+            SectionExecution(
+                name=section["name"],
+                section_id=section["section_id"],
+                execution_id=execution_id,
+                output=section["output"],
+                custom_output=None,
+                prompt=section["prompt"],
+                order=section["order"],
+                input_hash=section.get("input_hash"),
+                prompt_tokens=section.get("prompt_tokens"),
+                model_id=usage.get("model_id"),
+                input_tokens=usage.get("input_tokens"),
+                output_tokens=usage.get("output_tokens"),
+                cached_tokens=usage.get("cached_tokens"),
+                ttft_ms=usage.get("ttft_ms"),
+                latency_ms=usage.get("latency_ms"),
+                cost=compute_cost(usage, prices.get(str(usage.get("model_id")))) if usage else None
+            )
+            for section, usage in zip(sections, usages)
+        ]
+        section_executions = await self.section_exec_service.replace_section_executions(execution_id, section_executions)
+        for section_exec, usage in zip(section_executions, usages):
+            if usage:
+                await self.section_exec_service.record_usage(execution_id, "generate_section", usage,
+                                                             section_exec.cost, section_exec.section_id)
+        await self.execution_service.refresh_usage(execution_id)
+        return section_executions
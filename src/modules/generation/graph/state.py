@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from typing_extensions import TypedDict, List, Optional
+from src.modules.document.models import Document
+from src.modules.section.models import Section
+from .persistence import RunPersistence
+
+
+@dataclass(frozen=True, slots=True)
+class DocumentSpec:
+    """
+    Document data needed to write its sections.
+    """
+    id: str
+    name: str
+    description: Optional[str] = None
+
+    @classmethod
+    def from_document(cls, document: Document) -> "DocumentSpec":
+        return cls(id=str(document.id), name=document.name, description=document.description)
+
+
+@dataclass(frozen=True, slots=True)
+class SectionSpec:
+    """
+    Section data needed to write it, with the IDs of the sections it depends on.
+    """
+    id: str
+    name: str
+    prompt: Optional[str]
+    order: Optional[int]
+    dependency_ids: tuple[str, ...] = ()
+
+    def __post_init__(self):
+        # El checkpointer restaura las tuplas como listas
+        object.__setattr__(self, "dependency_ids", tuple(self.dependency_ids))
+
+    @classmethod
+    def from_section(cls, section: Section) -> "SectionSpec":
+        return cls(
+            id=str(section.id),
+            name=section.name,
+            prompt=section.prompt,
+            order=section.order,
+            dependency_ids=tuple(str(d["id"]) for d in section.dependencies),
+        )
+
+
+class State(TypedDict): 
+    document_id: str
+    execution_id: str
+    execution_instructions: Optional[str]
+    document: DocumentSpec
+    document_context: str
+    sections: List[SectionSpec]
+    should_update: List[dict]
+    model_id: str  # ID del LLM, el cliente se obtiene del registro
+    model_name: str  # Nombre interno del LLM, parte de la clave del cache de respuestas
+    prompt_token_limit: int  # Límite de tokens del prompt del modelo
+    prompt_tokens: dict  # section_id -> tokens usados por cada componente del prompt
+    usage: dict  # section_id -> tokens, latencia y LLM de la llamada que escribió la sección
+    section_outputs: dict  # Diccionario para almacenar outputs de secciones
+    output_hashes: dict  # section_id -> hash del output de la sección
+    reuse_outputs: bool  # Reutilizar outputs de ejecuciones previas si el input no cambió
+    previous_outputs: dict  # section_id -> {"input_hash", "output"} de la última ejecución terminada
+    section_hashes: dict  # section_id -> hash del input de la sección
+    target_section_id: Optional[str]  # Regenerar solo esta sección y sus dependientes
+    
+class Config(TypedDict):
+    recursion_limit: int
+    thread_id: str
+    max_concurrency: int
+    resume: bool  # Retomar la ejecución saltando las secciones ya guardadas
+    bypass_cache: bool  # No usar el cache de respuestas del LLM
+    persistence: RunPersistence  # Escrituras a la base de datos de la ejecución
+    
+class BaseConfig(TypedDict):
+    configurable: Config
@@ -1,14 +1,16 @@
-from collections import deque
-from rich import print
+from collections import deque, defaultdict
+from typing import Awaitable, Callable, Iterable
+import asyncio
+import hashlib
+import heapq
+
 
 def topological_sort(sections):
-    print(sections)
     graph     = {sec.id: [] for sec in sections}
     in_degree = {sec.id: 0  for sec in sections}
 
     for sec in sections:
-        for d in sec.dependencies:
-            dep_id = d["id"]
+        for dep_id in sec.dependency_ids:
             if dep_id in graph:
                 graph[dep_id].append(sec.id)
                 in_degree[sec.id] += 1
@@ -26,4 +28,88 @@ def topological_sort(sections):
 
     if len(orden) != len(sections):
         raise RuntimeError("Se detectó un ciclo en las dependencias de secciones")
-    return orden
\ No newline at end of file
+    return orden
+
+
+class SectionDAG:
+    """
+    Index maps over the section dependency graph, so the scheduler can look up
+    sections, dependencies and dependents by ID without scanning lists.
+    """
+
+    def __init__(self, sections):
+        self.sections = {sec.id: sec for sec in sections}
+        self.order = topological_sort(sections)
+        self.position = {section_id: idx for idx, section_id in enumerate(self.order)}
+        self.dependencies: dict[str, list[str]] = {}
+        self.dependents: dict[str, list[str]] = defaultdict(list)
+        for section_id, section in self.sections.items():
+            dependency_ids = [dep_id for dep_id in section.dependency_ids if dep_id in self.sections]
+            self.dependencies[section_id] = dependency_ids
+            for dependency_id in dependency_ids:
+                self.dependents[dependency_id].append(section_id)
+
+
+async def run_dag(dag: SectionDAG, done_ids: Iterable[str],
+                  run_section: Callable[[str], Awaitable[None]], max_concurrency: int) -> None:
+    """
+    Run every section not in done_ids as soon as all its dependencies are done,
+    keeping at most max_concurrency sections running at the same time.
+    Ready sections start in topological order. If a section fails the remaining
+    running sections are cancelled and the error is raised.
+    """
+    done = set(done_ids)
+    pending_dependencies = {
+        section_id: sum(1 for dep_id in dependency_ids if dep_id not in done)
+        for section_id, dependency_ids in dag.dependencies.items()
+        if section_id not in done
+    }
+    ready = [(dag.position[section_id], section_id)
+             for section_id, count in pending_dependencies.items() if count == 0]
+    heapq.heapify(ready)
+    running: dict[asyncio.Task, str] = {}
+
+    try:
+        while ready or running:
+            while ready and len(running) < max_concurrency:
+                _, section_id = heapq.heappop(ready)
+                running[asyncio.create_task(run_section(section_id))] = section_id
+
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                section_id = running.pop(task)
+                task.result()
+                for dependent_id in dag.dependents[section_id]:
+                    pending_dependencies[dependent_id] -= 1
+                    if pending_dependencies[dependent_id] == 0:
+                        heapq.heappush(ready, (dag.position[dependent_id], dependent_id))
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+
+def hash_text(text: str) -> str:
+    """
+    Return the SHA-256 hex digest of a text.
+    """
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def section_input_hash(name: str, prompt: str, dependency_hashes: list[str], document_context: str,
+                       model_id: str, instructions: str = None) -> str:
+    """
+    Hash everything that determines the output of a section: its name and prompt,
+    the hashes of its dependency outputs, the document context, the model and the
+    execution instructions.
+    """
+    parts = [
+        name or "",
+        prompt or "",
+        ",".join(dependency_hashes),
+        hash_text(document_context),
+        model_id or "",
+        instructions or "",
+    ]
+    return hash_text("\x1f".join(parts))
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header
 from fastapi.responses import StreamingResponse
-from .graph.execute import stream_graph
+from .graph.execute import stream_graph, watch_execution
 from .service import (GenerationService)
+from .graph.services import GraphServices
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from src.database.core import get_session
-from .schemas import GenerateDocument, FixSection, RedactSectionPrompt
+from .schemas import GenerateDocument, RegenerateSection, ResumeExecution, FixSection, RedactSectionPrompt
 
 
 router = APIRouter(prefix="/generation")
@@ -36,7 +38,11 @@ async def generate_document_worker(request: GenerateDocument,
     """
     try:
         generation_service = GenerationService(session)
-        result = await generation_service.add_execution_graph_job(request.document_id, request.execution_id, request.instructions)
+        result = await generation_service.add_execution_graph_job(request.document_id, request.execution_id,
+                                                                  request.instructions, request.max_concurrency,
+                                                                  request.reuse_outputs,
+                                                                  bypass_cache=request.bypass_cache,
+                                                                  deadline_seconds=request.deadline_seconds)
         if result is None:
             raise HTTPException(
                 status_code=500,
@@ -56,7 +62,10 @@ async def generate_document(request: GenerateDocument):
     """
     try:
         return StreamingResponse(
-            stream_graph(request.document_id, request.execution_id, request.instructions),
+            stream_graph(request.document_id, request.execution_id, request.instructions,
+                         request.max_concurrency, request.reuse_outputs,
+                         bypass_cache=request.bypass_cache,
+                         deadline_seconds=request.deadline_seconds),
             media_type="text/event-stream")
     except ValueError as e:
         raise HTTPException(
@@ -70,6 +79,94 @@ async def generate_document(request: GenerateDocument):
         )
         
         
+@router.get("/events/{execution_id}")
+async def watch_execution_events(execution_id: str,
+                                 last_event_id: Optional[int] = Header(default=None, alias="Last-Event-ID"),
+                                 session: AsyncSession = Depends(get_session)):
+    """
+    Stream the progress events of an execution, whether it runs in a worker or in
+    another request. Any number of clients can watch the same execution.
+    Clients that reconnect with Last-Event-ID only receive the events they missed,
+    even if the execution has already finished.
+    """
+    try:
+        service = GraphServices(session)
+        active = True
+        try:
+            await service.check_execution_active(execution_id)
+        except ValueError:
+            if last_event_id is None:
+                raise
+            active = False
+        return StreamingResponse(
+            watch_execution(execution_id, last_event_id, follow=active),
+            media_type="text/event-stream")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"An error occurred while watching the execution: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An unexpected error occurred: {str(e)}"
+        )
+        
+        
+@router.post("/regenerate_section")
+async def regenerate_section(request: RegenerateSection,
+                             session: AsyncSession = Depends(get_session)):
+    """
+    Regenerate one section of an execution and the sections that depend on it,
+    keeping every other section output, and stream the output.
+    """
+    try:
+        service = GraphServices(session)
+        regeneration = await service.get_section_regeneration(request.execution_id, request.section_id)
+        return StreamingResponse(
+            stream_graph(regeneration["document_id"], request.execution_id,
+                         request.instructions or regeneration["instructions"],
+                         request.max_concurrency, target_section_id=request.section_id,
+                         bypass_cache=True, deadline_seconds=request.deadline_seconds),
+            media_type="text/event-stream")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"An error occurred while regenerating the section: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An unexpected error occurred: {str(e)}"
+        )
+        
+        
+@router.post("/resume_worker")
+async def resume_execution_worker(request: ResumeExecution,
+                                  session: AsyncSession = Depends(get_session)):
+    """
+    Resume a failed or interrupted execution using the worker. Sections already
+    saved in the execution are kept and only the remaining ones are generated.
+    """
+    try:
+        graph_service = GraphServices(session)
+        execution = await graph_service.get_execution_resume(request.execution_id)
+        generation_service = GenerationService(session)
+        return await generation_service.add_execution_graph_job(execution["document_id"], request.execution_id,
+                                                                execution["instructions"], request.max_concurrency,
+                                                                resume=True, deadline_seconds=request.deadline_seconds)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"An error occurred while resuming the execution: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An unexpected error occurred: {str(e)}"
+        )
+        
+        
 @router.post("/fix_section")
 async def fix_section(request: FixSection, 
                       session: AsyncSession = Depends(get_session)):
@@ -79,7 +176,9 @@ async def fix_section(request: FixSection,
     try:
         service = GenerationService(session)
         return StreamingResponse(
-            service.fix_section_service(content=request.content, instructions=request.instructions),
+            service.fix_section_service(content=request.content, instructions=request.instructions,
+                                        section_execution_id=request.section_execution_id,
+                                        bypass_cache=request.bypass_cache),
             media_type="text/event-stream")
     except ValueError as e:
         raise HTTPException(
@@ -102,7 +201,8 @@ async def redact_section_prompt(request: RedactSectionPrompt,
     try:
         service = GenerationService(session)
         return StreamingResponse(
-            service.redact_section_prompt_service(name=request.name, content=request.content),
+            service.redact_section_prompt_service(name=request.name, content=request.content,
+                                                  bypass_cache=request.bypass_cache),
             media_type="text/event-stream")
     except ValueError as e:
         raise HTTPException(
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 
 class GenerateDocument(BaseModel):
@@ -8,17 +8,42 @@ class GenerateDocument(BaseModel):
     document_id: str
     execution_id: str
     instructions: Optional[str] = None
+    max_concurrency: Optional[int] = Field(default=None, ge=1)  # Secciones en paralelo
+    reuse_outputs: bool = False  # Reutilizar secciones sin cambios de ejecuciones previas
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)  # Plazo total de la ejecución
+    bypass_cache: bool = False  # No usar el cache de respuestas del LLM
     
+class RegenerateSection(BaseModel):
+    """
+    Schema for regenerating one section of an execution and its dependents.
+    """
+    execution_id: str
+    section_id: str
+    instructions: Optional[str] = None
+    max_concurrency: Optional[int] = Field(default=None, ge=1)  # Secciones en paralelo
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)  # Plazo total de la ejecución
+
+class ResumeExecution(BaseModel):
+    """
+    Schema for resuming a failed or interrupted execution.
+    """
+    execution_id: str
+    max_concurrency: Optional[int] = Field(default=None, ge=1)  # Secciones en paralelo
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)  # Plazo total de la ejecución
+
 class FixSection(BaseModel):
     """
     Schema for fixing a section in a document.
     """
     content: str
     instructions: str
+    section_execution_id: Optional[str] = None  # Sección a la que se suma el uso del LLM
+    bypass_cache: bool = False  # No usar el cache de respuestas del LLM
     
 class RedactSectionPrompt(BaseModel):
     """
     Schema for redacting or improving the prompt for a section.
     """
     name: str
-    content: Optional[str] = None  # Optional field, can be None
\ No newline at end of file
+    content: Optional[str] = None  # Optional field, can be None
+    bypass_cache: bool = False  # No usar el cache de respuestas del LLM
\ No newline at end of file
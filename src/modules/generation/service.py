@@ -1,19 +1,27 @@
 from src.modules.llm.service import LLMService
+from src.modules.llm.utils import stream_text, get_total_timeout
+from src.modules.llm.usage import LLMUsage, compute_cost
+from src.modules.llm_cache.service import llm_cache, make_cache_key
+from .graph.events import format_sse, section_event
 from langchain_core.messages import AIMessageChunk
 from pydantic import BaseModel
 from src.modules.job.service import JobService
-from src.modules.job.models import Job
+from src.modules.job.models import Job, JobPriority
+from src.modules.document.repository import DocumentRepo
+from src.modules.section_execution.service import SectionExecutionService
+from src.database.core import get_graph_session
 from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 def format_content(content: AIMessageChunk) -> str:
     """
     Format the content of an AIMessageChunk to a string.
     """
-    if not content.content:
-        return ""
-    message = content.content.replace("\n", "\\n")
-    return "event: content\ndata: " + message + "\n\n"    
+    return format_sse(section_event("content", content=content.content))
 
 class GenerationService:
     
@@ -21,27 +29,68 @@ class GenerationService:
         self.session = session
         self.llm_service = LLMService(session)
     
-    async def add_execution_graph_job(self, document_id: str, execution_id: str, user_instructions: str = None) -> Job:
+    async def add_execution_graph_job(self, document_id: str, execution_id: str, user_instructions: str = None,
+                                      max_concurrency: int = None, reuse_outputs: bool = False,
+                                      resume: bool = False, bypass_cache: bool = False,
+                                      deadline_seconds: float = None,
+                                      priority: int = JobPriority.INTERACTIVE) -> Job:
         """
         Enqueue a job to run the generation graph for a document execution.
+        When resume is set, the job skips the sections already saved in the execution.
+        The deadline counts from when the job starts running.
+        Runs started by a user are interactive; batches enqueue with a lower
+        priority. The job belongs to the organization of the document, so the
+        workers are shared fairly between organizations.
         """
         service = JobService(self.session)
         payload = {
             "document_id": document_id,
             "execution_id": execution_id,
-            "user_instructions": user_instructions
+            "user_instructions": user_instructions,
+            "max_concurrency": max_concurrency,
+            "reuse_outputs": reuse_outputs,
+            "resume": resume,
+            "bypass_cache": bypass_cache,
+            "deadline_seconds": deadline_seconds
         }
+        document = await DocumentRepo(self.session).get_by_id(document_id)
         job = await service.enqueue_job(
             job_type="run_generation_graph",
-            payload=json.dumps(payload)
+            payload=json.dumps(payload),
+            priority=priority,
+            organization_id=document.organization_id if document else None
         )
         return job
     
-    async def fix_section_service(self, content: str, instructions: str):
+    async def _record_usage(self, operation: str, usage: LLMUsage, section_execution_id: str = None) -> None:
+        """
+        Log the usage of an LLM call made outside the generation graph and, when
+        it was made for a section execution, add it to the section and execution
+        totals. Failures are only logged, the response was already sent.
+        """
+        if not usage.called:
+            return
+        logger.info("LLM usage of %s: %s", operation, usage.as_dict())
+        if not section_execution_id:
+            return
+        try:
+            # La sesión del request ya puede estar cerrada mientras se envía el stream
+            async with get_graph_session() as session:
+                prices = await LLMService(session).get_prices([usage.llm_id] if usage.llm_id else [])
+                await SectionExecutionService(session).add_usage(
+                    section_execution_id, usage.as_dict(), compute_cost(usage.as_dict(), prices.get(usage.llm_id))
+                )
+        except Exception as e:
+            logger.warning("Failed to record LLM usage of section execution %s: %s", section_execution_id, e)
+    
+    async def fix_section_service(self, content: str, instructions: str, section_execution_id: str = None,
+                                  bypass_cache: bool = False):
         """
-        Fix a section in a document.
+        Fix a section in a document. When the section execution is given, the
+        usage of the LLM call is added to it.
         """
         llm = await self.llm_service.get_model()
+        model_name = await self.llm_service.get_model_name()
         if not llm:
             raise ValueError(f"LLM with name not found.")
         promtp = f"""Fix the following section content following the instructions of the user, usually the content is in markdown format:   
@@ -56,18 +105,22 @@ Instructions:
 ```
 
 Output the fixed content only, no need to add backticks, just the content."""
+        usage = LLMUsage(llm_id=(getattr(llm, "metadata", None) or {}).get("llm_id"))
         try:
-            async for response in llm.astream(input=promtp):
-                yield format_content(response)
+            async for text in llm_cache.cached_stream(make_cache_key(promtp, model_name), model_name,
+                                                      lambda: stream_text(llm, promtp, usage), bypass_cache):
+                yield format_sse(section_event("content", content=text))
         except Exception as e:
             raise ValueError(f"An error occurred while fixing the section: {str(e)}")
+        await self._record_usage("fix_section", usage, section_execution_id)
         return
     
-    async def redact_section_prompt_service(self, name: str, content: str = None):
+    async def redact_section_prompt_service(self, name: str, content: str = None, bypass_cache: bool = False):
         """
         Redact or improve the prompt for a section.
         """
         llm = await self.llm_service.get_model()
+        model_name = await self.llm_service.get_model_name()
         if not llm:
             raise ValueError(f"LLM not found.")
         
@@ -88,14 +141,18 @@ El prompt actual es el siguiente:
             prompt = prompt_improve.format(name=name, content=content)
         else:
             prompt = prompt_generate.format(name=name)
+        usage = LLMUsage(llm_id=(getattr(llm, "metadata", None) or {}).get("llm_id"))
         try:
-            async for response in llm.astream(input=prompt):
-                yield format_content(response)
+            async for text in llm_cache.cached_stream(make_cache_key(prompt, model_name), model_name,
+                                                      lambda: stream_text(llm, prompt, usage), bypass_cache):
+                yield format_sse(section_event("content", content=text))
         except Exception as e:
             raise ValueError(f"An error occurred while redacting the section prompt: {str(e)}")
+        await self._record_usage("redact_section_prompt", usage)
         return
     
-    async def generate_document_structure(self, document_name: str, document_description: str) -> dict:
+    async def generate_document_structure(self, document_name: str, document_description: str,
+                                          bypass_cache: bool = False) -> dict:
         class Section(BaseModel):
             name: str
             order: int
@@ -122,11 +179,19 @@ Descripción: {document_description}
         llm = await self.llm_service.get_model()
         if not llm:
             raise ValueError(f"LLM with name not found.")
-        document = await llm.with_structured_output(Document).ainvoke(
-            prompt.format(
-                document_name=document_name,
-                document_description=document_description
-        ),
-            max_tokens=8000
+        model_name = await self.llm_service.get_model_name()
+        prompt = prompt.format(
+            document_name=document_name,
+            document_description=document_description
         )
-        return document.model_dump()
+        
+        async def generate() -> str:
+            document = await asyncio.wait_for(
+                llm.with_structured_output(Document).ainvoke(prompt, max_tokens=8000),
+                get_total_timeout(llm)
+            )
+            return json.dumps(document.model_dump(), ensure_ascii=False)
+        
+        cache_key = make_cache_key(prompt, model_name, {"max_tokens": 8000, "schema": Document.model_json_schema()})
+        response = await llm_cache.cached_call(cache_key, model_name, generate, bypass_cache)
+        return json.loads(response)
@@ -37,8 +37,19 @@ async def run_generation_graph_handler(job: Job, session: Optional[AsyncSession]
         raise ValueError("Payload must contain 'execution_id' field.")
     
     user_instructions = payload.get("user_instructions", None)
+    max_concurrency = payload.get("max_concurrency", None)
+    reuse_outputs = payload.get("reuse_outputs", False)
+    # Un job reencolado retoma la ejecución desde su último checkpoint
+    resume = payload.get("resume", False) or (job.attempts or 0) > 1
+    bypass_cache = payload.get("bypass_cache", False)
+    deadline_seconds = payload.get("deadline_seconds", None)
     result = await execute_graph_worker(document_id=document_id,
                                         execution_id=execution_id,
-                                        user_instructions=user_instructions)
+                                        user_instructions=user_instructions,
+                                        max_concurrency=max_concurrency,
+                                        reuse_outputs=reuse_outputs,
+                                        resume=resume,
+                                        bypass_cache=bypass_cache,
+                                        deadline_seconds=deadline_seconds)
     return json.dumps(result)
     
@@ -1,7 +1,7 @@
 from src.database.base_model import BaseModel
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Column, String
-from enum import Enum
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from enum import Enum, IntEnum
 
 
 class JobStatus(Enum):
@@ -9,6 +9,18 @@ class JobStatus(Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    # Agotó sus reintentos; queda para inspeccionarlo y reintentarlo a mano
+    DEAD_LETTER = "dead_letter"
+
+
+class JobPriority(IntEnum):
+    """
+    Jobs with a higher priority are claimed first. Interactive jobs (started by a
+    user who is waiting) can also use the worker slots reserved for them.
+    """
+    BATCH = 0
+    NORMAL = 50
+    INTERACTIVE = 100
 
 
 class Job(BaseModel):
@@ -17,4 +29,22 @@ class Job(BaseModel):
     type = Column(String, nullable=False)
     payload = Column(String, nullable=True)
     status = Column(String, nullable=False, default=JobStatus.PENDING.value)
-    result = Column(String, nullable=True)
\ No newline at end of file
+    result = Column(String, nullable=True)
+    priority = Column(Integer, nullable=False, default=JobPriority.NORMAL.value,
+                      server_default=str(JobPriority.NORMAL.value))
+    # Organización dueña del job, para repartir los workers entre organizaciones
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organization.id", ondelete="SET NULL"), nullable=True)
+    # Lease del worker que lo está ejecutando; si vence sin renovarse el job se reencola
+    worker_id = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=True)
+    # Un job reintentado no se toma antes de run_after
+    run_after = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index("ix_job_status_lease_expires_at", "status", "lease_expires_at"),
+        Index("ix_job_status_priority_created_at", "status", "priority", "created_at"),
+    )
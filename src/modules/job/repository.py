@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+from datetime import timedelta
 from typing import Iterable, Optional
 
-from sqlalchemy import select, update
+from sqlalchemy import and_, case, cast, func, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import Select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.base_repo import BaseRepository
-from .models import Job, JobStatus
+from src.modules.event_bus import get_event_bus
+from src.modules.organization.models import Organization
+from .models import Job, JobPriority, JobStatus
+from .wakeup import JOB_CHANNEL
+
+# Clave del advisory lock que serializa los claims cuando hay límites por tipo
+CLAIM_LOCK_KEY = 7_316_402_518
 
 
 class JobRepo(BaseRepository[Job]):
@@ -20,9 +28,19 @@ class JobRepo(BaseRepository[Job]):
     def __init__(self, session: AsyncSession):
         super().__init__(session, Job)
 
-    async def enqueue(self, *, job_type: str, payload: Optional[str] = None) -> Job:
-        job = Job(type=job_type, payload=payload, status=JobStatus.PENDING.value)
-        return await self.add(job)
+    async def enqueue(self, *, job_type: str, payload: Optional[str] = None,
+                      priority: int = JobPriority.NORMAL, organization_id: Optional[str] = None) -> Job:
+        """
+        Add a pending job and notify the workers on the job channel. The
+        notification goes out when the transaction commits, once the job is
+        visible to them.
+        """
+        job = Job(type=job_type, payload=payload, status=JobStatus.PENDING.value,
+                  priority=int(priority), organization_id=organization_id)
+        job = await self.add(job)
+        await get_event_bus().publish_on_commit(self.session, JOB_CHANNEL,
+                                                {"job_id": str(job.id), "type": job_type})
+        return job
 
     async def fetch_next_pending(self, *, types: Optional[Iterable[str]] = None) -> Optional[Job]:
         """
@@ -40,28 +58,275 @@ class JobRepo(BaseRepository[Job]):
         await self.session.flush()
         return job
 
+    async def claim_pending(self, limit: int, *, worker_id: str, lease_seconds: float,
+                            types: Optional[Iterable[str]] = None, type_limits: Optional[dict[str, int]] = None,
+                            min_priority: Optional[int] = None) -> list[Job]:
+        """
+        Claim up to limit pending jobs in a single UPDATE ... RETURNING and lease
+        them to worker_id for lease_seconds. The rows are picked with FOR UPDATE
+        SKIP LOCKED so concurrent claimers never take the same job.
+
+        Jobs are taken by priority and, within a priority, fairly between
+        organizations: each organization's next job is ranked by the jobs it
+        would then have running divided by its job weight, so a large batch of
+        one organization cannot starve the others. Job types in type_limits never
+        have more running jobs than their limit across the cluster; claims are
+        serialized with an advisory lock while there are limits.
+        """
+        if limit <= 0:
+            return []
+        if type_limits:
+            await self.session.execute(select(func.pg_advisory_xact_lock(CLAIM_LOCK_KEY)))
+
+        job_order = (self.model.priority.desc(), self.model.created_at.asc())
+        running = self.model.status == JobStatus.RUNNING.value
+        running_by_org = (
+            select(self.model.organization_id, func.count().label("running"))
+            .where(running)
+            .group_by(self.model.organization_id)
+            .subquery()
+        )
+        # Jobs que tendría corriendo la organización al tomar este, relativos a su peso
+        share = (
+            (func.coalesce(running_by_org.c.running, 0)
+             + func.row_number().over(partition_by=self.model.organization_id, order_by=job_order))
+            / func.coalesce(Organization.job_weight, 1.0)
+        )
+        candidates = (
+            select(self.model.id, self.model.type, self.model.priority, self.model.created_at, share.label("share"))
+            .outerjoin(running_by_org, running_by_org.c.organization_id.is_not_distinct_from(self.model.organization_id))
+            .outerjoin(Organization, Organization.id == self.model.organization_id)
+            .where(self.model.status == JobStatus.PENDING.value, self._is_due())
+        )
+        if types:
+            candidates = candidates.where(self.model.type.in_(list(types)))
+        if min_priority is not None:
+            candidates = candidates.where(self.model.priority >= int(min_priority))
+        candidates = candidates.subquery()
+        fair_order = (candidates.c.priority.desc(), candidates.c.share.asc(), candidates.c.created_at.asc())
+        if type_limits:
+            candidates = select(
+                candidates,
+                func.row_number().over(partition_by=candidates.c.type, order_by=fair_order).label("type_rank"),
+            ).subquery()
+            fair_order = (candidates.c.priority.desc(), candidates.c.share.asc(), candidates.c.created_at.asc())
+
+        claimable = (
+            select(self.model.id)
+            .join(candidates, candidates.c.id == self.model.id)
+            .where(self.model.status == JobStatus.PENDING.value)
+        )
+        if type_limits:
+            # Cada tipo admite tantos jobs nuevos como le falten para llegar a su límite
+            running_by_type = (
+                select(self.model.type, func.count().label("running"))
+                .where(running)
+                .group_by(self.model.type)
+                .subquery()
+            )
+            type_limit = case(type_limits, value=candidates.c.type, else_=None)
+            claimable = (
+                claimable
+                .outerjoin(running_by_type, running_by_type.c.type == candidates.c.type)
+                .where(or_(type_limit.is_(None),
+                           func.coalesce(running_by_type.c.running, 0) + candidates.c.type_rank <= type_limit))
+            )
+        claimable = (
+            claimable
+            .order_by(*fair_order)
+            .limit(limit)
+            .with_for_update(of=self.model, skip_locked=True)
+            .scalar_subquery()
+        )
+        query = (
+            update(self.model)
+            .where(self.model.id.in_(claimable), self.model.status == JobStatus.PENDING.value)
+            .values(
+                status=JobStatus.RUNNING.value,
+                worker_id=worker_id,
+                lease_expires_at=func.now() + timedelta(seconds=lease_seconds),
+                heartbeat_at=func.now(),
+                attempts=self.model.attempts + 1,
+            )
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        jobs = list(result.scalars().all())
+        # RETURNING no garantiza el orden de la subconsulta
+        return sorted(jobs, key=lambda job: (-job.priority, job.created_at))
+
+    async def release(self, job_ids: Iterable[str], *, worker_id: str) -> int:
+        """
+        Put claimed jobs that never started back in pending status. The attempt
+        taken by the claim is given back.
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+        query = (
+            update(self.model)
+            .where(self.model.id.in_(job_ids),
+                   self.model.status == JobStatus.RUNNING.value,
+                   self.model.worker_id == worker_id)
+            .values(status=JobStatus.PENDING.value, worker_id=None, lease_expires_at=None,
+                    attempts=self.model.attempts - 1)
+        )
+        result = await self.session.execute(query)
+        return result.rowcount or 0
+
+    async def renew_leases(self, job_ids: Iterable[str], *, worker_id: str, lease_seconds: float) -> set[str]:
+        """
+        Extend the leases of the running jobs of worker_id. Returns the ids still
+        owned by it; a missing id means its lease expired and the job was
+        requeued or failed by the reaper.
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return set()
+        query = (
+            update(self.model)
+            .where(self.model.id.in_(job_ids),
+                   self.model.status == JobStatus.RUNNING.value,
+                   self.model.worker_id == worker_id)
+            .values(lease_expires_at=func.now() + timedelta(seconds=lease_seconds), heartbeat_at=func.now())
+            .returning(self.model.id)
+        )
+        result = await self.session.execute(query)
+        return {str(job_id) for job_id in result.scalars().all()}
+
+    async def requeue_stalled(self, *, default_max_attempts: int, worker_id: Optional[str] = None,
+                              reason: Optional[str] = None) -> tuple[int, int]:
+        """
+        Requeue running jobs whose lease expired, or every running job of
+        worker_id when it is given. Jobs that used up their attempts are moved
+        to the dead letter state instead. Returns (requeued, dead lettered);
+        requeued jobs are announced on the job channel when the transaction commits.
+        """
+        if worker_id is not None:
+            stalled = and_(self.model.status == JobStatus.RUNNING.value, self.model.worker_id == worker_id)
+        else:
+            stalled = and_(self.model.status == JobStatus.RUNNING.value, self.model.lease_expires_at < func.now())
+        max_attempts = func.coalesce(self.model.max_attempts, default_max_attempts)
+
+        reason = reason or "Job lease expired before it finished."
+        failed = await self.session.execute(
+            update(self.model)
+            .where(stalled, self.model.attempts >= max_attempts)
+            .values(status=JobStatus.DEAD_LETTER.value, lease_expires_at=None, result=reason, last_error=reason)
+        )
+        requeued = await self.session.execute(
+            update(self.model)
+            .where(stalled, self.model.attempts < max_attempts)
+            .values(status=JobStatus.PENDING.value, worker_id=None, lease_expires_at=None, last_error=reason)
+            .returning(self.model.id)
+        )
+        requeued_ids = list(requeued.scalars().all())
+        if requeued_ids:
+            await get_event_bus().publish_on_commit(self.session, JOB_CHANNEL,
+                                                    {"job_id": str(requeued_ids[0]), "requeued": len(requeued_ids)})
+        return len(requeued_ids), failed.rowcount or 0
+
     async def mark_as_completed(self, job: Job, *, result: Optional[str] = None) -> Job:
         job.status = JobStatus.COMPLETED.value
         job.result = result
+        job.lease_expires_at = None
         await self.session.flush()
         return job
 
     async def mark_as_failed(self, job: Job, *, error: Optional[str] = None) -> Job:
         job.status = JobStatus.FAILED.value
         job.result = error
+        job.last_error = error
+        job.lease_expires_at = None
+        await self.session.flush()
+        return job
+
+    async def schedule_retry(self, job: Job, *, error: Optional[str], delay_seconds: float) -> Job:
+        """
+        Put a failed job back in pending status, to be claimed again after delay_seconds.
+        """
+        job.status = JobStatus.PENDING.value
+        job.last_error = error
+        job.run_after = func.now() + timedelta(seconds=delay_seconds)
+        job.worker_id = None
+        job.lease_expires_at = None
+        await self.session.flush()
+        # run_after se calcula con el reloj de la base de datos
+        await self.session.refresh(job)
+        return job
+
+    async def mark_as_dead_letter(self, job: Job, *, error: Optional[str] = None) -> Job:
+        job.status = JobStatus.DEAD_LETTER.value
+        job.result = error
+        job.last_error = error
+        job.lease_expires_at = None
         await self.session.flush()
         return job
 
-    async def mark_running_jobs_as_failed(self, *, reason: Optional[str] = None) -> int:
+    async def replay(self, job: Job, *, max_attempts: Optional[int] = None) -> Job:
         """
-        Mark all jobs that are currently in running status as failed.
+        Put a dead lettered job back in the queue with its attempts reset and
+        notify the workers when the transaction commits.
+        """
+        job.status = JobStatus.PENDING.value
+        job.attempts = 0
+        job.run_after = None
+        job.result = None
+        job.worker_id = None
+        job.lease_expires_at = None
+        if max_attempts is not None:
+            job.max_attempts = max_attempts
+        await self.session.flush()
+        await self.session.refresh(job)
+        await get_event_bus().publish_on_commit(self.session, JOB_CHANNEL, {"job_id": str(job.id), "type": job.type})
+        return job
+
+    async def has_live_lease(self, *, job_type: str, payload_key: str, payload_value: str) -> bool:
+        """
+        Check whether a running job of job_type whose payload has payload_key set
+        to payload_value still holds an unexpired lease.
+        """
+        query = (
+            select(self.model.id)
+            .where(
+                self.model.type == job_type,
+                self.model.status == JobStatus.RUNNING.value,
+                self.model.lease_expires_at > func.now(),
+                cast(self.model.payload, JSONB)[payload_key].astext == payload_value,
+            )
+            .limit(1)
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none() is not None
+
+    async def get_jobs_by_status(self, status: JobStatus, limit: int = 10) -> list[Job]:
+        """
+        Fetch the jobs in a status, most recently updated first.
+        """
+        query = (
+            select(self.model)
+            .where(self.model.status == status.value)
+            .order_by(self.model.updated_at.desc())
+            .limit(limit)
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def mark_running_jobs_as_failed(self, *, reason: Optional[str] = None,
+                                          worker_id: Optional[str] = None) -> int:
+        """
+        Mark the jobs that are currently in running status as failed, only those
+        of worker_id when it is given.
         Returns the number of rows affected so callers can log the outcome.
         """
         query = (
             update(self.model)
             .where(self.model.status == JobStatus.RUNNING.value)
-            .values(status=JobStatus.FAILED.value, result=reason)
+            .values(status=JobStatus.FAILED.value, result=reason, lease_expires_at=None)
         )
+        if worker_id is not None:
+            query = query.where(self.model.worker_id == worker_id)
         result = await self.session.execute(query)
         return result.rowcount or 0
 
@@ -73,8 +338,11 @@ class JobRepo(BaseRepository[Job]):
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
+    def _is_due(self):
+        return or_(self.model.run_after.is_(None), self.model.run_after <= func.now())
+
     def _pending_jobs_query(self, types: Optional[Iterable[str]] = None) -> Select:
-        query = select(self.model).where(self.model.status == JobStatus.PENDING.value)
+        query = select(self.model).where(self.model.status == JobStatus.PENDING.value, self._is_due())
         if types:
             query = query.where(self.model.type.in_(list(types)))
-        return query.order_by(self.model.created_at.asc())
+        return query.order_by(self.model.priority.desc(), self.model.created_at.asc())
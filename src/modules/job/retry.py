@@ -0,0 +1,52 @@
+from typing import Optional
+import random
+
+# Códigos HTTP de errores transitorios (timeouts, rate limit, caídas del gateway)
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+# Errores de conexión de httpx y de los SDK de los proveedores
+RETRYABLE_ERROR_NAMES = {"TransportError", "TimeoutException", "APIConnectionError", "APITimeoutError"}
+# Cuántos errores encadenados (raise ... from e) se revisan
+MAX_CAUSE_DEPTH = 5
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether a job that failed with this error may succeed if run again: rate
+    limits, server errors, timeouts and connection errors, also when wrapped in
+    another error. An error can decide it with a retryable attribute.
+    """
+    depth = 0
+    while error is not None and depth < MAX_CAUSE_DEPTH:
+        retryable = getattr(error, "retryable", None)
+        if retryable is not None:
+            return bool(retryable)
+        status = _status_code(error)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        if {cls.__name__ for cls in type(error).__mro__} & RETRYABLE_ERROR_NAMES:
+            return True
+        error = error.__cause__
+        depth += 1
+    return False
+
+
+def backoff_seconds(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """
+    Delay before retrying a job after its attempt-th failure: exponential from
+    base up to cap, with jitter so jobs that failed together are not retried
+    together, and never shorter than the wait asked by the provider.
+    """
+    delay = min(cap, base * 2 ** max(attempt - 1, 0))
+    delay = delay / 2 + random.uniform(0, delay / 2)
+    if retry_after:
+        delay = max(delay, retry_after)
+    return delay
@@ -14,7 +14,7 @@ from src.modules.job.models import Job
 from src.modules.job.service import JobService
 from src.schemas import ResponseSchema
 from src.utils import get_transaction_id
-from .schemas import JobResponse
+from .schemas import JobResponse, ReplayJob
 
 router = APIRouter(prefix="/job", tags=["Jobs"])
 
@@ -30,6 +30,15 @@ def job_to_dict(job: Job) -> Dict[str, Any]:
         "status": job.status,
         "payload": job.payload,
         "result": job.result,
+        "priority": job.priority,
+        "organization_id": str(job.organization_id) if job.organization_id else None,
+        "worker_id": job.worker_id,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "lease_expires_at": job.lease_expires_at.isoformat() if isinstance(job.lease_expires_at, datetime) else job.lease_expires_at,
+        "heartbeat_at": job.heartbeat_at.isoformat() if isinstance(job.heartbeat_at, datetime) else job.heartbeat_at,
+        "run_after": job.run_after.isoformat() if isinstance(job.run_after, datetime) else job.run_after,
+        "last_error": job.last_error,
         "created_at": job.created_at.isoformat() if isinstance(job.created_at, datetime) else job.created_at,
         "updated_at": job.updated_at.isoformat() if isinstance(job.updated_at, datetime) else job.updated_at,
     }
@@ -85,6 +94,63 @@ async def get_latest_jobs(
         ) from exc
 
 
+@router.get("/dead_letter", response_model=ResponseSchema)
+async def get_dead_letter_jobs(
+    limit: int = Query(default=10, ge=1, le=100, description="Número de jobs a obtener"),
+    session: AsyncSession = Depends(get_session),
+    transaction_id: str = Depends(get_transaction_id),
+):
+    """
+    Obtiene los jobs que agotaron sus reintentos (dead letter), con su último error.
+    """
+    try:
+        job_service = JobService(session)
+        jobs = await job_service.get_dead_letter_jobs(limit=limit)
+
+        return ResponseSchema(
+            data=jsonable_encoder([job_to_dict(job) for job in jobs]),
+            message="Dead letter jobs retrieved successfully",
+            transaction_id=transaction_id
+        )
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail={"transaction_id": transaction_id, "error": f"An error occurred while retrieving dead letter jobs: {str(exc)}"},
+        ) from exc
+
+
+@router.post("/{job_id}/replay", response_model=ResponseSchema)
+async def replay_job(
+    job_id: str,
+    request: Optional[ReplayJob] = None,
+    session: AsyncSession = Depends(get_session),
+    transaction_id: str = Depends(get_transaction_id),
+):
+    """
+    Enqueue a dead lettered job again with its attempts reset.
+    """
+    try:
+        service = JobService(session)
+        job = await service.replay_job(job_id, max_attempts=request.max_attempts if request else None)
+
+        return ResponseSchema(
+            data=jsonable_encoder(job_to_dict(job)),
+            message="Job enqueued again successfully",
+            transaction_id=transaction_id
+        )
+    except ValueError as exc:
+        status_code = 404 if "not found" in str(exc).lower() else 400
+        raise HTTPException(
+            status_code=status_code,
+            detail={"transaction_id": transaction_id, "error": str(exc)},
+        ) from exc
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail={"transaction_id": transaction_id, "error": f"An error occurred while replaying the job: {str(exc)}"},
+        ) from exc
+
+
 @router.get("/{job_id}", response_model=ResponseSchema)
 async def get_job(
     job_id: str,
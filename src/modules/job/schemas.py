@@ -11,6 +11,15 @@ class JobResponse(BaseModel):
     payload: Optional[str]
     status: str
     result: Optional[str]
+    priority: int = 50
+    organization_id: Optional[UUID] = None
+    worker_id: Optional[str] = None
+    attempts: int = 0
+    max_attempts: Optional[int] = None
+    lease_expires_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    run_after: Optional[datetime] = None
+    last_error: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -21,3 +30,7 @@ class JobResponse(BaseModel):
 class LatestJobsResponse(BaseModel):
     jobs: list[JobResponse]
     total: int
+
+
+class ReplayJob(BaseModel):
+    max_attempts: Optional[int] = None  # Attempts allowed to the replayed job (default: the job's own or the system default)
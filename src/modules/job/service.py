@@ -4,8 +4,25 @@ from typing import Iterable, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .models import Job
+from src.config import system_config
+from .models import Job, JobPriority, JobStatus
 from .repository import JobRepo
+from .retry import backoff_seconds
+
+
+def parse_type_limits(value: Optional[str]) -> dict[str, int]:
+    """
+    Parse the per-type concurrency limits of the cluster, given as
+    "type=limit,type=limit". Entries that are not valid are ignored.
+    """
+    limits = {}
+    for entry in (value or "").split(","):
+        job_type, _, limit = entry.partition("=")
+        try:
+            limits[job_type.strip()] = max(int(limit), 0)
+        except ValueError:
+            continue
+    return {job_type: limit for job_type, limit in limits.items() if job_type}
 
 
 class JobService:
@@ -18,11 +35,14 @@ class JobService:
         self.session = session
         self.repo = JobRepo(session)
 
-    async def enqueue_job(self, *, job_type: str, payload: Optional[str] = None) -> Job:
+    async def enqueue_job(self, *, job_type: str, payload: Optional[str] = None,
+                          priority: int = JobPriority.NORMAL, organization_id: Optional[str] = None) -> Job:
         """
-        Create a new job in pending status.
+        Create a new job in pending status. Jobs with a higher priority are run
+        first, and the workers are shared fairly between organizations.
         """
-        return await self.repo.enqueue(job_type=job_type, payload=payload)
+        return await self.repo.enqueue(job_type=job_type, payload=payload, priority=priority,
+                                       organization_id=organization_id)
 
     async def get_job(self, job_id: str) -> Job:
         job = await self.repo.get_by_id(job_id)
@@ -37,26 +57,109 @@ class JobService:
         """
         return await self.repo.fetch_next_pending(types=types)
 
-    async def complete_job(self, job_id: str, *, result: Optional[str] = None) -> Job:
+    async def claim_jobs(self, limit: int, *, worker_id: str, lease_seconds: float,
+                         types: Optional[Iterable[str]] = None, min_priority: Optional[int] = None) -> list[Job]:
+        """
+        Claim up to limit pending jobs at once, mark them as running and lease
+        them to the given worker. Per-type concurrency limits of the cluster
+        are taken from the configuration.
+        """
+        return await self.repo.claim_pending(limit, worker_id=worker_id, lease_seconds=lease_seconds, types=types,
+                                             type_limits=parse_type_limits(system_config.JOB_TYPE_CONCURRENCY),
+                                             min_priority=min_priority)
+
+    async def release_jobs(self, job_ids: Iterable[str], *, worker_id: str) -> int:
         """
-        Mark a job as completed and store an optional result.
+        Return claimed jobs that were not started to the pending queue.
         """
+        return await self.repo.release(job_ids, worker_id=worker_id)
+
+    async def renew_leases(self, job_ids: Iterable[str], *, worker_id: str, lease_seconds: float) -> set[str]:
+        """
+        Heartbeat of a worker: extend the leases of its running jobs and return
+        the ids it still owns.
+        """
+        return await self.repo.renew_leases(job_ids, worker_id=worker_id, lease_seconds=lease_seconds)
+
+    async def requeue_stalled_jobs(self, *, worker_id: Optional[str] = None,
+                                   reason: Optional[str] = None) -> tuple[int, int]:
+        """
+        Requeue the running jobs whose lease expired (or every running job of
+        worker_id) while they have attempts left, dead lettering the rest.
+        Returns (requeued, dead lettered).
+        """
+        return await self.repo.requeue_stalled(default_max_attempts=system_config.JOB_MAX_ATTEMPTS,
+                                               worker_id=worker_id, reason=reason)
+
+    async def _get_owned_job(self, job_id: str, worker_id: Optional[str]) -> Job:
         job = await self.get_job(job_id)
+        if worker_id is not None and (job.worker_id != worker_id or job.status != JobStatus.RUNNING.value):
+            raise ValueError(f"Job {job_id} is no longer leased to worker {worker_id}.")
+        return job
+
+    async def complete_job(self, job_id: str, *, result: Optional[str] = None,
+                           worker_id: Optional[str] = None) -> Job:
+        """
+        Mark a job as completed and store an optional result. When worker_id is
+        given the job must still be leased to that worker.
+        """
+        job = await self._get_owned_job(job_id, worker_id)
         return await self.repo.mark_as_completed(job, result=result)
 
-    async def fail_job(self, job_id: str, *, error: Optional[str] = None) -> Job:
+    async def fail_job(self, job_id: str, *, error: Optional[str] = None, worker_id: Optional[str] = None,
+                       retryable: bool = False, retry_after: Optional[float] = None) -> Job:
+        """
+        Handle a failed attempt of a job. A retryable failure puts the job back
+        in the queue after a jittered exponential backoff (never shorter than
+        retry_after) while it has attempts left, and moves it to the dead letter
+        state when it has none. Other failures mark the job as failed.
+        When worker_id is given the job must still be leased to that worker.
+        """
+        job = await self._get_owned_job(job_id, worker_id)
+        if not retryable:
+            return await self.repo.mark_as_failed(job, error=error)
+        if job.attempts >= self.max_attempts(job):
+            return await self.repo.mark_as_dead_letter(job, error=error)
+        delay = backoff_seconds(job.attempts, system_config.JOB_RETRY_BASE_SECONDS,
+                                system_config.JOB_RETRY_MAX_SECONDS, retry_after)
+        return await self.repo.schedule_retry(job, error=error, delay_seconds=delay)
+
+    @staticmethod
+    def max_attempts(job: Job) -> int:
+        return job.max_attempts or system_config.JOB_MAX_ATTEMPTS
+
+    async def get_dead_letter_jobs(self, limit: int = 10) -> list[Job]:
+        """
+        Get the jobs that ran out of attempts, most recent first.
+        """
+        return await self.repo.get_jobs_by_status(JobStatus.DEAD_LETTER, limit=limit)
+
+    async def replay_job(self, job_id: str, *, max_attempts: Optional[int] = None) -> Job:
         """
-        Mark a job as failed and store an optional error payload.
+        Enqueue a dead lettered job again with its attempts reset, optionally
+        allowing it a different number of attempts.
         """
         job = await self.get_job(job_id)
-        return await self.repo.mark_as_failed(job, error=error)
+        if job.status != JobStatus.DEAD_LETTER.value:
+            raise ValueError(f"Job {job_id} is {job.status}, only dead lettered jobs can be replayed.")
+        if max_attempts is not None and max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+        return await self.repo.replay(job, max_attempts=max_attempts)
 
-    async def fail_running_jobs(self, *, reason: Optional[str] = None) -> int:
+    async def fail_running_jobs(self, *, reason: Optional[str] = None, worker_id: Optional[str] = None) -> int:
         """
-        Mark every job currently running as failed.
+        Mark every job currently running (or only those of worker_id) as failed.
         Returns the number of jobs updated so callers can track the cleanup work.
         """
-        return await self.repo.mark_running_jobs_as_failed(reason=reason)
+        return await self.repo.mark_running_jobs_as_failed(reason=reason, worker_id=worker_id)
+
+    async def has_live_job(self, job_type: str, payload_key: str, payload_value: str) -> bool:
+        """
+        Check whether a job of job_type for the given payload value is running
+        on a worker that still holds its lease.
+        """
+        return await self.repo.has_live_lease(job_type=job_type, payload_key=payload_key,
+                                              payload_value=payload_value)
 
     async def get_latest_jobs(self, limit: int = 10) -> list[Job]:
         """
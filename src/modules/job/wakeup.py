@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+
+from src.modules.event_bus import EventBus
+
+logger = logging.getLogger(__name__)
+
+# Canal del event bus en el que se avisa cada job encolado
+JOB_CHANNEL = "job_enqueued"
+# Espera antes de volver a suscribirse si el listener falla
+RESUBSCRIBE_SECONDS = 5.0
+
+
+class JobWakeup:
+    """
+    Wakes idle worker loops when a job is enqueued. The process keeps a single
+    subscription to the job channel of the event bus (one shared LISTEN
+    connection with the Postgres bus) and each notification wakes one idle loop.
+
+    Notifications that arrive while every loop is busy are kept, up to one per
+    loop, so no loop misses work enqueued between its last claim and its wait.
+    Loops still poll every poll_interval seconds in case a notification is lost.
+    """
+
+    def __init__(self, bus: EventBus, max_pending: int, poll_interval: float):
+        self.bus = bus
+        self.max_pending = max(max_pending, 1)
+        self.poll_interval = poll_interval
+        self._pending = 0
+        self._closed = False
+        self._condition = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._relay())
+
+    async def _relay(self) -> None:
+        while not self._closed:
+            try:
+                async with self.bus.subscribe(JOB_CHANNEL) as subscription:
+                    async for _ in subscription:
+                        await self.notify()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Job wakeup listener failed, workers fall back to polling: %s", e)
+                await asyncio.sleep(RESUBSCRIBE_SECONDS)
+
+    async def notify(self) -> None:
+        async with self._condition:
+            self._pending = min(self._pending + 1, self.max_pending)
+            self._condition.notify(1)
+
+    async def wait(self) -> bool:
+        """
+        Wait until a job is enqueued, the poll interval passes or the wakeup is
+        closed. Returns True when woken by a notification.
+        """
+        async with self._condition:
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self._pending > 0 or self._closed),
+                    timeout=self.poll_interval,
+                )
+            except asyncio.TimeoutError:
+                return False
+            if self._pending > 0:
+                self._pending -= 1
+                return True
+            return False
+
+    async def close(self) -> None:
+        """
+        Stop listening and release every waiting loop.
+        """
+        async with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
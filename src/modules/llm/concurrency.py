@@ -0,0 +1,116 @@
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+from src.config import system_config
+import asyncio
+import asyncpg
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Primer argumento de pg_try_advisory_lock, separa estos locks de otros usos
+LOCK_NAMESPACE = 7391
+# Espera entre intentos cuando todos los cupos están tomados
+MIN_RETRY_SECONDS = 0.05
+MAX_RETRY_SECONDS = 1.0
+
+
+class ConcurrencyLimiter(ABC):
+    """
+    Cap on the LLM calls running at the same time. Callers hold a slot for the
+    whole call.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+
+    @abstractmethod
+    def slot(self):
+        """
+        Async context manager that waits for a free slot and holds it.
+        """
+
+
+class LocalConcurrencyLimiter(ConcurrencyLimiter):
+    """
+    Cap shared by the runs of this process only.
+    """
+
+    def __init__(self, limit: int):
+        super().__init__(limit)
+        self._semaphore = asyncio.Semaphore(limit) if limit > 0 else None
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._semaphore is None:
+            yield
+            return
+        async with self._semaphore:
+            yield
+
+
+class PostgresConcurrencyLimiter(ConcurrencyLimiter):
+    """
+    Cap shared by every API and worker process, built on Postgres advisory locks:
+    there is one lock per slot and a call holds one of them on its own connection
+    while it runs. Postgres releases the lock if the process dies, so a crashed
+    worker never leaks a slot.
+
+    Locks cannot be waited on as a group, so a caller tries every slot and sleeps
+    with backoff while all of them are taken.
+    """
+
+    def __init__(self, limit: int, dsn: str = None):
+        super().__init__(limit)
+        self.dsn = dsn or system_config.ALEMBIC_DATABASE_URL
+        self._pool: Optional[asyncpg.Pool] = None
+        self._connect_lock = asyncio.Lock()
+        # Un proceso no puede tener más cupos que el límite global
+        self._local = asyncio.Semaphore(limit) if limit > 0 else None
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        async with self._connect_lock:
+            if self._pool is None:
+                self._pool = await asyncpg.create_pool(self.dsn, min_size=0, max_size=self.limit)
+            return self._pool
+
+    async def _acquire(self, connection: asyncpg.Connection) -> int:
+        delay = MIN_RETRY_SECONDS
+        while True:
+            for slot in range(self.limit):
+                if await connection.fetchval("SELECT pg_try_advisory_lock($1, $2)", LOCK_NAMESPACE, slot):
+                    return slot
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_SECONDS)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._local is None:
+            yield
+            return
+        async with self._local:
+            pool = await self._get_pool()
+            async with pool.acquire() as connection:
+                slot = await self._acquire(connection)
+                try:
+                    yield
+                finally:
+                    try:
+                        await connection.execute("SELECT pg_advisory_unlock($1, $2)", LOCK_NAMESPACE, slot)
+                    except Exception as e:
+                        # Si la conexión murió Postgres ya liberó el lock
+                        logger.warning("Failed to release LLM slot %s: %s", slot, e)
+
+
+@lru_cache(maxsize=1)
+def get_llm_limiter() -> ConcurrencyLimiter:
+    backend = system_config.LLM_CONCURRENCY_BACKEND
+    limit = system_config.LLM_GLOBAL_CONCURRENCY
+
+    if backend == "postgres":
+        return PostgresConcurrencyLimiter(limit)
+    if backend == "memory":
+        return LocalConcurrencyLimiter(limit)
+
+    raise ValueError(f"LLM_CONCURRENCY_BACKEND '{backend}' no soportado")
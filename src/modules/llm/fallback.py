@@ -0,0 +1,187 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+from langchain_core.callbacks import AsyncCallbackManager, AsyncCallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.base import LanguageModelInput
+from langchain_core.messages import AIMessageChunk, BaseMessage, BaseMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, LLMResult
+from langchain_core.runnables import RunnableConfig, ensure_config
+from .utils import get_total_timeout, invoke_with_timeout, stream_with_timeout
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class FallbackChatModel:
+    """
+    Chat model backed by an ordered chain of LLM clients: the primary one and
+    its fallbacks. A call goes to the primary and, when it fails, to the next
+    client of the chain until one answers.
+
+    With a hedge delay, a call that has not answered after that many seconds is
+    also sent to the next client and the first answer wins; the calls still
+    running are cancelled. Streams are raced until their first chunk, after
+    which the call is committed to the winning client: an error later in the
+    stream is raised, since part of the answer was already yielded.
+
+    Each attempt is bounded by the total timeout of its own client; a timed out
+    attempt counts as a failure and moves the call to the next client.
+
+    Attempts run without the callbacks of the caller, so the tokens of a losing
+    or failed client never reach a graph streamed with stream_mode="messages";
+    only the answer of the winning client is reported to them.
+
+    Only ainvoke and astream are supported, which is what the generation graph
+    and the chatbot use.
+    """
+
+    def __init__(self, models: list[BaseChatModel], hedge_delay: Optional[float] = None):
+        if not models:
+            raise ValueError("A fallback chain needs at least one model.")
+        self.models = models
+        self.hedge_delay = hedge_delay
+
+    @property
+    def metadata(self) -> dict:
+        # Los marcadores de cache de prompts solo se usan si todos los modelos los aceptan
+        markers = [(getattr(model, "metadata", None) or {}).get("prompt_cache_control") for model in self.models]
+        if markers[0] and all(marker == markers[0] for marker in markers):
+            return {"prompt_cache_control": markers[0]}
+        return {}
+
+    async def _race(self, start: Callable[[BaseChatModel], Awaitable[T]],
+                    discard: Callable[[T], Awaitable[None]] = None) -> T:
+        """
+        Run start on the clients of the chain, moving to the next one when a
+        call fails or, with hedging, when the hedge delay passes. Return the
+        first successful result and cancel the rest.
+        """
+        pending: dict[asyncio.Task, int] = {}
+        next_index = 0
+        last_error: Optional[BaseException] = None
+
+        def launch() -> None:
+            nonlocal next_index
+            pending[asyncio.create_task(start(self.models[next_index]))] = next_index
+            next_index += 1
+
+        launch()
+        try:
+            while pending:
+                hedging = self.hedge_delay is not None and next_index < len(self.models)
+                done, _ = await asyncio.wait(pending, timeout=self.hedge_delay if hedging else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info("No answer from the fallback chain after %ss, also sending to model %s",
+                                self.hedge_delay, next_index)
+                    launch()
+                    continue
+                winner = None
+                for task in done:
+                    index = pending.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        logger.warning("LLM %s of the fallback chain failed: %s", index, last_error)
+                        if next_index < len(self.models):
+                            launch()
+                    elif winner is None:
+                        winner = task
+                    elif discard is not None:
+                        # Dos respuestas en el mismo instante, la segunda se descarta
+                        await discard(task.result())
+                if winner is not None:
+                    return winner.result()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _start_run(self, input: LanguageModelInput, config: RunnableConfig) -> AsyncCallbackManagerForLLMRun:
+        """
+        Report the call to the callbacks of the caller as a single chat model run.
+        """
+        manager = AsyncCallbackManager.configure(
+            config.get("callbacks"),
+            inheritable_tags=config.get("tags"),
+            inheritable_metadata=config.get("metadata"),
+        )
+        messages = self.models[0]._convert_input(input).to_messages()
+        run_managers = await manager.on_chat_model_start(
+            {"name": type(self).__name__}, [messages], name=config.get("run_name")
+        )
+        return run_managers[0]
+
+    @staticmethod
+    def _detached(config: RunnableConfig) -> RunnableConfig:
+        # Los intentos no ven los callbacks del llamador, solo se le reporta el ganador
+        return {**config, "callbacks": []}
+
+    async def ainvoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any) -> BaseMessage:
+        config = ensure_config(config)
+        attempt_config = self._detached(config)
+        run_manager = await self._start_run(input, config)
+        try:
+            response = await self._race(
+                lambda model: invoke_with_timeout(model, input, config=attempt_config, **kwargs)
+            )
+        except BaseException as e:
+            await run_manager.on_llm_error(e)
+            raise
+        # La respuesta ganadora se reporta como un solo chunk
+        response.id = response.id or f"run-{run_manager.run_id}"
+        await run_manager.on_llm_new_token(
+            response.text(),
+            chunk=ChatGenerationChunk(message=AIMessageChunk(content=response.content, id=response.id))
+        )
+        await run_manager.on_llm_end(LLMResult(generations=[[ChatGeneration(message=response)]]))
+        return response
+
+    async def astream(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any) -> AsyncIterator[BaseMessageChunk]:
+        config = ensure_config(config)
+        attempt_config = self._detached(config)
+
+        async def first_chunk(model: BaseChatModel) -> tuple[Optional[BaseMessageChunk], AsyncIterator]:
+            stream = stream_with_timeout(model.astream(input, config=attempt_config, **kwargs),
+                                         get_total_timeout(model))
+            try:
+                chunk = await stream.__anext__()
+                # Para registrar el uso con el LLM que respondió
+                llm_id = (getattr(model, "metadata", None) or {}).get("llm_id")
+                if llm_id:
+                    chunk.response_metadata["llm_id"] = llm_id
+                return chunk, stream
+            except StopAsyncIteration:
+                return None, stream
+            except BaseException:
+                await stream.aclose()
+                raise
+
+        async def discard(result: tuple[Optional[BaseMessageChunk], AsyncIterator]) -> None:
+            await result[1].aclose()
+
+        run_manager = await self._start_run(input, config)
+        try:
+            chunk, stream = await self._race(first_chunk, discard)
+        except BaseException as e:
+            await run_manager.on_llm_error(e)
+            raise
+        response: Optional[BaseMessageChunk] = None
+        try:
+            while chunk is not None:
+                response = chunk if response is None else response + chunk
+                await run_manager.on_llm_new_token(chunk.text(), chunk=ChatGenerationChunk(message=chunk))
+                yield chunk
+                chunk = await anext(stream, None)
+        except BaseException as e:
+            await run_manager.on_llm_error(e)
+            raise
+        finally:
+            await stream.aclose()
+        generations = [[ChatGeneration(message=response)]] if response is not None else [[]]
+        await run_manager.on_llm_end(LLMResult(generations=generations))
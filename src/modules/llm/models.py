@@ -1,5 +1,5 @@
 from src.database.base_model import BaseModel
-from sqlalchemy import Column, String, ForeignKey, Boolean
+from sqlalchemy import Column, String, ForeignKey, Boolean, Integer, Float, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -10,6 +10,18 @@ class LLM(BaseModel):
     internal_name = Column(String, nullable=True)
     provider_id = Column(UUID(as_uuid=True), ForeignKey("provider.id"), nullable=True)
     is_default = Column(Boolean, default=False)
+    max_input_tokens = Column(Integer, nullable=True) # Límite de tokens del prompt
+    rpm_limit = Column(Integer, nullable=True) # Requests por minuto, sin límite si es nulo
+    tpm_limit = Column(Integer, nullable=True) # Tokens por minuto, sin límite si es nulo
+    fallback_llm_ids = Column(JSON, nullable=False, default=list) # LLMs a usar en orden si este falla
+    hedge_delay_seconds = Column(Float, nullable=True) # Espera antes de enviar también al siguiente, sin hedging si es nulo
+    input_price_per_mtok = Column(Float, nullable=True) # Precio por millón de tokens de entrada
+    output_price_per_mtok = Column(Float, nullable=True) # Precio por millón de tokens de salida
+    cached_price_per_mtok = Column(Float, nullable=True) # Precio de tokens de entrada cacheados, si es nulo se usa el de entrada
+    # Timeouts en segundos, si son nulos se usan los del sistema
+    connect_timeout_seconds = Column(Float, nullable=True) # Conexión con el proveedor
+    read_timeout_seconds = Column(Float, nullable=True) # Espera entre bytes de la respuesta
+    total_timeout_seconds = Column(Float, nullable=True) # Llamada completa, incluido el stream
     executions = relationship("Execution", back_populates="model")
     provider = relationship("Provider", back_populates="llms")
     
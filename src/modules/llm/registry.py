@@ -0,0 +1,49 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, Optional
+from langchain_core.language_models import BaseChatModel
+
+
+class LLMClientRegistry:
+    """
+    Process-wide registry of warm LLM clients by LLM ID. Reusing a client keeps
+    its HTTP connection pool alive, so calls skip secret lookups, client setup
+    and TLS handshakes.
+
+    Each client is stored with the version of the configuration it was built
+    from (LLM row and provider credentials). A different version rebuilds it,
+    so updates made by other processes are picked up without a shared eviction.
+    """
+
+    def __init__(self):
+        self._clients: dict[str, tuple[Hashable, BaseChatModel]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def get(self, llm_id: str, version: Hashable,
+                  factory: Callable[[], Awaitable[BaseChatModel]]) -> BaseChatModel:
+        """
+        Return the client of an LLM for a configuration version, building it
+        with the factory when there is none or it was built from another version.
+        """
+        key = str(llm_id)
+        entry = self._clients.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        # Un lock por LLM para no construir el mismo cliente dos veces
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            entry = self._clients.get(key)
+            if entry is None or entry[0] != version:
+                entry = (version, await factory())
+                self._clients[key] = entry
+            return entry[1]
+
+    def evict(self, llm_id: Optional[str] = None) -> None:
+        """
+        Drop the client of an LLM, or every client when no ID is given.
+        """
+        if llm_id is None:
+            self._clients.clear()
+        else:
+            self._clients.pop(str(llm_id), None)
+
+
+llm_registry = LLMClientRegistry()
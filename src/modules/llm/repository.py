@@ -37,6 +37,16 @@ class LLMRepo(BaseRepository[LLM]):
         result = await self.session.execute(query)
         return result.scalars().one_or_none()
 
+    async def get_by_ids(self, llm_ids: list[str]) -> list[LLM]:
+        """
+        Retrieve the LLMs with the given IDs, skipping the ones that do not exist.
+        """
+        if not llm_ids:
+            return []
+        query = select(self.model).where(self.model.id.in_(llm_ids))
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
     async def get_by_execution_id(self, execution_id: str) -> LLM:
         """
         Retrieve an LLM associated with a specific execution ID.
@@ -5,7 +5,7 @@ from src.database.core import get_session
 from .service import LLMService
 from src.schemas import ResponseSchema
 from src.utils import get_transaction_id
-from .schemas import CreateLLM, SetDefaultLLM, UpdateLLM
+from .schemas import CreateLLM, SetDefaultLLM, UpdateLLM, SetLLMFallbacks
 
 
 router = APIRouter(prefix="/llms")
@@ -51,6 +51,15 @@ async def create_llm(
             name=request.name,
             internal_name=request.internal_name,
             provider_id=request.provider_id,
+            max_input_tokens=request.max_input_tokens,
+            rpm_limit=request.rpm_limit,
+            tpm_limit=request.tpm_limit,
+            input_price_per_mtok=request.input_price_per_mtok,
+            output_price_per_mtok=request.output_price_per_mtok,
+            cached_price_per_mtok=request.cached_price_per_mtok,
+            connect_timeout_seconds=request.connect_timeout_seconds,
+            read_timeout_seconds=request.read_timeout_seconds,
+            total_timeout_seconds=request.total_timeout_seconds,
         )
         return ResponseSchema(
             transaction_id=transaction_id,
@@ -89,6 +98,15 @@ async def update_llm(
             name=update_data.get("name"),
             internal_name=update_data.get("internal_name"),
             provider_id=update_data.get("provider_id"),
+            max_input_tokens=update_data.get("max_input_tokens"),
+            rpm_limit=update_data.get("rpm_limit"),
+            tpm_limit=update_data.get("tpm_limit"),
+            input_price_per_mtok=update_data.get("input_price_per_mtok"),
+            output_price_per_mtok=update_data.get("output_price_per_mtok"),
+            cached_price_per_mtok=update_data.get("cached_price_per_mtok"),
+            connect_timeout_seconds=update_data.get("connect_timeout_seconds"),
+            read_timeout_seconds=update_data.get("read_timeout_seconds"),
+            total_timeout_seconds=update_data.get("total_timeout_seconds"),
         )
         return ResponseSchema(
             transaction_id=transaction_id,
@@ -109,6 +127,42 @@ async def update_llm(
         )
 
 
+@router.put("/{llm_id}/fallbacks")
+async def set_llm_fallbacks(
+    llm_id: str,
+    request: SetLLMFallbacks,
+    session: Session = Depends(get_session),
+    transaction_id: str = Depends(get_transaction_id),
+):
+    """
+    Set the ordered fallback LLMs of an LLM and its hedge delay.
+    """
+    llm_service = LLMService(session)
+    try:
+        llm = await llm_service.set_llm_fallbacks(
+            llm_id=llm_id,
+            fallback_llm_ids=request.fallback_llm_ids,
+            hedge_delay_seconds=request.hedge_delay_seconds,
+        )
+        return ResponseSchema(
+            transaction_id=transaction_id,
+            data=jsonable_encoder(llm),
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"transaction_id": transaction_id, "error": str(e)},
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "transaction_id": transaction_id,
+                "error": f"An error occurred while setting the LLM fallbacks: {str(e)}",
+            },
+        )
+
+
 @router.patch("/set-default")
 async def set_default_llm(
     request: SetDefaultLLM,
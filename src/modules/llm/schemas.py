@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class CreateLLM(BaseModel):
@@ -8,6 +8,15 @@ class CreateLLM(BaseModel):
     name: str
     internal_name: str
     provider_id: str
+    max_input_tokens: int | None = None
+    rpm_limit: int | None = None
+    tpm_limit: int | None = None
+    input_price_per_mtok: float | None = Field(default=None, ge=0)
+    output_price_per_mtok: float | None = Field(default=None, ge=0)
+    cached_price_per_mtok: float | None = Field(default=None, ge=0)
+    connect_timeout_seconds: float | None = Field(default=None, gt=0)
+    read_timeout_seconds: float | None = Field(default=None, gt=0)
+    total_timeout_seconds: float | None = Field(default=None, gt=0)
 
 
 class SetDefaultLLM(BaseModel):
@@ -24,3 +33,20 @@ class UpdateLLM(BaseModel):
     name: str | None = None
     internal_name: str | None = None
     provider_id: str | None = None
+    max_input_tokens: int | None = None
+    rpm_limit: int | None = None  # 0 quita el límite
+    tpm_limit: int | None = None  # 0 quita el límite
+    input_price_per_mtok: float | None = Field(default=None, ge=0)
+    output_price_per_mtok: float | None = Field(default=None, ge=0)
+    cached_price_per_mtok: float | None = Field(default=None, ge=0)
+    connect_timeout_seconds: float | None = Field(default=None, gt=0)
+    read_timeout_seconds: float | None = Field(default=None, gt=0)
+    total_timeout_seconds: float | None = Field(default=None, gt=0)
+
+
+class SetLLMFallbacks(BaseModel):
+    """
+    Schema for setting the fallback chain of an LLM.
+    """
+    fallback_llm_ids: list[str] = []  # En orden, vacío quita los fallbacks
+    hedge_delay_seconds: float | None = Field(default=None, gt=0)  # Nulo desactiva el hedging
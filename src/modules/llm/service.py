@@ -4,8 +4,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from .repository import LLMRepo
 from .models import LLM
 from src.modules.llm_provider.service import LLMProviderService
+from src.modules.llm_provider.models import Provider
 from .utils import get_llm
+from .registry import llm_registry
+from .fallback import FallbackChatModel
+from src.modules.rate_limit.service import RateLimitCallback, get_rate_limiter, validate_rate_limit
 from langchain_core.language_models import BaseChatModel
+from src.config import system_config
+import logging
+
+logger = logging.getLogger(__name__)
 
 class LLMService:
     def __init__(self, session: AsyncSession):
@@ -29,7 +37,14 @@ class LLMService:
             raise ValueError(f"LLM with name {name} not found.")
         return llm
 
-    async def create_llm(self, name: str, internal_name: str, provider_id: str) -> LLM:
+    async def create_llm(self, name: str, internal_name: str, provider_id: str,
+                         max_input_tokens: Optional[int] = None, rpm_limit: Optional[int] = None,
+                         tpm_limit: Optional[int] = None, input_price_per_mtok: Optional[float] = None,
+                         output_price_per_mtok: Optional[float] = None,
+                         cached_price_per_mtok: Optional[float] = None,
+                         connect_timeout_seconds: Optional[float] = None,
+                         read_timeout_seconds: Optional[float] = None,
+                         total_timeout_seconds: Optional[float] = None) -> LLM:
         """
         Create a new LLM ensuring the referenced provider exists.
         """
@@ -42,6 +57,9 @@ class LLMService:
         if not provider_id:
             raise ValueError("provider_id is required to create an LLM.")
 
+        if max_input_tokens is not None and max_input_tokens <= 0:
+            raise ValueError("max_input_tokens must be greater than zero.")
+
         provider = await self.provider_service.get_provider_by_id(provider_id)
 
         normalized_name = name.strip()
@@ -57,6 +75,15 @@ class LLMService:
             name=normalized_name,
             internal_name=normalized_internal_name,
             provider_id=str(provider.id),
+            max_input_tokens=max_input_tokens,
+            rpm_limit=validate_rate_limit("rpm_limit", rpm_limit),
+            tpm_limit=validate_rate_limit("tpm_limit", tpm_limit),
+            input_price_per_mtok=input_price_per_mtok,
+            output_price_per_mtok=output_price_per_mtok,
+            cached_price_per_mtok=cached_price_per_mtok,
+            connect_timeout_seconds=connect_timeout_seconds,
+            read_timeout_seconds=read_timeout_seconds,
+            total_timeout_seconds=total_timeout_seconds,
         )
         return await self.llm_repo.add(llm)
 
@@ -73,9 +100,19 @@ class LLMService:
         name: Optional[str] = None,
         internal_name: Optional[str] = None,
         provider_id: Optional[str] = None,
+        max_input_tokens: Optional[int] = None,
+        rpm_limit: Optional[int] = None,
+        tpm_limit: Optional[int] = None,
+        input_price_per_mtok: Optional[float] = None,
+        output_price_per_mtok: Optional[float] = None,
+        cached_price_per_mtok: Optional[float] = None,
+        connect_timeout_seconds: Optional[float] = None,
+        read_timeout_seconds: Optional[float] = None,
+        total_timeout_seconds: Optional[float] = None,
     ) -> LLM:
         """
         Update mutable attributes of an existing LLM.
+        A rate limit of 0 removes the limit.
         """
         if not llm_id:
             raise ValueError("LLM ID is required.")
@@ -84,7 +121,11 @@ class LLMService:
         if not llm:
             raise ValueError(f"LLM with id {llm_id} not found.")
 
-        if all(value is None for value in (name, internal_name, provider_id)):
+        if all(value is None for value in (name, internal_name, provider_id, max_input_tokens,
+                                           rpm_limit, tpm_limit, input_price_per_mtok,
+                                           output_price_per_mtok, cached_price_per_mtok,
+                                           connect_timeout_seconds, read_timeout_seconds,
+                                           total_timeout_seconds)):
             raise ValueError("No data provided to update the LLM.")
 
         if name is not None:
@@ -116,6 +157,67 @@ class LLMService:
             provider = await self.provider_service.get_provider_by_id(provider_id)
             llm.provider_id = str(provider.id)
 
+        if max_input_tokens is not None:
+            if max_input_tokens <= 0:
+                raise ValueError("max_input_tokens must be greater than zero.")
+
+            llm.max_input_tokens = max_input_tokens
+
+        if rpm_limit is not None:
+            llm.rpm_limit = validate_rate_limit("rpm_limit", rpm_limit)
+
+        if tpm_limit is not None:
+            llm.tpm_limit = validate_rate_limit("tpm_limit", tpm_limit)
+
+        if input_price_per_mtok is not None:
+            llm.input_price_per_mtok = input_price_per_mtok
+
+        if output_price_per_mtok is not None:
+            llm.output_price_per_mtok = output_price_per_mtok
+
+        if cached_price_per_mtok is not None:
+            llm.cached_price_per_mtok = cached_price_per_mtok
+
+        if connect_timeout_seconds is not None:
+            llm.connect_timeout_seconds = connect_timeout_seconds
+
+        if read_timeout_seconds is not None:
+            llm.read_timeout_seconds = read_timeout_seconds
+
+        if total_timeout_seconds is not None:
+            llm.total_timeout_seconds = total_timeout_seconds
+
+        llm = await self.llm_repo.update(llm)
+        llm_registry.evict(llm_id)
+        return llm
+
+    async def set_llm_fallbacks(self, llm_id: str, fallback_llm_ids: list[str],
+                                hedge_delay_seconds: Optional[float] = None) -> LLM:
+        """
+        Set the ordered fallback LLMs of an LLM and the hedge delay used to
+        send a slow call to the next one. An empty list removes the fallbacks.
+        """
+        if not llm_id:
+            raise ValueError("LLM ID is required.")
+
+        llm = await self.llm_repo.get_by_id(llm_id)
+        if not llm:
+            raise ValueError(f"LLM with id {llm_id} not found.")
+
+        if len(set(fallback_llm_ids)) != len(fallback_llm_ids):
+            raise ValueError("fallback_llm_ids cannot contain duplicates.")
+
+        for fallback_id in fallback_llm_ids:
+            if fallback_id == str(llm.id):
+                raise ValueError("An LLM cannot be its own fallback.")
+            if not await self.llm_repo.get_by_id(fallback_id):
+                raise ValueError(f"Fallback LLM with id {fallback_id} not found.")
+
+        if hedge_delay_seconds is not None and not fallback_llm_ids:
+            raise ValueError("hedge_delay_seconds requires at least one fallback LLM.")
+
+        llm.fallback_llm_ids = list(fallback_llm_ids)
+        llm.hedge_delay_seconds = hedge_delay_seconds
         return await self.llm_repo.update(llm)
 
     async def get_llm_by_execution_id(self, execution_id: str) -> BaseChatModel:
@@ -126,28 +228,109 @@ class LLMService:
         model = await self.get_model(llm.id)
         return model
     
-    async def get_model(self, llm_id: str = None) -> BaseChatModel:
+    async def get_llm_or_default(self, llm_id: str = None) -> LLM:
         """
-        Retrieve an LLM instance by its ID.
+        Retrieve an LLM by its ID, or the default LLM when no ID is given.
         """
         if llm_id is None:
-            llm = await self.get_default_llm()
-        else:
-            llm = await self.llm_repo.get_by_id(llm_id)
-            if not llm:
-                raise ValueError(f"LLM with id {llm_id} not found.")
-        
-        provider = await self.provider_service.get_provider_with_secrets(llm.provider_id)
+            return await self.get_default_llm()
+        llm = await self.llm_repo.get_by_id(llm_id)
+        if not llm:
+            raise ValueError(f"LLM with id {llm_id} not found.")
+        return llm
+    
+    async def get_model(self, llm_id: str = None) -> BaseChatModel:
+        """
+        Retrieve the shared LLM instance for an ID (or the default LLM) from the
+        client registry. The client is rebuilt when the LLM or the credentials
+        of its provider changed since it was built.
+        """
+        llm = await self.get_llm_or_default(llm_id)
+        provider = await self.provider_service.get_provider_by_id(llm.provider_id)
+        version = (llm.updated_at, provider.id, provider.credential_version)
+        return await llm_registry.get(llm.id, version, lambda: self._build_model(llm, provider))
+    
+    async def get_model_chain(self, llm_id: str = None) -> BaseChatModel | FallbackChatModel:
+        """
+        Retrieve the client of an LLM (or the default LLM) together with its
+        fallback chain. LLMs without fallbacks get their plain client.
+        Fallbacks of the fallbacks are not followed.
+        """
+        llm = await self.get_llm_or_default(llm_id)
+        model = await self.get_model(llm.id)
+        if not llm.fallback_llm_ids:
+            return model
+        models = [model]
+        for fallback_id in llm.fallback_llm_ids:
+            try:
+                models.append(await self.get_model(fallback_id))
+            except ValueError as e:
+                # Un fallback borrado no rompe la cadena
+                logger.warning("Skipping fallback %s of LLM %s: %s", fallback_id, llm.id, e)
+        if len(models) == 1:
+            return model
+        return FallbackChatModel(models, hedge_delay=llm.hedge_delay_seconds)
+
+    async def _build_model(self, llm: LLM, provider: Provider) -> BaseChatModel:
+        """
+        Build a new client for an LLM, reading the provider secrets.
+        """
+        secrets = await self.provider_service.get_provider_secrets(provider)
         model_info = {
             "name": llm.internal_name,
-            "provider": provider['name'],
-            "key": provider['key'],
-            "endpoint": provider['endpoint'],
-            "deployment": provider['deployment']
+            "provider": provider.name,
+            "key": secrets['key'],
+            "endpoint": secrets['endpoint'],
+            "deployment": secrets['deployment'],
+            "connect_timeout": llm.connect_timeout_seconds or system_config.LLM_CONNECT_TIMEOUT_SECONDS,
+            "read_timeout": llm.read_timeout_seconds or system_config.LLM_READ_TIMEOUT_SECONDS,
+            "max_retries": system_config.LLM_MAX_RETRIES,
         }
         model = get_llm(model_info)
+        model.metadata = {
+            **(model.metadata or {}),
+            # Identifica al LLM en el registro de uso de cada llamada
+            "llm_id": str(llm.id),
+            "total_timeout": llm.total_timeout_seconds or system_config.LLM_TOTAL_TIMEOUT_SECONDS,
+        }
+        # Cada llamada espera su cupo de requests y tokens del LLM y del proveedor
+        model.callbacks = [RateLimitCallback(
+            get_rate_limiter(),
+            llm_id=llm.id,
+            provider_id=llm.provider_id,
+            llm_limits={"rpm": llm.rpm_limit, "tpm": llm.tpm_limit},
+            provider_limits={"rpm": provider.rpm_limit, "tpm": provider.tpm_limit}
+        )]
         return model
 
+    async def get_prices(self, llm_ids: list[str]) -> dict[str, dict]:
+        """
+        Map each LLM ID to its prices per million tokens ("input", "output" and "cached").
+        """
+        llms = await self.llm_repo.get_by_ids(llm_ids)
+        return {
+            str(llm.id): {
+                "input": llm.input_price_per_mtok,
+                "output": llm.output_price_per_mtok,
+                "cached": llm.cached_price_per_mtok,
+            }
+            for llm in llms
+        }
+
+    async def get_max_input_tokens(self, llm_id: str = None) -> int:
+        """
+        Retrieve the prompt token limit of an LLM, or the system default if it has none.
+        """
+        llm = await self.get_llm_or_default(llm_id)
+        return llm.max_input_tokens or system_config.GENERATION_MAX_INPUT_TOKENS
+
+    async def get_model_name(self, llm_id: str = None) -> str:
+        """
+        Retrieve the internal (provider) name of an LLM, or of the default LLM.
+        """
+        llm = await self.get_llm_or_default(llm_id)
+        return llm.internal_name
+
     async def get_default_llm(self) -> LLM:
         """
         Retrieve the default LLM.
@@ -186,3 +369,4 @@ class LLMService:
             raise ValueError(f"LLM with id {llm_id} not found.")
 
         await self.llm_repo.delete(llm)
+        llm_registry.evict(llm_id)
@@ -0,0 +1,87 @@
+from dataclasses import dataclass, field
+from typing import Optional
+from langchain_core.messages import BaseMessageChunk
+from uuid import uuid4
+import time
+
+# Los precios de los LLM son por millón de tokens
+TOKENS_PER_PRICE_UNIT = 1_000_000
+
+
+@dataclass
+class LLMUsage:
+    """
+    Token usage and latency of one streamed LLM call, collected from its chunks.
+    Providers report usage in one or several chunks, which are added up.
+    call_id identifies the call, so its usage is recorded only once.
+    """
+    call_id: str = field(default_factory=lambda: str(uuid4()))
+    llm_id: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    ttft_ms: Optional[int] = None
+    latency_ms: Optional[int] = None
+    _started_at: Optional[float] = None
+
+    @property
+    def called(self) -> bool:
+        """
+        Whether the LLM was actually called (False for cached responses).
+        """
+        return self._started_at is not None
+
+    def start(self) -> None:
+        self._started_at = time.perf_counter()
+
+    def _elapsed_ms(self) -> int:
+        return int((time.perf_counter() - self._started_at) * 1000)
+
+    def observe(self, chunk: BaseMessageChunk) -> None:
+        """
+        Record the usage reported in a chunk and the time of the first token.
+        """
+        if self._started_at is None:
+            self.start()
+        if self.ttft_ms is None and chunk.text():
+            self.ttft_ms = self._elapsed_ms()
+        # La cadena de fallbacks marca qué LLM respondió
+        llm_id = (getattr(chunk, "response_metadata", None) or {}).get("llm_id")
+        if llm_id:
+            self.llm_id = llm_id
+        usage = getattr(chunk, "usage_metadata", None)
+        if usage:
+            self.input_tokens += usage.get("input_tokens") or 0
+            self.output_tokens += usage.get("output_tokens") or 0
+            self.cached_tokens += (usage.get("input_token_details") or {}).get("cache_read") or 0
+
+    def finish(self) -> None:
+        if self._started_at is not None:
+            self.latency_ms = self._elapsed_ms()
+
+    def as_dict(self) -> dict:
+        return {
+            "call_id": self.call_id,
+            "model_id": self.llm_id,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_tokens": self.cached_tokens,
+            "ttft_ms": self.ttft_ms,
+            "latency_ms": self.latency_ms,
+        }
+
+
+def compute_cost(usage: dict, prices: Optional[dict]) -> Optional[float]:
+    """
+    Cost of a call from its usage and the prices per million tokens of its LLM
+    ("input", "output" and "cached"; cached input tokens are charged at the input
+    price when the LLM has no cached price). None if the LLM has no prices.
+    """
+    if not prices or prices.get("input") is None or prices.get("output") is None:
+        return None
+    cached = min(usage.get("cached_tokens") or 0, usage.get("input_tokens") or 0)
+    cached_price = prices["input"] if prices.get("cached") is None else prices["cached"]
+    cost = (((usage.get("input_tokens") or 0) - cached) * prices["input"]
+            + cached * cached_price
+            + (usage.get("output_tokens") or 0) * prices["output"])
+    return round(cost / TOKENS_PER_PRICE_UNIT, 6)
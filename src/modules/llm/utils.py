@@ -1,5 +1,16 @@
 from langchain.chat_models import init_chat_model
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage
+from langchain_core.language_models.base import LanguageModelInput
+from typing import AsyncIterator, Optional, TypeVar
+from .usage import LLMUsage
+import asyncio
+import httpx
+
+T = TypeVar("T")
+
+# Marca de cache de prompts de Anthropic, el prefijo marcado se cachea ~5 minutos
+ANTHROPIC_CACHE_CONTROL = {"type": "ephemeral"}
 
 
 def get_llm(model_info: dict) -> BaseChatModel:
@@ -8,6 +19,11 @@ def get_llm(model_info: dict) -> BaseChatModel:
     api_key = model_info.get("key")
     endpoint = model_info.get("endpoint")
     deployment = model_info.get("deployment")
+    connect_timeout = model_info.get("connect_timeout")
+    read_timeout = model_info.get("read_timeout")
+    max_retries = model_info.get("max_retries")
+    # Timeout de conexión y de lectura de cada request HTTP al proveedor
+    timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
     
     print(f"Getting LLM with model info: {model_name}, provider: {provider}")
 
@@ -17,20 +33,35 @@ def get_llm(model_info: dict) -> BaseChatModel:
             model_provider="azure_openai",
             api_key=api_key,
             azure_endpoint=endpoint,
-            api_version=deployment
+            api_version=deployment,
+            timeout=timeout,
+            max_retries=max_retries,
+            # Los headers de rate limit ajustan el limitador
+            include_response_headers=True,
+            # El uso de tokens llega en el último chunk del stream
+            stream_usage=True
         )
     elif provider == "openai":
         llm = init_chat_model(
             model=model_name,
             model_provider="openai",
             api_key=api_key,
+            timeout=timeout,
+            max_retries=max_retries,
+            include_response_headers=True,
+            stream_usage=True
         )
     elif provider == "anthropic":
         llm = init_chat_model(
             model=model_name,
             model_provider="anthropic",
             api_key=api_key,
-            max_tokens=8192
+            max_tokens=8192,
+            # El cliente de Anthropic acepta un solo timeout, se usa el de lectura
+            timeout=read_timeout,
+            max_retries=max_retries,
+            # Anthropic solo cachea los prefijos marcados con cache_control
+            metadata={"prompt_cache_control": ANTHROPIC_CACHE_CONTROL}
         )
     elif provider == "ibm_model_gateway":
         llm = init_chat_model(
@@ -38,8 +69,103 @@ def get_llm(model_info: dict) -> BaseChatModel:
             model_provider="openai",
             api_key=api_key,
             base_url=endpoint,
-            max_tokens=8192
+            max_tokens=8192,
+            timeout=timeout,
+            max_retries=max_retries,
+            include_response_headers=True,
+            stream_usage=True
         )  
     else:
         raise ValueError(f"Unsupported provider: {provider}")
-    return llm
\ No newline at end of file
+    return llm
+
+
+def build_prefixed_prompt(llm: BaseChatModel, prefix: str, suffix: str) -> LanguageModelInput:
+    """
+    Build a prompt made of a prefix shared between calls and a variable suffix.
+    Providers that cache prefixes automatically get the plain text; providers
+    that need explicit markers get the prefix as its own content block marked
+    with their cache control.
+    """
+    cache_control = (getattr(llm, "metadata", None) or {}).get("prompt_cache_control")
+    if not cache_control:
+        return prefix + suffix
+    return [HumanMessage(content=[
+        {"type": "text", "text": prefix, "cache_control": cache_control},
+        {"type": "text", "text": suffix},
+    ])]
+
+
+def get_total_timeout(llm: BaseChatModel) -> Optional[float]:
+    """
+    Return the maximum seconds a whole call to the LLM may take, or None if it has no limit.
+    """
+    return (getattr(llm, "metadata", None) or {}).get("total_timeout")
+
+
+async def stream_with_timeout(stream: AsyncIterator[T], timeout: Optional[float]) -> AsyncIterator[T]:
+    """
+    Iterate a stream that must end within timeout seconds, raising TimeoutError
+    otherwise. The stream runs in its own task so the timeout only ever cancels
+    the stream and never the code consuming it.
+    """
+    if not timeout:
+        async for item in stream:
+            yield item
+        return
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def produce() -> None:
+        try:
+            async with asyncio.timeout(timeout):
+                async for item in stream:
+                    queue.put_nowait((True, item))
+        except TimeoutError:
+            queue.put_nowait((False, TimeoutError(f"LLM call did not finish within {timeout}s")))
+        except Exception as e:
+            queue.put_nowait((False, e))
+        else:
+            queue.put_nowait((False, None))
+
+    task = asyncio.create_task(produce())
+    try:
+        while True:
+            ok, item = await queue.get()
+            if ok:
+                yield item
+            elif item is None:
+                return
+            else:
+                raise item
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def invoke_with_timeout(llm: BaseChatModel, prompt, **kwargs):
+    """
+    Call the LLM once, raising TimeoutError if it takes longer than its total timeout.
+    """
+    timeout = get_total_timeout(llm)
+    try:
+        return await asyncio.wait_for(llm.ainvoke(prompt, **kwargs), timeout)
+    except TimeoutError:
+        raise TimeoutError(f"LLM call did not finish within {timeout}s")
+
+
+async def stream_text(llm: BaseChatModel, prompt, usage: LLMUsage = None, **kwargs) -> AsyncIterator[str]:
+    """
+    Stream the text chunks of an LLM response, skipping empty ones. The whole
+    response must arrive within the total timeout of the LLM.
+    When usage is given, the token usage and latency of the call are recorded in it.
+    """
+    if usage is not None:
+        usage.start()
+    async for chunk in stream_with_timeout(llm.astream(prompt, **kwargs), get_total_timeout(llm)):
+        if usage is not None:
+            usage.observe(chunk)
+        text = chunk.text()
+        if text:
+            yield text
+    if usage is not None:
+        usage.finish()
@@ -0,0 +1,20 @@
+from src.database.base_model import Base
+from sqlalchemy import Column, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+
+
+class LLMCacheEntry(Base):
+    """
+    Cached LLM response, keyed by the hash of the prompt, model and parameters.
+    """
+    __tablename__ = "llm_cache"
+
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=True)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('llm_cache_created_at_idx', 'created_at'),
+    )
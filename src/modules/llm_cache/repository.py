@@ -0,0 +1,55 @@
+from datetime import datetime
+from src.database.base_repo import BaseRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import select, delete, func
+from .models import LLMCacheEntry
+
+
+class LLMCacheRepo(BaseRepository[LLMCacheEntry]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, LLMCacheEntry)
+
+    async def get_valid(self, key: str, now: datetime) -> LLMCacheEntry | None:
+        query = select(LLMCacheEntry).where(
+            LLMCacheEntry.key == key,
+            LLMCacheEntry.expires_at > now
+        )
+        result = await self.session.execute(query)
+        return result.scalars().first()
+
+    async def upsert(self, key: str, model: str, response: str, expires_at: datetime) -> None:
+        query = insert(LLMCacheEntry).values(
+            key=key,
+            model=model,
+            response=response,
+            expires_at=expires_at
+        ).on_conflict_do_update(
+            index_elements=[LLMCacheEntry.key],
+            set_={"model": model, "response": response, "expires_at": expires_at, "created_at": func.now()}
+        )
+        await self.session.execute(query)
+
+    async def delete_expired(self, now: datetime) -> int:
+        result = await self.session.execute(
+            delete(LLMCacheEntry).where(LLMCacheEntry.expires_at <= now)
+        )
+        return result.rowcount
+
+    async def trim(self, max_entries: int) -> int:
+        """
+        Delete the oldest entries beyond max_entries.
+        """
+        oldest = (
+            select(LLMCacheEntry.key)
+            .order_by(LLMCacheEntry.created_at.desc())
+            .offset(max_entries)
+        )
+        result = await self.session.execute(
+            delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(oldest))
+        )
+        return result.rowcount
+
+    async def clear(self) -> int:
+        result = await self.session.execute(delete(LLMCacheEntry))
+        return result.rowcount
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException, Depends
+from src.utils import get_transaction_id
+from src.schemas import ResponseSchema
+from .service import llm_cache
+
+router = APIRouter(prefix="/llm_cache")
+
+
+@router.get("/stats")
+async def get_llm_cache_stats(transaction_id: str = Depends(get_transaction_id)):
+    """
+    Retrieve the hit/miss counters of the LLM response cache of this process.
+    """
+    return ResponseSchema(
+        transaction_id=transaction_id,
+        data=llm_cache.stats()
+    )
+
+
+@router.delete("/")
+async def clear_llm_cache(transaction_id: str = Depends(get_transaction_id)):
+    """
+    Remove every cached LLM response.
+    """
+    try:
+        deleted = await llm_cache.clear()
+        return ResponseSchema(
+            transaction_id=transaction_id,
+            data={"deleted": deleted}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"transaction_id": transaction_id,
+                    "error": f"An error occurred while clearing the LLM cache: {str(e)}"}
+        )
@@ -0,0 +1,176 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from src.database.core import get_graph_session
+from src.config import system_config
+from .repository import LLMCacheRepo
+import hashlib
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Tamaño de los fragmentos en que se reenvía una respuesta cacheada
+CACHED_CHUNK_CHARS = 2000
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalize a prompt so formatting-only differences map to the same key.
+    """
+    return "\n".join(line.rstrip() for line in (prompt or "").strip().splitlines())
+
+
+def make_cache_key(prompt: str, model: str, params: dict = None) -> str:
+    """
+    Hash the normalized prompt, the model internal name and the generation parameters.
+    """
+    raw = json.dumps(
+        {"prompt": normalize_prompt(prompt), "model": model or "", "params": params or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Process-wide LLM response cache: an in-process LRU in front of the llm_cache
+    table in Postgres. Entries expire after ttl_seconds and the table keeps at
+    most max_entries rows (oldest are evicted first).
+
+    Cache errors never fail the LLM call: a failed read is a miss and a failed
+    write is only logged.
+    """
+
+    def __init__(self, lru_size: int = None, ttl_seconds: int = None, max_entries: int = None,
+                 enabled: bool = None):
+        self.lru_size = lru_size or system_config.LLM_CACHE_LRU_SIZE
+        self.ttl_seconds = ttl_seconds or system_config.LLM_CACHE_TTL_SECONDS
+        self.max_entries = max_entries or system_config.LLM_CACHE_MAX_ENTRIES
+        self.enabled = system_config.LLM_CACHE_ENABLED if enabled is None else enabled
+        self._lru: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._writes = 0
+        self.counters = {"memory_hits": 0, "db_hits": 0, "misses": 0, "bypassed": 0, "errors": 0}
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        entry = self._lru.get(key)
+        if entry is None:
+            return None
+        response, expires_at = entry
+        if expires_at <= time.time():
+            del self._lru[key]
+            return None
+        self._lru.move_to_end(key)
+        return response
+
+    def _set_memory(self, key: str, response: str, expires_at: float) -> None:
+        self._lru[key] = (response, expires_at)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached response for a key, or None on a miss.
+        """
+        response = self._get_memory(key)
+        if response is not None:
+            self.counters["memory_hits"] += 1
+            return response
+        try:
+            async with get_graph_session() as session:
+                entry = await LLMCacheRepo(session).get_valid(key, datetime.utcnow())
+        except Exception as e:
+            self.counters["errors"] += 1
+            logger.warning("LLM cache read failed: %s", e)
+            entry = None
+        if entry is None:
+            self.counters["misses"] += 1
+            return None
+        self.counters["db_hits"] += 1
+        expires_in = (entry.expires_at - datetime.utcnow()).total_seconds()
+        self._set_memory(key, entry.response, time.time() + expires_in)
+        return entry.response
+
+    async def set(self, key: str, model: str, response: str) -> None:
+        """
+        Store a response in memory and in Postgres, evicting expired and excess rows
+        from time to time.
+        """
+        if not response:
+            return
+        self._set_memory(key, response, time.time() + self.ttl_seconds)
+        self._writes += 1
+        try:
+            async with get_graph_session() as session:
+                repo = LLMCacheRepo(session)
+                now = datetime.utcnow()
+                await repo.upsert(key, model, response, now + timedelta(seconds=self.ttl_seconds))
+                if self._writes % 100 == 0:
+                    await repo.delete_expired(now)
+                    await repo.trim(self.max_entries)
+        except Exception as e:
+            self.counters["errors"] += 1
+            logger.warning("LLM cache write failed: %s", e)
+
+    async def cached_call(self, key: str, model: str, call: Callable[[], Awaitable[str]],
+                          bypass: bool = False) -> str:
+        """
+        Return the cached response for the key, or run the call and cache its result.
+        """
+        if bypass or not self.enabled:
+            self.counters["bypassed"] += 1
+            return await call()
+        response = await self.get(key)
+        if response is not None:
+            return response
+        response = await call()
+        await self.set(key, model, response)
+        return response
+
+    async def cached_stream(self, key: str, model: str, stream: Callable[[], AsyncIterator[str]],
+                            bypass: bool = False) -> AsyncIterator[str]:
+        """
+        Stream the response for the key. A cached response is yielded in chunks of
+        CACHED_CHUNK_CHARS characters; otherwise the chunks of the stream are yielded
+        and cached when it ends.
+        """
+        if bypass or not self.enabled:
+            self.counters["bypassed"] += 1
+            async for chunk in stream():
+                yield chunk
+            return
+        response = await self.get(key)
+        if response is not None:
+            for start in range(0, len(response), CACHED_CHUNK_CHARS):
+                yield response[start:start + CACHED_CHUNK_CHARS]
+            return
+        chunks = []
+        async for chunk in stream():
+            chunks.append(chunk)
+            yield chunk
+        await self.set(key, model, "".join(chunks))
+
+    def stats(self) -> dict:
+        hits = self.counters["memory_hits"] + self.counters["db_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._lru),
+            "enabled": self.enabled,
+        }
+
+    async def clear(self) -> int:
+        """
+        Remove every cached response.
+        """
+        self._lru.clear()
+        async with get_graph_session() as session:
+            return await LLMCacheRepo(session).clear()
+
+
+llm_cache = LLMResponseCache()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Integer
 from sqlalchemy.orm import relationship
 from src.database.base_model import BaseModel
   
@@ -9,5 +9,9 @@ class Provider(BaseModel):
     key = Column(String, nullable=True)
     endpoint = Column(String, nullable=True)
     deployment = Column(String, nullable=True)
+    rpm_limit = Column(Integer, nullable=True) # Requests por minuto entre todos sus LLMs
+    tpm_limit = Column(Integer, nullable=True) # Tokens por minuto entre todos sus LLMs
+    # Sube con cada cambio que afecta a los clientes ya construidos (credenciales y límites)
+    credential_version = Column(Integer, nullable=False, default=1, server_default="1")
     
     llms = relationship("LLM", back_populates="provider")
\ No newline at end of file
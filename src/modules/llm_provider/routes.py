@@ -96,6 +96,8 @@ async def create_provider(
             key=request.key,
             endpoint=request.endpoint,
             deployment=request.deployment,
+            rpm_limit=request.rpm_limit,
+            tpm_limit=request.tpm_limit,
         )
         return ResponseSchema(
             transaction_id=transaction_id,
@@ -137,6 +139,8 @@ async def update_provider(
             key=update_data.get("key"),
             endpoint=update_data.get("endpoint"),
             deployment=update_data.get("deployment"),
+            rpm_limit=update_data.get("rpm_limit"),
+            tpm_limit=update_data.get("tpm_limit"),
         )
         return ResponseSchema(
             transaction_id=transaction_id,
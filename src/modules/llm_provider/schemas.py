@@ -8,6 +8,8 @@ class ProviderBase(BaseModel):
     key: Optional[str] = None
     endpoint: Optional[str] = None
     deployment: Optional[str] = None
+    rpm_limit: Optional[int] = None
+    tpm_limit: Optional[int] = None
 
 
 class CreateProvider(ProviderBase):
@@ -25,3 +27,5 @@ class UpdateProvider(BaseModel):
     key: Optional[str] = None
     endpoint: Optional[str] = None
     deployment: Optional[str] = None
+    rpm_limit: Optional[int] = None  # 0 quita el límite
+    tpm_limit: Optional[int] = None  # 0 quita el límite
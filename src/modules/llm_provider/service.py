@@ -3,6 +3,8 @@ from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.modules.secrets import get_provider as get_secret_provider
+from src.modules.llm.registry import llm_registry
+from src.modules.rate_limit.service import validate_rate_limit
 from .models import Provider
 from .repository import LLMProviderRepo
 
@@ -77,17 +79,30 @@ class LLMProviderService:
             "name": provider.name,
             "created_at": provider.created_at,
             "updated_at": provider.updated_at,
-            "key": self._retrieve_secret_value(provider.key),
-            "endpoint": self._retrieve_secret_value(provider.endpoint),
-            "deployment": self._retrieve_secret_value(provider.deployment),
+            **await self.get_provider_secrets(provider),
+            "rpm_limit": provider.rpm_limit,
+            "tpm_limit": provider.tpm_limit,
         }
 
+    async def get_provider_secrets(self, provider: Provider) -> dict:
+        """
+        Retrieve the decrypted secret values of a provider in one batch.
+        """
+        names = {"key": provider.key, "endpoint": provider.endpoint, "deployment": provider.deployment}
+        try:
+            values = await self.secret_provider.get_secrets(names.values())
+        except Exception as exc:
+            raise ValueError(f"Failed to retrieve secret value: {str(exc)}")
+        return {field: values.get(name) if name else None for field, name in names.items()}
+
     async def create_provider(
         self,
         name: str,
         key: Optional[str] = None,
         endpoint: Optional[str] = None,
         deployment: Optional[str] = None,
+        rpm_limit: Optional[int] = None,
+        tpm_limit: Optional[int] = None,
     ) -> Provider:
         """
         Create a new provider, persisting sensitive data in the secrets backend.
@@ -109,9 +124,11 @@ class LLMProviderService:
 
         provider = Provider(
             name=name.strip(),
-            key=self._store_secret_value(key),
-            endpoint=self._store_secret_value(endpoint),
-            deployment=self._store_secret_value(deployment),
+            key=await self._store_secret_value(key),
+            endpoint=await self._store_secret_value(endpoint),
+            deployment=await self._store_secret_value(deployment),
+            rpm_limit=validate_rate_limit("rpm_limit", rpm_limit),
+            tpm_limit=validate_rate_limit("tpm_limit", tpm_limit),
         )
 
         return await self.provider_repo.add(provider)
@@ -123,11 +140,16 @@ class LLMProviderService:
         key: Optional[str] = None,
         endpoint: Optional[str] = None,
         deployment: Optional[str] = None,
+        rpm_limit: Optional[int] = None,
+        tpm_limit: Optional[int] = None,
     ) -> Provider:
         """
         Update provider metadata and optionally rotate stored secrets.
+        A rate limit of 0 removes the limit.
         """
         provider = await self.get_provider_by_id(provider_id)
+        # Los valores cacheados de los secretos actuales dejan de ser válidos
+        self._invalidate_secrets(provider)
 
         if name is not None:
             if not name.strip():
@@ -140,15 +162,25 @@ class LLMProviderService:
             provider.name = name.strip()
 
         if key is not None:
-            provider.key = self._store_secret_value(key)
+            provider.key = await self._store_secret_value(key)
 
         if endpoint is not None:
-            provider.endpoint = self._store_secret_value(endpoint)
+            provider.endpoint = await self._store_secret_value(endpoint)
 
         if deployment is not None:
-            provider.deployment = self._store_secret_value(deployment)
+            provider.deployment = await self._store_secret_value(deployment)
+
+        if rpm_limit is not None:
+            provider.rpm_limit = validate_rate_limit("rpm_limit", rpm_limit)
 
-        return await self.provider_repo.update(provider)
+        if tpm_limit is not None:
+            provider.tpm_limit = validate_rate_limit("tpm_limit", tpm_limit)
+
+        # Los clientes ya construidos (en cualquier proceso) usan la configuración anterior
+        provider.credential_version = (provider.credential_version or 1) + 1
+        provider = await self.provider_repo.update(provider)
+        llm_registry.evict()
+        return provider
 
     async def delete_provider(self, provider_id: str) -> None:
         """
@@ -156,8 +188,10 @@ class LLMProviderService:
         """
         provider = await self.get_provider_by_id(provider_id)
         await self.provider_repo.delete(provider)
+        self._invalidate_secrets(provider)
+        llm_registry.evict()
 
-    def _store_secret_value(self, value: Optional[str]) -> Optional[str]:
+    async def _store_secret_value(self, value: Optional[str]) -> Optional[str]:
         """
         Persist a sensitive value in the configured secrets provider.
         """
@@ -169,20 +203,15 @@ class LLMProviderService:
             raise ValueError("Secret values cannot be empty.")
 
         try:
-            return self.secret_provider.set_secret(sanitized)
+            return await self.secret_provider.set_secret(sanitized)
         except Exception as exc:
             raise ValueError(f"Failed to persist secret value: {str(exc)}")
 
-    def _retrieve_secret_value(self, name: Optional[str]) -> Optional[str]:
+    def _invalidate_secrets(self, provider: Provider) -> None:
         """
-        Fetch a secret value from the configured secrets backend.
+        Drop the cached values of the secrets of a provider.
         """
-        if not name:
-            return None
-        try:
-            return self.secret_provider.get_secret(name)
-        except Exception as exc:
-            raise ValueError(f"Failed to retrieve secret value: {str(exc)}")
+        self.secret_provider.invalidate([provider.key, provider.endpoint, provider.deployment])
 
     def _validate_required_credentials(
         self, 
@@ -1,5 +1,5 @@
 from src.database.base_model import BaseModel
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Float, String
 from sqlalchemy.orm import relationship
 
 class Organization(BaseModel):
@@ -7,6 +7,8 @@ class Organization(BaseModel):
     
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
+    # Peso de la organización al repartir los workers de jobs entre organizaciones
+    job_weight = Column(Float, nullable=False, default=1.0, server_default="1")
     
     documents = relationship("Document", back_populates="organization")
     templates = relationship("Template", back_populates="organization")
@@ -37,7 +37,8 @@ async def create_organization(request: CreateOrganization,
     """
     organization_service = OrganizationService(session)
     try:
-        organization = await organization_service.create_organization(request.name, request.description)
+        organization = await organization_service.create_organization(request.name, request.description,
+                                                                       request.job_weight)
         return ResponseSchema(
             transaction_id=transaction_id,
             data=jsonable_encoder(organization)
@@ -6,4 +6,5 @@ class CreateOrganization(BaseModel):
     Schema for creating an organization.
     """
     name: str
-    description: Optional[str] = None  # Optional field, can be None
\ No newline at end of file
+    description: Optional[str] = None  # Optional field, can be None
+    job_weight: Optional[float] = None  # Share of the job workers relative to other organizations (default 1)
@@ -15,17 +15,21 @@ class OrganizationService:
         organizations = await self.organization_repo.get_all()
         return organizations
     
-    async def create_organization(self, name: str, description: str = None) -> Organization:
+    async def create_organization(self, name: str, description: str = None, job_weight: float = None) -> Organization:
         """
         Create a new organization.
         """
         if not name:
             raise ValueError("Organization name cannot be empty.")
         
+        if job_weight is not None and job_weight <= 0:
+            raise ValueError("Organization job weight must be greater than zero.")
+        
         if await self.organization_repo.get_by_name(name):
             raise ValueError(f"Organization with name {name} already exists.")
         
-        new_organization = Organization(name=name, description=description)
+        new_organization = Organization(name=name, description=description,
+                                        job_weight=job_weight if job_weight is not None else 1.0)
         
         organization = await self.organization_repo.add(new_organization)
         if not organization:
@@ -0,0 +1,123 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Optional
+from src.database.core import get_graph_session
+from .repository import RateLimitRepo
+import time
+
+
+@dataclass(frozen=True)
+class Bucket:
+    """
+    Token bucket for a per-minute quota: holds up to limit tokens and refills
+    limit tokens per minute.
+    """
+    key: str
+    limit: int
+
+    @property
+    def capacity(self) -> float:
+        return float(self.limit)
+
+    @property
+    def rate(self) -> float:
+        return self.limit / 60.0
+
+    def refill(self, tokens: float, elapsed: float) -> float:
+        return min(self.capacity, tokens + elapsed * self.rate)
+
+
+# Recibe los tokens actuales de cada bucket y devuelve los nuevos (o None si no cambian)
+BucketUpdate = Callable[[dict[str, float]], Optional[dict[str, float]]]
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage of the token buckets. Backends only provide an atomic
+    read-modify-write over a group of buckets; the bucket operations are
+    built on top of it.
+    """
+
+    @abstractmethod
+    async def transact(self, buckets: list[Bucket], change: BucketUpdate) -> None:
+        """
+        Atomically read the refilled tokens of the buckets and write what change returns.
+        """
+
+    async def take(self, amounts: dict[Bucket, float]) -> float:
+        """
+        Take the amounts from every bucket if all of them have enough, and return 0.
+        Otherwise take nothing and return the seconds until all of them will have
+        enough. Amounts over the capacity of a bucket are capped to it so a large
+        request can still pass when the bucket is full.
+        """
+        wait = 0.0
+        needed = {bucket: min(amount, bucket.capacity) for bucket, amount in amounts.items()}
+
+        def change(current: dict[str, float]) -> Optional[dict[str, float]]:
+            nonlocal wait
+            missing = [(amount - current[bucket.key]) / bucket.rate
+                       for bucket, amount in needed.items() if current[bucket.key] < amount]
+            if missing:
+                wait = max(missing)
+                return None
+            return {bucket.key: current[bucket.key] - amount for bucket, amount in needed.items()}
+
+        await self.transact(list(amounts), change)
+        return wait
+
+    async def adjust(self, deltas: dict[Bucket, float]) -> None:
+        """
+        Add (or, when negative, remove) tokens without waiting. Buckets may go
+        below zero, which makes the next callers wait longer.
+        """
+        await self.transact(list(deltas), lambda current: {
+            bucket.key: min(bucket.capacity, current[bucket.key] + delta)
+            for bucket, delta in deltas.items()
+        })
+
+    async def limit_to(self, values: dict[Bucket, float]) -> None:
+        """
+        Lower the tokens of the buckets to at most the given values.
+        """
+        await self.transact(list(values), lambda current: {
+            bucket.key: min(current[bucket.key], value)
+            for bucket, value in values.items()
+        })
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Buckets of this process only.
+    """
+
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    async def transact(self, buckets: list[Bucket], change: BucketUpdate) -> None:
+        now = time.monotonic()
+        current = {}
+        for bucket in buckets:
+            tokens, updated_at = self._buckets.get(bucket.key, (bucket.capacity, now))
+            current[bucket.key] = bucket.refill(tokens, now - updated_at)
+        values = change(current)
+        for key, tokens in (values or {}).items():
+            self._buckets[key] = (tokens, now)
+
+
+class PostgresRateLimitBackend(RateLimitBackend):
+    """
+    Buckets in the rate_limit_bucket table, shared by every API and worker
+    process. Each operation locks the rows of its buckets for one short
+    transaction and uses the database clock, so workers on different hosts agree.
+    """
+
+    async def transact(self, buckets: list[Bucket], change: BucketUpdate) -> None:
+        by_key = {bucket.key: bucket for bucket in buckets}
+        async with get_graph_session() as session:
+            repo = RateLimitRepo(session)
+            rows = await repo.lock_buckets({key: bucket.capacity for key, bucket in by_key.items()})
+            current = {key: by_key[key].refill(tokens, elapsed) for key, (tokens, elapsed) in rows.items()}
+            values = change(current)
+            if values:
+                await repo.set_tokens(values)
@@ -0,0 +1,15 @@
+from src.database.base_model import Base
+from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy.sql import func
+
+
+class RateLimitBucket(Base):
+    """
+    Token bucket shared by every process, for the request or token quota of
+    an LLM or a provider. Tokens are refilled lazily from updated_at.
+    """
+    __tablename__ = "rate_limit_bucket"
+
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -0,0 +1,42 @@
+from src.database.base_repo import BaseRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import select, update, func, extract
+from .models import RateLimitBucket
+
+
+class RateLimitRepo(BaseRepository[RateLimitBucket]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, RateLimitBucket)
+
+    async def lock_buckets(self, initial_tokens: dict[str, float]) -> dict[str, tuple[float, float]]:
+        """
+        Lock the rows of the given buckets until the end of the transaction,
+        creating the missing ones full. Returns key -> (tokens, seconds since the
+        last update). Rows are locked in key order so concurrent callers cannot deadlock.
+        """
+        await self.session.execute(
+            insert(RateLimitBucket)
+            .values([{"key": key, "tokens": tokens} for key, tokens in initial_tokens.items()])
+            .on_conflict_do_nothing(index_elements=[RateLimitBucket.key])
+        )
+        query = (
+            select(
+                RateLimitBucket.key,
+                RateLimitBucket.tokens,
+                extract("epoch", func.now() - RateLimitBucket.updated_at)
+            )
+            .where(RateLimitBucket.key.in_(list(initial_tokens)))
+            .order_by(RateLimitBucket.key)
+            .with_for_update()
+        )
+        result = await self.session.execute(query)
+        return {key: (tokens, max(float(elapsed or 0), 0.0)) for key, tokens, elapsed in result.all()}
+
+    async def set_tokens(self, tokens: dict[str, float]) -> None:
+        for key, value in tokens.items():
+            await self.session.execute(
+                update(RateLimitBucket)
+                .where(RateLimitBucket.key == key)
+                .values(tokens=value, updated_at=func.now())
+            )
@@ -0,0 +1,227 @@
+from functools import lru_cache
+from typing import Any, Optional
+from uuid import UUID
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+from src.config import system_config
+from .backends import Bucket, RateLimitBackend, MemoryRateLimitBackend, PostgresRateLimitBackend
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Estimación de tokens del prompt antes de la llamada (se corrige con el uso real)
+CHARS_PER_TOKEN = 4
+# Máximo que duerme un llamador antes de volver a revisar los buckets
+MAX_WAIT_SECONDS = 5.0
+
+# Headers de rate limit de los proveedores: dimensión -> (header del límite, header de lo que queda)
+RATE_LIMIT_HEADERS = {
+    "requests": [
+        ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests"),
+        ("anthropic-ratelimit-requests-limit", "anthropic-ratelimit-requests-remaining"),
+    ],
+    "tokens": [
+        ("x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens"),
+        ("anthropic-ratelimit-tokens-limit", "anthropic-ratelimit-tokens-remaining"),
+    ],
+}
+
+
+def _to_number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rate_limit_headers(headers: dict) -> dict[str, dict[str, float]]:
+    """
+    Read the quota limits and remaining amounts reported by the provider.
+    Returns dimension ("requests" or "tokens") -> {"limit", "remaining"}.
+    """
+    headers = {str(name).lower(): value for name, value in (headers or {}).items()}
+    quotas = {}
+    for dimension, names in RATE_LIMIT_HEADERS.items():
+        for limit_name, remaining_name in names:
+            quota = {
+                "limit": _to_number(headers.get(limit_name)),
+                "remaining": _to_number(headers.get(remaining_name)),
+            }
+            quota = {name: value for name, value in quota.items() if value is not None}
+            if quota:
+                quotas[dimension] = quota
+                break
+    return quotas
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """
+    Return the seconds to wait after a rate limit (429) error, or None if the
+    error is not one.
+    """
+    if getattr(error, "status_code", None) != 429:
+        return None
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = _to_number(headers.get("retry-after"))
+    return retry_after if retry_after is not None else 1.0
+
+
+def validate_rate_limit(name: str, value: Optional[int]) -> Optional[int]:
+    """
+    Validate a per-minute limit given on create or update; 0 means no limit.
+    """
+    if value is None:
+        return None
+    if value < 0:
+        raise ValueError(f"{name} cannot be negative.")
+    return value or None
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits of LLMs and providers,
+    as token buckets in a backend shared by the processes that must respect the
+    same quota.
+
+    Callers in one process queue on a local lock per LLM, so only the first
+    one polls the backend. Limits reported by the provider in its rate-limit
+    headers are learned for the LLMs that have none configured.
+    """
+
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+        self.learned: dict[str, int] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def buckets(self, llm_id: str, provider_id: str, llm_limits: dict, provider_limits: dict) -> dict[str, list[Bucket]]:
+        """
+        Get the buckets of an LLM call by dimension ("requests" or "tokens").
+        """
+        buckets = {"requests": [], "tokens": []}
+        for dimension, limit_name in (("requests", "rpm"), ("tokens", "tpm")):
+            llm_key = f"llm:{llm_id}:{dimension}"
+            llm_limit = llm_limits.get(limit_name) or self.learned.get(llm_key)
+            if llm_limit:
+                buckets[dimension].append(Bucket(llm_key, int(llm_limit)))
+            if provider_limits.get(limit_name):
+                buckets[dimension].append(Bucket(f"provider:{provider_id}:{dimension}",
+                                                 int(provider_limits[limit_name])))
+        return buckets
+
+    async def acquire(self, lock_key: str, amounts: dict[Bucket, float]) -> None:
+        """
+        Wait until every bucket has enough and take the amounts.
+        """
+        if not amounts:
+            return
+        lock = self._locks.setdefault(lock_key, asyncio.Lock())
+        async with lock:
+            while True:
+                wait = await self.backend.take(amounts)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(min(wait, MAX_WAIT_SECONDS))
+
+    async def observe(self, llm_id: str, buckets: dict[str, list[Bucket]], headers: dict) -> None:
+        """
+        Adapt to the rate-limit headers of a response: buckets of the LLM are
+        lowered to what the provider says is left, and the limit is learned
+        when the LLM has none configured.
+        """
+        for dimension, quota in parse_rate_limit_headers(headers).items():
+            llm_key = f"llm:{llm_id}:{dimension}"
+            llm_bucket = next((bucket for bucket in buckets[dimension] if bucket.key == llm_key), None)
+            if llm_bucket is None and quota.get("limit"):
+                self.learned[llm_key] = int(quota["limit"])
+                llm_bucket = Bucket(llm_key, int(quota["limit"]))
+            if llm_bucket is not None and "remaining" in quota:
+                await self.backend.limit_to({llm_bucket: quota["remaining"]})
+
+    async def pause(self, buckets: list[Bucket], seconds: float) -> None:
+        """
+        Empty the buckets so every process waits the given seconds before the next call.
+        """
+        if buckets:
+            await self.backend.limit_to({bucket: -bucket.rate * seconds for bucket in buckets})
+
+
+class RateLimitCallback(AsyncCallbackHandler):
+    """
+    Callback attached to an LLM client that waits for its rate limits before
+    each call, settles the token estimate with the real usage afterwards and
+    backs off every process when the provider answers 429.
+    """
+
+    raise_error = False
+
+    def __init__(self, limiter: RateLimiter, llm_id: str, provider_id: str,
+                 llm_limits: dict, provider_limits: dict):
+        self.limiter = limiter
+        self.llm_id = str(llm_id)
+        self.provider_id = str(provider_id)
+        self.llm_limits = llm_limits
+        self.provider_limits = provider_limits
+        self._estimates: dict[UUID, int] = {}
+
+    def _buckets(self) -> dict[str, list[Bucket]]:
+        return self.limiter.buckets(self.llm_id, self.provider_id, self.llm_limits, self.provider_limits)
+
+    async def on_chat_model_start(self, serialized: dict, messages: list[list[BaseMessage]], *,
+                                  run_id: UUID, **kwargs: Any) -> None:
+        estimate = sum(estimate_tokens(message.text()) for batch in messages for message in batch)
+        self._estimates[run_id] = estimate
+        buckets = self._buckets()
+        amounts = {bucket: 1 for bucket in buckets["requests"]}
+        amounts.update({bucket: estimate for bucket in buckets["tokens"]})
+        try:
+            await self.limiter.acquire(self.llm_id, amounts)
+        except Exception as e:
+            # Si el backend falla la llamada sigue sin límite
+            logger.warning("Rate limiter unavailable for LLM %s: %s", self.llm_id, e)
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        estimate = self._estimates.pop(run_id, 0)
+        generation = response.generations[0][0] if response.generations and response.generations[0] else None
+        message = getattr(generation, "message", None)
+        usage = getattr(message, "usage_metadata", None) or {}
+        used = usage.get("total_tokens") or estimate + estimate_tokens(getattr(generation, "text", ""))
+        buckets = self._buckets()
+        try:
+            if buckets["tokens"] and used != estimate:
+                await self.limiter.backend.adjust({bucket: estimate - used for bucket in buckets["tokens"]})
+            headers = (getattr(message, "response_metadata", None) or {}).get("headers")
+            if headers:
+                await self.limiter.observe(self.llm_id, buckets, headers)
+        except Exception as e:
+            logger.warning("Failed to settle rate limits for LLM %s: %s", self.llm_id, e)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._estimates.pop(run_id, None)
+        retry_after = get_retry_after(error)
+        if retry_after is None:
+            return
+        logger.warning("LLM %s was rate limited, pausing for %ss", self.llm_id, retry_after)
+        buckets = self._buckets()
+        try:
+            await self.limiter.pause(buckets["requests"] + buckets["tokens"], retry_after)
+        except Exception as e:
+            logger.warning("Failed to pause rate limits for LLM %s: %s", self.llm_id, e)
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    backend = system_config.RATE_LIMIT_BACKEND
+
+    if backend == "postgres":
+        return RateLimiter(PostgresRateLimitBackend())
+    if backend == "memory":
+        return RateLimiter(MemoryRateLimitBackend())
+
+    raise ValueError(f"RATE_LIMIT_BACKEND '{backend}' no soportado")
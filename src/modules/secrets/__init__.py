@@ -19,8 +19,8 @@ def get_provider() -> SecretProvider:
 
     raise ValueError(f"SECRETS_PROVIDER '{backend}' no soportado")
 
-def get_secret(name: str) -> Optional[str]:
-    return get_provider().get_secret(name)
+async def get_secret(name: str) -> Optional[str]:
+    return await get_provider().get_secret(name)
 
-def set_secret(value: str) -> str:
-    return get_provider().set_secret(value)
+async def set_secret(value: str) -> str:
+    return await get_provider().set_secret(value)
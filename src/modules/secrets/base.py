@@ -1,16 +1,79 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterable, Optional
+from src.config import system_config
+import asyncio
+import time
 import uuid
 
 class SecretProvider(ABC):
+    """
+    Async access to a secrets backend. Backends implement blocking reads and
+    writes, which run in a worker thread so SDK network calls do not block the
+    event loop. Values read are kept in memory for cache_ttl seconds; callers
+    invalidate them when the secrets they point to change.
+    """
+
+    def __init__(self, cache_ttl: Optional[int] = None):
+        self.cache_ttl = system_config.SECRETS_CACHE_TTL_SECONDS if cache_ttl is None else cache_ttl
+        self._cache: dict[str, tuple[str, float]] = {}
+
     @abstractmethod
-    def get_secret(self, name: str) -> Optional[str]:
+    def _read_secret(self, name: str) -> Optional[str]:
         ...
 
     @abstractmethod
-    def set_secret(self, value: str) -> str:
+    def _write_secret(self, name: str, value: str) -> None:
         ...
 
+    async def _aread_secret(self, name: str) -> Optional[str]:
+        return await asyncio.to_thread(self._read_secret, name)
+
+    async def _awrite_secret(self, name: str, value: str) -> None:
+        await asyncio.to_thread(self._write_secret, name, value)
+
+    async def get_secret(self, name: str) -> Optional[str]:
+        return (await self.get_secrets([name])).get(name)
+
+    async def get_secrets(self, names: Iterable[str]) -> dict[str, Optional[str]]:
+        """
+        Get several secrets at once: cached values are returned directly and the
+        rest are read concurrently.
+        """
+        now = time.monotonic()
+        result: dict[str, Optional[str]] = {}
+        missing = []
+        for name in dict.fromkeys(name for name in names if name):
+            cached = self._cache.get(name)
+            if cached is not None and cached[1] > now:
+                result[name] = cached[0]
+            else:
+                missing.append(name)
+        values = await asyncio.gather(*(self._aread_secret(name) for name in missing))
+        for name, value in zip(missing, values):
+            result[name] = value
+            # Los secretos no encontrados no se cachean, pueden ser un error transitorio
+            if value is not None and self.cache_ttl > 0:
+                self._cache[name] = (value, now + self.cache_ttl)
+        return result
+
+    async def set_secret(self, value: str) -> str:
+        name = self.generate_unique_name()
+        await self._awrite_secret(name, value)
+        if self.cache_ttl > 0:
+            self._cache[name] = (value, time.monotonic() + self.cache_ttl)
+        return name
+
+    def invalidate(self, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Drop cached values, of the given secrets or all of them.
+        """
+        if names is None:
+            self._cache.clear()
+            return
+        for name in names:
+            if name:
+                self._cache.pop(name, None)
+
     def generate_unique_name(self, prefix: str = "secret") -> str:
         unique_id = str(uuid.uuid4())[:8]
         return f"{prefix}-{unique_id}"
@@ -1,4 +1,6 @@
 import json
+import os
+import tempfile
 from pathlib import Path
 from threading import Lock
 from typing import Optional
@@ -11,9 +13,17 @@ class LocalFileSecretProvider(SecretProvider):
     """
     Stores secrets in a local JSON file for development.
     NOT for production use.
+
+    The file is read once into an in-memory index that serves every read; it
+    is read again only when a secret is missing and the file changed (written
+    by another process). Writes first reload the index if the file changed,
+    so secrets written by another process are kept, and replace the file
+    atomically (temporary file + rename), so a crash never leaves a truncated file.
     """
 
     def __init__(self, file_path: Optional[str] = None):
+        # Las lecturas salen del índice en memoria, no hace falta otro cache
+        super().__init__(cache_ttl=0)
         path_value = file_path or system_config.LOCAL_SECRETS_FILE or ".local_secrets.json"
         self._path = Path(path_value).expanduser()
         if not self._path.is_absolute():
@@ -23,24 +33,44 @@ class LocalFileSecretProvider(SecretProvider):
 
         self._lock = Lock()
         self._ensure_storage()
+        self._mtime = self._get_mtime()
+        self._index = self._load_all()
 
-    def get_secret(self, name: str) -> Optional[str]:
-        with self._lock:
-            data = self._load_all()
-            return data.get(name)
+    def _read_secret(self, name: str) -> Optional[str]:
+        if name not in self._index and self._get_mtime() != self._mtime:
+            with self._lock:
+                self._reload_if_changed()
+        return self._index.get(name)
 
-    def set_secret(self, value: str) -> str:
+    async def _aread_secret(self, name: str) -> Optional[str]:
+        return self._read_secret(name)
+
+    def _write_secret(self, name: str, value: str) -> None:
         with self._lock:
-            data = self._load_all()
-            name = self.generate_unique_name()
-            data[name] = value
+            # Otro proceso pudo escribir el archivo: se parte de su contenido actual
+            self._reload_if_changed()
+            data = {**self._index, name: value}
             self._write_all(data)
-            return name
+            self._index = data
+            self._mtime = self._get_mtime()
+
+    def _reload_if_changed(self) -> None:
+        # Llamar con el lock tomado
+        mtime = self._get_mtime()
+        if mtime != self._mtime:
+            self._mtime = mtime
+            self._index = self._load_all()
+
+    def _get_mtime(self) -> Optional[int]:
+        try:
+            return self._path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
 
     def _ensure_storage(self) -> None:
         self._path.parent.mkdir(parents=True, exist_ok=True)
         if not self._path.exists():
-            self._path.write_text("{}", encoding="utf-8")
+            self._write_all({})
 
     def _load_all(self) -> dict:
         if not self._path.exists():
@@ -57,4 +87,13 @@ class LocalFileSecretProvider(SecretProvider):
         return {}
 
     def _write_all(self, data: dict) -> None:
-        self._path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        fd, tmp_path = tempfile.mkstemp(dir=self._path.parent, prefix=f".{self._path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                json.dump(data, tmp_file, indent=2)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.replace(tmp_path, self._path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
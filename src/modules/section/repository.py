@@ -249,6 +249,23 @@ class SectionRepo(BaseRepository[Section]):
         self.session.add(new_dependency)
         return new_dependency
     
+    async def get_transitive_dependent_ids(self, section_id: str) -> set[str]:
+        """
+        Walk InnerDependency in reverse and return the IDs of every section that
+        depends, directly or indirectly, on the given section.
+        """
+        dependents: set[str] = set()
+        frontier = {str(section_id)}
+        while frontier:
+            query = select(InnerDependency.section_id).where(
+                InnerDependency.depends_on_section_id.in_(frontier)
+            )
+            result = await self.session.execute(query)
+            found = {str(dependent_id) for dependent_id in result.scalars().all()}
+            frontier = found - dependents - {str(section_id)}
+            dependents |= frontier
+        return dependents
+    
     async def check_if_document_exists(self, document_id: str) -> bool:
         result = await self.session.execute(
             select(Document).where(Document.id == document_id)
@@ -62,6 +62,12 @@ class SectionService:
         return section
     
     
+    async def get_transitive_dependent_ids(self, section_id: str) -> set[str]:
+        """
+        Retrieve the IDs of all sections that depend, directly or transitively, on a section.
+        """
+        return await self.section_repo.get_transitive_dependent_ids(section_id)
+    
     async def add_dependency(self, section_id: str, depends_on_id: str) -> Section:
         """
         Add a dependency relationship between two template sections.
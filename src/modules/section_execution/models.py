@@ -1,5 +1,5 @@
 from src.database.base_model import BaseModel
-from sqlalchemy import Column, String, ForeignKey, Integer, Boolean
+from sqlalchemy import Column, String, ForeignKey, Integer, Boolean, Index, JSON, Float
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -13,6 +13,16 @@ class SectionExecution(BaseModel):
     output = Column(String, nullable=True)
     custom_output = Column(String, nullable=True)
     is_locked = Column(Boolean, default=False, nullable=False)
+    input_hash = Column(String(64), nullable=True) # Hash de prompt, dependencias, contexto y modelo
+    prompt_tokens = Column(JSON, nullable=True) # Tokens usados por cada componente del prompt
+    # Uso real de la llamada al LLM, nulo si la sección no llamó al LLM (reutilizada o cacheada)
+    model_id = Column(UUID(as_uuid=True), ForeignKey("llm.id", ondelete="SET NULL"), nullable=True) # LLM que respondió
+    input_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    cached_tokens = Column(Integer, nullable=True) # Tokens de entrada leídos del cache del proveedor
+    ttft_ms = Column(Integer, nullable=True) # Tiempo hasta el primer token
+    latency_ms = Column(Integer, nullable=True)
+    cost = Column(Float, nullable=True) # Según los precios del LLM al momento de la llamada
     section_id = Column(UUID(as_uuid=True), ForeignKey("section.id", ondelete="SET NULL"), nullable=True)
     execution_id = Column(UUID(as_uuid=True), ForeignKey("execution.id"), nullable=False)
     
@@ -21,5 +31,34 @@ class SectionExecution(BaseModel):
     execution = relationship("Execution", back_populates="sections_executions")
     chunks = relationship("Chunk", back_populates="section_execution", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        Index('section_execution_section_id_created_at_idx', 'section_id', 'created_at'),
+        Index('section_execution_created_at_idx', 'created_at'),
+    )
+    
     def __repr__(self):
         return f"<SectionExecution(id={self.id}, user_instruction='{self.user_instruction}', output='{self.output}')>"
+
+
+
+class SectionExecutionUsage(BaseModel):
+    """
+    Usage of one LLM call made for an execution (generating or fixing a section).
+    Rows are only appended, keyed by the call id, so replacing section rows or
+    retrying a batch never loses or double counts a call.
+    """
+    __tablename__ = "section_execution_usage"
+
+    execution_id = Column(UUID(as_uuid=True), ForeignKey("execution.id", ondelete="CASCADE"), nullable=False)
+    section_id = Column(UUID(as_uuid=True), ForeignKey("section.id", ondelete="SET NULL"), nullable=True)
+    operation = Column(String, nullable=False) # generate_section, fix_section...
+    model_id = Column(UUID(as_uuid=True), ForeignKey("llm.id", ondelete="SET NULL"), nullable=True)
+    input_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    cached_tokens = Column(Integer, nullable=True)
+    latency_ms = Column(Integer, nullable=True)
+    cost = Column(Float, nullable=True)
+
+    __table_args__ = (
+        Index('section_execution_usage_execution_id_idx', 'execution_id'),
+    )
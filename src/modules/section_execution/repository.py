@@ -1,8 +1,11 @@
 from src.database.base_repo import BaseRepository
 from sqlalchemy.ext.asyncio import AsyncSession
-from .models import SectionExecution
+from .models import SectionExecution, SectionExecutionUsage
 from sqlalchemy.future import select
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
+from src.modules.execution.models import Execution, Status
 
 class SectionExecRepo(BaseRepository[SectionExecution]):
     def __init__(self, session: AsyncSession):
@@ -33,4 +36,46 @@ class SectionExecRepo(BaseRepository[SectionExecution]):
         if not section_execution:
             raise ValueError(f"No sections found for execution with id {execution_id}.")
         return section_execution
-    
\ No newline at end of file
+
+    async def get_latest_reusable(self, section_ids: list[str], exclude_execution_id: str = None) -> list[SectionExecution]:
+        """
+        Retrieve, for each section, the latest section execution that belongs to a
+        completed or approved execution and has an input hash.
+        """
+        query = (
+            select(SectionExecution)
+            .join(Execution, SectionExecution.execution_id == Execution.id)
+            .where(
+                SectionExecution.section_id.in_(section_ids),
+                SectionExecution.input_hash.is_not(None),
+                Execution.status.in_([Status.COMPLETED, Status.APPROVED])
+            )
+            .distinct(SectionExecution.section_id)
+            .order_by(SectionExecution.section_id, SectionExecution.created_at.desc())
+        )
+        if exclude_execution_id:
+            query = query.where(SectionExecution.execution_id != exclude_execution_id)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def delete_by_execution_and_sections(self, execution_id: str, section_ids: list[str]) -> int:
+        query = delete(SectionExecution).where(
+            SectionExecution.execution_id == execution_id,
+            SectionExecution.section_id.in_(section_ids)
+        )
+        result = await self.session.execute(query)
+        return result.rowcount
+
+    async def add_all(self, section_executions: list[SectionExecution]) -> list[SectionExecution]:
+        self.session.add_all(section_executions)
+        await self.session.flush()
+        return section_executions
+
+    async def add_usages(self, usages: list[dict]) -> None:
+        # Un lote reintentado trae los mismos call ids, que ya están guardados
+        if not usages:
+            return
+        query = insert(SectionExecutionUsage).values(usages).on_conflict_do_nothing(
+            index_elements=[SectionExecutionUsage.id]
+        )
+        await self.session.execute(query)
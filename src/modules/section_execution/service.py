@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from .repository import SectionExecRepo
 from .models import SectionExecution
+from src.modules.execution.repository import ExecutionRepo
 
 class SectionExecutionService:
     def __init__(self, session: AsyncSession):
@@ -15,6 +16,75 @@ class SectionExecutionService:
         created_section_execution = await self.section_exec_repo.add(section_execution)
         return created_section_execution 
         
+    async def get_reusable_outputs(self, section_ids: list[str], exclude_execution_id: str = None) -> dict[str, dict]:
+        """
+        Map each section ID to the input hash and output of its latest completed
+        or approved section execution.
+        """
+        section_execs = await self.section_exec_repo.get_latest_reusable(section_ids, exclude_execution_id)
+        return {
+            str(section_exec.section_id): {
+                "input_hash": section_exec.input_hash,
+                "output": section_exec.output,
+            }
+            for section_exec in section_execs
+        }
+        
+    async def replace_section_executions(self, execution_id: str,
+                                         section_executions: list[SectionExecution]) -> list[SectionExecution]:
+        """
+        Save a batch of section executions of an execution, removing any previous
+        row of the same sections in it. Saving the same batch twice leaves a single
+        row per section, so batches can be retried safely.
+        The usage of their LLM calls is recorded apart with record_usage, so it
+        is not lost with the removed rows.
+        """
+        section_ids = [section_exec.section_id for section_exec in section_executions]
+        await self.section_exec_repo.delete_by_execution_and_sections(execution_id, section_ids)
+        return await self.section_exec_repo.add_all(section_executions)
+        
+    async def record_usage(self, execution_id: str, operation: str, usage: dict, cost: float = None,
+                           section_id: str = None) -> None:
+        """
+        Record the usage of one LLM call of an execution. A call already recorded
+        (same call_id) is ignored.
+        """
+        row = {
+            "execution_id": execution_id,
+            "section_id": section_id,
+            "operation": operation,
+            "model_id": usage.get("model_id"),
+            "input_tokens": usage.get("input_tokens"),
+            "output_tokens": usage.get("output_tokens"),
+            "cached_tokens": usage.get("cached_tokens"),
+            "latency_ms": usage.get("latency_ms"),
+            "cost": cost,
+        }
+        if usage.get("call_id"):
+            row["id"] = usage["call_id"]
+        await self.section_exec_repo.add_usages([row])
+        
+    async def add_usage(self, section_execution_id: str, usage: dict, cost: float = None,
+                        operation: str = "fix_section") -> SectionExecution:
+        """
+        Add the tokens and cost of a follow-up LLM call (e.g. a fix) to a section
+        execution, record the call and refresh the totals of its execution.
+        Latencies of the section keep the values of the call that generated it.
+        """
+        section_exec = await self.section_exec_repo.get_by_id(section_execution_id)
+        if not section_exec:
+            raise ValueError(f"Section execution with ID {section_execution_id} not found.")
+        
+        for field in ("input_tokens", "output_tokens", "cached_tokens"):
+            setattr(section_exec, field, (getattr(section_exec, field) or 0) + (usage.get(field) or 0))
+        if cost is not None:
+            section_exec.cost = (section_exec.cost or 0) + cost
+        section_exec.model_id = section_exec.model_id or usage.get("model_id")
+        await self.section_exec_repo.update(section_exec)
+        await self.record_usage(section_exec.execution_id, operation, usage, cost, section_exec.section_id)
+        await ExecutionRepo(self.session).refresh_usage(section_exec.execution_id)
+        return section_exec
+        
     async def get_by_id(self, section_execution_id: str):
         """
         Retrieve a section execution by its ID.
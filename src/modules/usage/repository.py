@@ -0,0 +1,62 @@
+from datetime import datetime
+from src.database.base_repo import BaseRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, distinct
+from src.modules.section_execution.models import SectionExecution
+from src.modules.execution.models import Execution
+from src.modules.document.models import Document
+from src.modules.organization.models import Organization
+from src.modules.document_type.models import DocumentType
+from src.modules.llm.models import LLM
+
+
+class UsageRepo(BaseRepository[SectionExecution]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, SectionExecution)
+
+    # Dimensión -> (columna por la que se agrupa, tabla con el nombre, condición de join)
+    GROUPS = {
+        "organization": (Document.organization_id, Organization, Organization.id == Document.organization_id),
+        "document_type": (Document.document_type_id, DocumentType, DocumentType.id == Document.document_type_id),
+        "model": (SectionExecution.model_id, LLM, LLM.id == SectionExecution.model_id),
+    }
+
+    async def aggregate(self, group_by: str, start: datetime, end: datetime, organization_id: str = None,
+                        document_type_id: str = None, model_id: str = None) -> list[dict]:
+        """
+        Sum the usage of the LLM calls of section executions created in [start, end)
+        by organization, document type or model, most expensive first.
+        """
+        key, name_table, join_on = self.GROUPS[group_by]
+        query = (
+            select(
+                key.label("id"),
+                name_table.name.label("name"),
+                func.count(distinct(SectionExecution.execution_id)).label("executions"),
+                func.count(SectionExecution.id).label("sections"),
+                func.coalesce(func.sum(SectionExecution.input_tokens), 0).label("input_tokens"),
+                func.coalesce(func.sum(SectionExecution.output_tokens), 0).label("output_tokens"),
+                func.coalesce(func.sum(SectionExecution.cached_tokens), 0).label("cached_tokens"),
+                func.sum(SectionExecution.cost).label("cost"),
+                func.avg(SectionExecution.ttft_ms).label("avg_ttft_ms"),
+                func.avg(SectionExecution.latency_ms).label("avg_latency_ms"),
+                func.percentile_cont(0.95).within_group(SectionExecution.latency_ms).label("p95_latency_ms"),
+            )
+            .join(Execution, Execution.id == SectionExecution.execution_id)
+            .join(Document, Document.id == Execution.document_id)
+            .outerjoin(name_table, join_on)
+            # Solo las secciones que llamaron al LLM
+            .where(SectionExecution.created_at >= start,
+                   SectionExecution.created_at < end,
+                   SectionExecution.input_tokens.isnot(None))
+            .group_by(key, name_table.name)
+            .order_by(func.sum(SectionExecution.cost).desc().nullslast())
+        )
+        if organization_id:
+            query = query.where(Document.organization_id == organization_id)
+        if document_type_id:
+            query = query.where(Document.document_type_id == document_type_id)
+        if model_id:
+            query = query.where(SectionExecution.model_id == model_id)
+        result = await self.session.execute(query)
+        return [dict(row._mapping) for row in result.all()]
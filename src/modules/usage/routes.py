@@ -0,0 +1,43 @@
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession as Session
+from src.database.core import get_session
+from src.schemas import ResponseSchema
+from src.utils import get_transaction_id
+from .service import UsageService
+
+router = APIRouter(prefix="/usage")
+
+
+@router.get("/", response_model=ResponseSchema)
+async def get_usage(group_by: str = "model",
+                    start: datetime = None,
+                    end: datetime = None,
+                    organization_id: str = None,
+                    document_type_id: str = None,
+                    model_id: str = None,
+                    session: Session = Depends(get_session),
+                    transaction_id: str = Depends(get_transaction_id)):
+    """
+    Get the LLM tokens, cost and latency of section generation grouped by
+    organization, document type or model over a time range.
+    """
+    try:
+        service = UsageService(session)
+        usage = await service.get_usage(group_by, start, end, organization_id, document_type_id, model_id)
+        return ResponseSchema(
+            transaction_id=transaction_id,
+            data=jsonable_encoder(usage)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"transaction_id": transaction_id, "error": str(e)}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"transaction_id": transaction_id,
+                    "error": f"An error occurred while retrieving the usage: {str(e)}"}
+        )
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from .repository import UsageRepo
+
+# Rango por defecto cuando no se indica el inicio
+DEFAULT_RANGE_DAYS = 30
+
+
+class UsageService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.usage_repo = UsageRepo(session)
+
+    async def get_usage(self, group_by: str, start: datetime = None, end: datetime = None,
+                        organization_id: str = None, document_type_id: str = None,
+                        model_id: str = None) -> dict:
+        """
+        Aggregate the tokens, cost and latency of the LLM calls made to write
+        sections, by organization, document type or model, over a time range.
+        The range defaults to the last 30 days.
+        """
+        if group_by not in UsageRepo.GROUPS:
+            raise ValueError(f"group_by must be one of: {', '.join(UsageRepo.GROUPS)}.")
+        end = end or datetime.utcnow()
+        start = start or end - timedelta(days=DEFAULT_RANGE_DAYS)
+        if start >= end:
+            raise ValueError("start must be before end.")
+
+        groups = await self.usage_repo.aggregate(group_by, start, end, organization_id,
+                                                 document_type_id, model_id)
+        totals = {
+            field: sum(group[field] or 0 for group in groups)
+            for field in ("executions", "sections", "input_tokens", "output_tokens", "cached_tokens", "cost")
+        }
+        return {
+            "group_by": group_by,
+            "start": start,
+            "end": end,
+            "totals": totals,
+            "groups": groups,
+        }
@@ -8,26 +8,19 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from src.config import system_config
-from src.database.core import session as async_session_factory
-from src.modules.job.service import JobService
-from src.worker.worker import run_workers
+from src.worker.worker import WORKER_ID, requeue_stalled_jobs, run_workers
 from src.modules.job.routes import router as job_router
 
 logger = logging.getLogger(__name__)
 SHUTDOWN_FAIL_REASON = "Job worker stopped because the API was shut down."
 
 
-async def _fail_running_jobs_on_shutdown() -> None:
-    updated = 0
-    try:
-        async with async_session_factory() as db_session:
-            service = JobService(db_session)
-            updated = await service.fail_running_jobs(reason=SHUTDOWN_FAIL_REASON)
-            await db_session.commit()
-    except Exception:  # pragma: no cover - defensive logging
-        logger.exception("Failed to mark running jobs as failed during shutdown.")
-    else:
-        logger.info("Marked %s running jobs as failed during shutdown.", updated)
+async def _requeue_own_jobs_on_shutdown() -> None:
+    """
+    Requeue the jobs this worker still holds (e.g. a handler that did not finish
+    in time); other workers keep their jobs. Jobs with no attempts left are dead-lettered.
+    """
+    await requeue_stalled_jobs(worker_id=WORKER_ID, reason=SHUTDOWN_FAIL_REASON)
 
 
 @asynccontextmanager
@@ -45,7 +38,7 @@ async def lifespan(app: FastAPI):
     finally:
         app.state.shutdown_event.set()
         await app.state.worker_task
-        await _fail_running_jobs_on_shutdown()
+        await _requeue_own_jobs_on_shutdown()
 
 
 app = FastAPI(title="Job Worker", version="1.0.0", lifespan=lifespan)
@@ -4,17 +4,24 @@ import argparse
 import asyncio
 import json
 import logging
+import os
 import signal
+import socket
 from contextlib import suppress
 from typing import Awaitable, Callable, Dict, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import system_config
 from src.database.core import session as async_session_factory
 from src.database import load_models
 from src.logger import setup_logging
-from src.modules.job.models import Job
+from src.modules.event_bus import get_event_bus
+from src.modules.job.models import Job, JobPriority, JobStatus
+from src.modules.job.retry import is_retryable
 from src.modules.job.service import JobService
+from src.modules.job.wakeup import JobWakeup
+from src.modules.rate_limit.service import get_retry_after
 
 # Import job handler registrations
 from src.modules.generation import worker as generation_worker  # noqa: F401
@@ -22,7 +29,17 @@ from src.modules.generation import worker as generation_worker  # noqa: F401
 JobHandler = Callable[[Job, AsyncSession], Awaitable[Optional[str | dict]]]
 JOB_HANDLERS: Dict[str, JobHandler] = {}
 
+
+class LeaseLostError(Exception):
+    """
+    The handler of a job was cancelled because this worker lost its lease.
+    """
+
 IDLE_SLEEP_SECONDS = 1.0
+# Cada cuánto se borran del event log los eventos vencidos
+EVENT_LOG_SWEEP_SECONDS = 3600
+# Identifica a este proceso como dueño de los leases de sus jobs
+WORKER_ID = system_config.JOB_WORKER_ID or f"{socket.gethostname()}-{os.getpid()}"
 logger = setup_logging()
 load_models()
 
@@ -31,38 +48,121 @@ def register_job_handler(job_type: str, handler: JobHandler) -> None:
     JOB_HANDLERS[job_type] = handler
 
 
-async def claim_job() -> Optional[Job]:
+async def claim_jobs(limit: int, min_priority: Optional[int] = None) -> Optional[list[Job]]:
+    """
+    Claim up to limit pending jobs (of at least min_priority) in one statement.
+    Returns None when the claim failed, so the caller can retry sooner than
+    the poll interval.
+    """
     try:
         async with async_session_factory() as db_session:
             service = JobService(db_session)
-            job = await service.claim_next_job()
+            jobs = await service.claim_jobs(limit, worker_id=WORKER_ID,
+                                            lease_seconds=system_config.JOB_LEASE_SECONDS,
+                                            min_priority=min_priority)
             await db_session.commit()
-            return job
+            return jobs
     except Exception as e:
-        logger.error("Error claiming job: %s", str(e))
+        logger.error("Error claiming jobs: %s", str(e))
         return None
 
 
+async def release_jobs(jobs: list[Job]) -> None:
+    if not jobs:
+        return
+    try:
+        async with async_session_factory() as db_session:
+            service = JobService(db_session)
+            released = await service.release_jobs([job.id for job in jobs], worker_id=WORKER_ID)
+            await db_session.commit()
+            logger.info("Released %s claimed job(s) that were not started", released)
+    except Exception as e:
+        logger.error("Error releasing claimed jobs: %s", str(e))
+
+
 async def mark_success(job_id: str, result: Optional[str]) -> None:
     try:
         async with async_session_factory() as db_session:
             service = JobService(db_session)
-            await service.complete_job(job_id, result=result)
+            await service.complete_job(job_id, result=result, worker_id=WORKER_ID)
             await db_session.commit()
     except Exception as e:
         logger.error("Error marking job %s as success: %s", job_id, str(e))
 
 
-async def mark_failure(job_id: str, error: Optional[str]) -> None:
+async def mark_failure(job_id: str, error: Optional[str], retryable: bool = False,
+                       retry_after: Optional[float] = None) -> None:
     try:
         async with async_session_factory() as db_session:
             service = JobService(db_session)
-            await service.fail_job(job_id, error=error)
+            job = await service.fail_job(job_id, error=error, worker_id=WORKER_ID,
+                                         retryable=retryable, retry_after=retry_after)
             await db_session.commit()
+            if job.status == JobStatus.PENDING.value:
+                logger.warning("Job %s failed (attempt %s), retrying after %s", job_id, job.attempts, job.run_after)
     except Exception as e:
         logger.error("Error marking job %s as failure: %s", job_id, str(e))
 
 
+async def renew_leases(job_ids: set[str]) -> Optional[set[str]]:
+    """
+    Renew the leases of the given jobs. Returns the ids this worker still owns,
+    or None when the heartbeat failed.
+    """
+    try:
+        async with async_session_factory() as db_session:
+            service = JobService(db_session)
+            owned = await service.renew_leases(job_ids, worker_id=WORKER_ID,
+                                               lease_seconds=system_config.JOB_LEASE_SECONDS)
+            await db_session.commit()
+            return owned
+    except Exception as e:
+        logger.error("Error renewing job leases: %s", str(e))
+        return None
+
+
+async def requeue_stalled_jobs(*, worker_id: Optional[str] = None, reason: Optional[str] = None) -> None:
+    try:
+        async with async_session_factory() as db_session:
+            service = JobService(db_session)
+            requeued, dead_lettered = await service.requeue_stalled_jobs(worker_id=worker_id, reason=reason)
+            await db_session.commit()
+    except Exception as e:
+        logger.error("Error requeueing stalled jobs: %s", str(e))
+        return
+    if requeued or dead_lettered:
+        logger.warning("Requeued %s stalled job(s), dead-lettered %s with no attempts left", requeued, dead_lettered)
+
+
+async def reaper_loop(shutdown_event: asyncio.Event) -> None:
+    """
+    Periodically requeue the jobs whose worker stopped renewing their lease
+    (e.g. a killed pod). Every process runs it; the updates are idempotent.
+    """
+    while not shutdown_event.is_set():
+        await requeue_stalled_jobs()
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(shutdown_event.wait(), timeout=system_config.JOB_REAPER_INTERVAL_SECONDS)
+
+
+async def event_log_sweeper(shutdown_event: asyncio.Event) -> None:
+    """
+    Periodically delete the logged events older than EVENT_LOG_TTL_SECONDS, so
+    the event log does not keep the channels of every finished execution.
+    """
+    if not system_config.EVENT_LOG_TTL_SECONDS:
+        return
+    while not shutdown_event.is_set():
+        try:
+            deleted = await get_event_bus().expire_log(system_config.EVENT_LOG_TTL_SECONDS)
+            if deleted:
+                logger.info("Deleted %s expired events from the event log", deleted)
+        except Exception as e:
+            logger.error("Error expiring the event log: %s", str(e))
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(shutdown_event.wait(), timeout=EVENT_LOG_SWEEP_SECONDS)
+
+
 async def run_handler(handler: JobHandler, job: Job, worker_name: str) -> Optional[str]:
     try:
         async with async_session_factory() as handler_session:
@@ -76,7 +176,165 @@ async def run_handler(handler: JobHandler, job: Job, worker_name: str) -> Option
         raise
 
 
-async def worker_loop(name: str, shutdown_event: asyncio.Event) -> None:
+class JobDispatcher:
+    """
+    Supervisor-level claimer for the worker loops of a process. Instead of each
+    idle loop claiming its own job, the dispatcher claims as many jobs as there
+    are free worker slots (up to the claim batch size) in one statement and
+    hands them to the loops through an in-process queue.
+
+    A slot is free when its loop is neither running a job nor has one waiting
+    in the queue, so the prefetch depth never exceeds the idle workers and no
+    job sits claimed while another process could run it.
+
+    The dispatcher also renews the leases of every job it claimed, queued or
+    running, until its loop finishes it. When a lease is lost (another worker
+    may already be running the job) the handler of that job is cancelled.
+
+    reserved_slots are kept for interactive jobs: jobs below that priority never
+    occupy them, so a user-triggered run starts as soon as it is enqueued even
+    while a large batch is draining.
+    """
+
+    def __init__(self, slots: int, wakeup: JobWakeup, shutdown_event: asyncio.Event, batch_size: int,
+                 reserved_slots: int = 0):
+        self.slots = slots
+        self.wakeup = wakeup
+        self.shutdown_event = shutdown_event
+        self.batch_size = max(batch_size, 1)
+        # Siempre queda al menos un slot para los jobs no interactivos
+        self.reserved_slots = min(max(reserved_slots, 0), slots - 1)
+        self.queue: asyncio.Queue[Optional[Job]] = asyncio.Queue()
+        self._busy = 0
+        self._background = 0
+        self._slot_freed = asyncio.Event()
+        self._owned: set[str] = set()
+        # Handler en curso de cada job, para cancelarlo si se pierde su lease
+        self._handlers: dict[str, asyncio.Task] = {}
+
+    @property
+    def free_slots(self) -> int:
+        return self.slots - self._busy - self.queue.qsize()
+
+    async def get(self) -> Optional[Job]:
+        """
+        Wait for the next claimed job. Returns None when the worker must stop.
+        """
+        job = await self.queue.get()
+        if job is not None:
+            self._busy += 1
+        return job
+
+    def done(self, job: Job) -> None:
+        """
+        Called by a worker loop when it finishes a job.
+        """
+        self._busy -= 1
+        self._owned.discard(str(job.id))
+        if job.priority < JobPriority.INTERACTIVE:
+            self._background -= 1
+        self._slot_freed.set()
+
+    async def run_job(self, job: Job, handler_call: Awaitable[Optional[str]]) -> Optional[str]:
+        """
+        Run the handler of a job in its own task so the heartbeat can cancel it.
+        Raises LeaseLostError when it was cancelled for losing the lease.
+        """
+        job_id = str(job.id)
+        task = asyncio.ensure_future(handler_call)
+        self._handlers[job_id] = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            # Si se cancela el worker mismo la cancelación sigue su curso
+            if asyncio.current_task().cancelling():
+                raise
+            raise LeaseLostError(f"Lost the lease of job {job_id}")
+        finally:
+            self._handlers.pop(job_id, None)
+
+    async def _wait(self, *waiters: Awaitable) -> None:
+        # Esperar a cualquiera de los waiters o al apagado, lo que ocurra primero
+        tasks = [asyncio.ensure_future(waiter) for waiter in waiters]
+        tasks.append(asyncio.create_task(self.shutdown_event.wait()))
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self) -> None:
+        supervisor_logger = logging.getLogger("job-worker.supervisor")
+        while not self.shutdown_event.is_set():
+            self._slot_freed.clear()
+            free = self.free_slots
+            if free <= 0:
+                await self._wait(self._slot_freed.wait())
+                continue
+
+            # Los jobs no interactivos no pueden ocupar los slots reservados
+            background_room = self.slots - self.reserved_slots - self._background
+            if background_room > 0:
+                limit, min_priority = min(free, background_room, self.batch_size), None
+            else:
+                limit, min_priority = min(free, self.batch_size), JobPriority.INTERACTIVE
+            jobs = await claim_jobs(limit, min_priority)
+            if jobs is None:
+                await self._wait(asyncio.sleep(IDLE_SLEEP_SECONDS))
+                continue
+            if self.shutdown_event.is_set():
+                await release_jobs(jobs)
+                break
+            if jobs:
+                supervisor_logger.debug("Claimed %s job(s) for %s free slot(s)", len(jobs), free)
+            for job in jobs:
+                self._owned.add(str(job.id))
+                if job.priority < JobPriority.INTERACTIVE:
+                    self._background += 1
+                self.queue.put_nowait(job)
+
+            if len(jobs) < limit:
+                # No quedan jobs que se puedan tomar: esperar a que se encole uno
+                # o a que termine otro (puede liberar lugar para los no interactivos)
+                await self._wait(self._slot_freed.wait(), self.wakeup.wait())
+
+    async def heartbeat(self) -> None:
+        supervisor_logger = logging.getLogger("job-worker.supervisor")
+        # Corre también durante el apagado, mientras los workers terminan sus jobs
+        while True:
+            await asyncio.sleep(system_config.JOB_HEARTBEAT_INTERVAL_SECONDS)
+            job_ids = set(self._owned)
+            if not job_ids:
+                continue
+            owned = await renew_leases(job_ids)
+            if owned is None:
+                continue
+            for job_id in job_ids - owned:
+                if job_id in self._owned:
+                    supervisor_logger.warning("Lost the lease of job %s, cancelling its handler", job_id)
+                    self._owned.discard(job_id)
+                    handler_task = self._handlers.get(job_id)
+                    if handler_task is not None:
+                        handler_task.cancel()
+
+    async def stop(self, worker_count: int) -> None:
+        """
+        Release the jobs that were claimed but not started and tell every
+        worker loop to stop.
+        """
+        unstarted = []
+        while not self.queue.empty():
+            job = self.queue.get_nowait()
+            if job is not None:
+                unstarted.append(job)
+                self._owned.discard(str(job.id))
+        for _ in range(worker_count):
+            self.queue.put_nowait(None)
+        await release_jobs(unstarted)
+
+
+async def worker_loop(name: str, shutdown_event: asyncio.Event, dispatcher: JobDispatcher) -> None:
     worker_logger = logging.getLogger(f"job-worker.{name}")
     worker_logger.info("Worker %s started", name)
     
@@ -84,19 +342,10 @@ async def worker_loop(name: str, shutdown_event: asyncio.Event) -> None:
     register_job_handler("run_generation_graph", generation_worker.run_generation_graph_handler)
 
     while not shutdown_event.is_set():
+        job = await dispatcher.get()
+        if job is None:
+            break
         try:
-            worker_logger.debug("Worker loop iteration - checking for jobs")
-            job = await claim_job()
-            worker_logger.debug("Claimed job result: %s", job)
-            
-            if not job:
-                worker_logger.debug("No job found, sleeping for %s seconds", IDLE_SLEEP_SECONDS)
-                try:
-                    await asyncio.wait_for(shutdown_event.wait(), timeout=IDLE_SLEEP_SECONDS)
-                except asyncio.TimeoutError:
-                    continue
-                break
-
             worker_logger.info("Picked job %s (type=%s)", job.id, job.type)
             handler = JOB_HANDLERS.get(job.type)
 
@@ -108,11 +357,14 @@ async def worker_loop(name: str, shutdown_event: asyncio.Event) -> None:
 
             try:
                 worker_logger.debug("Running handler for job %s", job.id)
-                result = await run_handler(handler, job, name)
+                result = await dispatcher.run_job(job, run_handler(handler, job, name))
                 worker_logger.debug("Handler completed for job %s", job.id)
+            except LeaseLostError:
+                # El job ya no es de este worker: no se marca su resultado
+                worker_logger.warning("Job %s was cancelled after losing its lease", job.id)
             except Exception as exc:
                 worker_logger.exception("Job %s failed", job.id)
-                await mark_failure(job.id, str(exc))
+                await mark_failure(job.id, str(exc), is_retryable(exc), get_retry_after(exc))
             else:
                 await mark_success(job.id, result)
                 worker_logger.info("Job %s completed", job.id)
@@ -121,6 +373,8 @@ async def worker_loop(name: str, shutdown_event: asyncio.Event) -> None:
             worker_logger.error("Unexpected error in worker loop: %s", str(e))
             # Esperar un poco antes de continuar para evitar loops rápidos en caso de error persistente
             await asyncio.sleep(1)
+        finally:
+            dispatcher.done(job)
 
     worker_logger.info("Worker %s stopped", name)
 
@@ -149,9 +403,15 @@ async def run_workers(
 
     supervisor_logger = logging.getLogger("job-worker.supervisor")
     worker_tasks: set[asyncio.Task[None]] = set()
+    # Un solo LISTEN por proceso despierta al dispatcher, que reparte los jobs
+    wakeup = JobWakeup(get_event_bus(), max_pending=1,
+                       poll_interval=system_config.JOB_POLL_INTERVAL_SECONDS)
+    wakeup.start()
+    dispatcher = JobDispatcher(count, wakeup, event, system_config.JOB_CLAIM_BATCH_SIZE,
+                               system_config.JOB_RESERVED_INTERACTIVE_SLOTS)
 
     def _start_worker(worker_id: str) -> None:
-        task = asyncio.create_task(worker_loop(worker_id, event))
+        task = asyncio.create_task(worker_loop(worker_id, event, dispatcher))
         worker_tasks.add(task)
 
         def _on_done(completed: asyncio.Task[None], *, wid: str = worker_id) -> None:
@@ -174,13 +434,22 @@ async def run_workers(
 
     for idx in range(count):
         _start_worker(f"{idx+1}")
+    dispatcher_task = asyncio.create_task(dispatcher.run())
+    heartbeat_task = asyncio.create_task(dispatcher.heartbeat())
+    reaper_task = asyncio.create_task(reaper_loop(event))
+    sweeper_task = asyncio.create_task(event_log_sweeper(event))
 
     wait_task = asyncio.create_task(event.wait())
     try:
         await wait_task
     finally:
         event.set()
+        await wakeup.close()
+        await asyncio.gather(dispatcher_task, return_exceptions=True)
+        await dispatcher.stop(count)
         await asyncio.gather(*list(worker_tasks), return_exceptions=True)
+        heartbeat_task.cancel()
+        await asyncio.gather(heartbeat_task, reaper_task, sweeper_task, return_exceptions=True)
 
 
 def parse_args() -> argparse.Namespace: